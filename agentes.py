@@ -0,0 +1,48 @@
+# ================== CACHÉ DE AGENTES (PERFIL) ==================
+# Los agentes suelen validar el mismo CUIL varias veces (reintentos, cambio de
+# actividad, varias comisiones). El perfil que devuelve la RPC de elegibilidad
+# se guarda por proceso con TTL corto y tope de entradas/memoria.
+# Existencia, historial e inscripción en la comisión NO se cachean: la RPC las
+# verifica siempre (ver sql/verificar_elegibilidad_inscripcion.sql).
+import json
+import os
+
+from cache_lru import CacheLRU
+
+PERFILES_TTL_SEGUNDOS = float(os.environ.get("PERFILES_TTL_SEGUNDOS", "300"))
+PERFILES_MAX = int(os.environ.get("PERFILES_MAX", "5000"))
+PERFILES_MAX_MB = float(os.environ.get("PERFILES_MAX_MB", "16"))
+
+
+def _tamano_perfil(perfil: dict) -> int:
+    return len(json.dumps(perfil, default=str))
+
+
+cache_perfiles = CacheLRU(
+    PERFILES_MAX,
+    max_bytes=int(PERFILES_MAX_MB * 2**20),
+    tamano=_tamano_perfil,
+    ttl=PERFILES_TTL_SEGUNDOS,
+)
+
+
+def perfil_en_cache(cuil: str):
+    # Perfil de un agente existente, o None si no está en caché
+    return cache_perfiles.obtener(cuil)
+
+
+def guardar_perfil(cuil: str, perfil: dict):
+    if perfil:
+        cache_perfiles.guardar(cuil, perfil)
+
+
+def invalidar_perfil(cuil: str):
+    cache_perfiles.invalidar(cuil)
+
+
+def invalidar_perfiles():
+    cache_perfiles.limpiar()
+
+
+def estadisticas() -> dict:
+    return cache_perfiles.estadisticas()
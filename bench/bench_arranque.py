@@ -0,0 +1,97 @@
+# ================== BENCHMARK: ARRANQUE EN FRÍO ==================
+# Cada medición corre en un proceso nuevo (como una réplica recién creada):
+#   - importaciones: tiempo de importar los módulos que usa form.py
+#   - primer render: desde el arranque del proceso hasta que termina la
+#     primera ejecución de form.py (AppTest + cliente en memoria con latencia)
+#   - con precalentado: lo mismo, pero después de servidor.precalentar(), que
+#     en producción corre al levantar el proceso, antes de recibir tráfico
+#   - reinicio con instantánea: el catálogo sale de la instantánea en disco que
+#     dejó un proceso anterior (ver instantanea.py); las demás mediciones usan
+#     un directorio vacío
+# Uso:
+#     python bench/bench_arranque.py [comisiones] [latencia_ms] [repeticiones]
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS_FORM = [
+    "streamlit", "agentes", "busqueda", "catalogo", "cola_inscripciones", "inscripciones", "invalidacion", "metricas",
+    "perfilado", "conexion", "presentacion", "selector_comisiones", "tabla_paginada",
+]
+
+MEDICION = r"""
+import json, os, sys, tempfile, time
+inicio = time.perf_counter()
+sys.path.insert(0, {raiz!r})
+os.environ.update(SUPABASE_URL="http://localhost", SUPABASE_ANON_KEY="bench",
+                  COLA_INSCRIPCIONES_SPOOL=tempfile.mkdtemp(prefix="spool_arranque_"),
+                  CATALOGO_INSTANTANEA={directorio!r} or tempfile.mkdtemp(prefix="instantanea_arranque_"))
+import importlib
+for modulo in {modulos!r}:
+    importlib.import_module(modulo)
+importaciones = time.perf_counter() - inicio
+resultado = {{"importaciones": importaciones}}
+if {render!r}:
+    from bench.cliente_memoria import instalar
+    instalar({comisiones}, {latencia})
+    precalentado = 0.0
+    if {precalentar!r}:
+        import servidor
+        t = time.perf_counter()
+        servidor.precalentar()
+        precalentado = time.perf_counter() - t
+    from streamlit.testing.v1 import AppTest
+    t = time.perf_counter()
+    at = AppTest.from_file(os.path.join({raiz!r}, "form.py"), default_timeout=120).run()
+    assert not at.exception, at.exception
+    resultado["primer_render"] = time.perf_counter() - t
+    resultado["precalentado"] = precalentado
+    resultado["desde_arranque"] = time.perf_counter() - inicio
+    import threading
+    for hilo in threading.enumerate():
+        if hilo.name.startswith("catalogo-"):
+            hilo.join()  # la instantánea queda escrita para la medición siguiente
+print(json.dumps(resultado))
+"""
+
+
+def medir(render: bool, precalentar: bool, comisiones: int, latencia: float, directorio: str = None) -> dict:
+    codigo = MEDICION.format(
+        raiz=RAIZ, modulos=MODULOS_FORM, render=render, precalentar=precalentar,
+        comisiones=comisiones, latencia=latencia, directorio=directorio,
+    )
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True, cwd=RAIZ)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    comisiones = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latencia = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+    repeticiones = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    def mediana(clave, render, precalentar, directorio=None):
+        return statistics.median(
+            medir(render, precalentar, comisiones, latencia, directorio)[clave] for _ in range(repeticiones)
+        ) * 1000
+
+    print(f"{comisiones} comisiones, latencia {latencia * 1000:.0f} ms, {repeticiones} repeticiones (mediana, ms)")
+    print(f"importaciones de form.py:                {mediana('importaciones', False, False):8.1f}")
+    print(f"primer render sin precalentar:           {mediana('primer_render', True, False):8.1f}")
+    print(f"  desde el arranque del proceso:         {mediana('desde_arranque', True, False):8.1f}")
+    if os.path.exists(os.path.join(RAIZ, "servidor.py")):
+        print(f"primer render con precalentado:          {mediana('primer_render', True, True):8.1f}")
+        print(f"precalentado (al arrancar, sin tráfico): {mediana('precalentado', True, True):8.1f}")
+    if os.path.exists(os.path.join(RAIZ, "instantanea.py")):
+        directorio = tempfile.mkdtemp(prefix="instantanea_arranque_")
+        medir(True, False, comisiones, latencia, directorio)  # deja la instantánea en disco
+        print(f"primer render tras reinicio (instantánea): {mediana('primer_render', True, False, directorio):6.1f}")
+        print(f"precalentado tras reinicio (instantánea):  {mediana('precalentado', True, True, directorio):6.1f}")
+
+
+if __name__ == "__main__":
+    main()
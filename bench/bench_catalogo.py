@@ -0,0 +1,74 @@
+# ================== BENCHMARK: DERIVACIÓN DEL CATÁLOGO ==================
+# Compara la derivación original de df_temp (re-ejecutada en cada rerun) con
+# catalogo.construir_frame (una vez por versión). Uso:
+#     python bench/bench_catalogo.py [1000 10000 100000]
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from bench.datos_sinteticos import comisiones
+from catalogo import construir_frame
+
+
+def derivacion_original(comisiones_raw: list) -> pd.DataFrame:
+    df_temp = pd.DataFrame(comisiones_raw)
+    df_temp["fecha_desde"] = pd.to_datetime(df_temp["fecha_desde"], errors="coerce")
+    df_temp["fecha_hasta"] = pd.to_datetime(df_temp["fecha_hasta"], errors="coerce")
+    df_temp["fecha_cierre"] = pd.to_datetime(df_temp["fecha_cierre"], errors="coerce")
+    required_cols = ["id_comision_sai", "nombre_actividad", "fecha_desde", "fecha_hasta"]
+    df_temp = df_temp.dropna(subset=required_cols)
+    df_temp["Actividad"] = df_temp["nombre_actividad"]
+    df_temp["Comisión"] = df_temp["id_comision_sai"]
+    df_temp["Fecha inicio"] = df_temp["fecha_desde"].dt.strftime("%d/%m/%Y")
+    df_temp["Fecha fin"] = df_temp["fecha_hasta"].dt.strftime("%d/%m/%Y")
+    df_temp["Fecha cierre"] = df_temp["fecha_cierre"].dt.strftime("%d/%m/%Y")
+    df_temp["Actividad dropdown"] = (
+        df_temp["nombre_actividad"] + " (" + df_temp["Fecha inicio"] + " al " + df_temp["Fecha fin"] + ")"
+    )
+    df_temp["Actividad (Comisión)"] = df_temp["nombre_actividad"] + " (" + df_temp["id_comision_sai"] + ")"
+    df_temp["Créditos"] = df_temp["creditos"].fillna(0).astype(int)
+
+    def clasificar_duracion(creditos):
+        if 1 <= creditos < 10: return "BREVE (hasta 10 hs)"
+        elif 10 <= creditos < 20: return "INTERMEDIA (entre 10 y 20 hs)"
+        elif creditos >= 20: return "PROLONGADA (más de 20 hs)"
+        return "SIN CLASIFICAR"
+
+    df_temp["Duración"] = df_temp["Créditos"].apply(clasificar_duracion)
+    df_temp["Modalidad"] = df_temp["modalidad_cursada"]
+    df_temp["Apto tramo"] = df_temp["apto_tramo"].fillna("No")
+    df_temp["Ver más"] = df_temp["link_externo"]
+    return df_temp
+
+
+def medir(fn, registros, repeticiones: int) -> tuple:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        df = fn(registros)
+        mejor = min(mejor, time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    fn(registros)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return mejor, pico, df.memory_usage(deep=True).sum()
+
+
+def main(tamanos):
+    print(f"{'filas':>8} {'variante':<12} {'tiempo ms':>10} {'pico MB':>9} {'frame MB':>9}")
+    for n in tamanos:
+        registros = comisiones(n)
+        repeticiones = 5 if n <= 10_000 else 2
+        for nombre, fn in (("original", derivacion_original), ("vectorizada", construir_frame)):
+            tiempo, pico, frame = medir(fn, registros, repeticiones)
+            print(f"{n:>8} {nombre:<12} {tiempo * 1000:>10.1f} {pico / 2**20:>9.1f} {frame / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1_000, 10_000, 100_000])
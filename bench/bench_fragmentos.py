@@ -0,0 +1,84 @@
+# ================== BENCHMARK: TIEMPO DE SERVIDOR POR INTERACCIÓN ==================
+# Con AppTest y el cliente en memoria, mide cuánto tarda el servidor en
+# responder a escribir en los campos de los pasos 3 y 4:
+#   - antes: la interacción re-ejecuta el script completo (como sin fragmentos)
+#   - después: re-ejecución limitada al fragmento del paso, como la pide el navegador
+# Uso:
+#     python bench/bench_fragmentos.py [comisiones] [repeticiones]
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench")
+os.environ.setdefault("COLA_INSCRIPCIONES_SPOOL", tempfile.mkdtemp(prefix="spool_bench_"))
+os.environ.setdefault("CATALOGO_INSTANTANEA", tempfile.mkdtemp(prefix="instantanea_bench_"))
+
+import streamlit.testing.v1.local_script_runner as runner_local
+from streamlit.testing.v1 import AppTest
+
+from bench.cliente_memoria import instalar
+
+# Orden en que form.py registra los fragmentos
+FRAGMENTOS = ["paso_filtros_tabla", "paso_tarjetas", "paso_actividad", "paso_cuil", "paso_formulario"]
+
+
+def correr(at: AppTest, accion, fragmento: str = None) -> float:
+    # AppTest no sabe pedir re-ejecuciones de un fragmento: se agrega el id del
+    # fragmento a la RerunData, igual que lo hace el navegador
+    rerun_data = runner_local.RerunData
+    arbol = at._tree
+    if fragmento is not None:
+        fid = list(at._fragment_storage._fragments)[FRAGMENTOS.index(fragmento)]
+        runner_local.RerunData = lambda **kw: rerun_data(fragment_id_queue=[fid], **kw)
+    try:
+        inicio = time.perf_counter()
+        accion(at)
+        return time.perf_counter() - inicio
+    finally:
+        runner_local.RerunData = rerun_data
+        if fragmento is not None:
+            # Tras una re-ejecución parcial el árbol de AppTest solo tiene los
+            # elementos del fragmento; el navegador conserva el resto de la página
+            at._tree = arbol
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    instalar(n)
+
+    at = AppTest.from_file(os.path.join(RAIZ, "form.py"), default_timeout=60).run()
+    at.selectbox(key="actividad_key_default").select_index(1).run()
+    at.text_input(key="cuil_input").input("20123456786").run()
+    at.button(key="validar_cuil_btn").click().run()
+    assert not at.exception, at.exception
+
+    interacciones = [
+        ("cuil_input", "paso_cuil"),
+        ("titulo", "paso_formulario"),
+        ("tareas_desarrolladas", "paso_formulario"),
+        ("email_alternativo", "paso_formulario"),
+    ]
+    print(f"{n} comisiones, {repeticiones} repeticiones (mediana, ms)")
+    print(f"{'campo':<22}{'antes':>10}{'después':>10}{'x':>8}")
+    for clave, fragmento in interacciones:
+        tiempos = {}
+        for modo in ("antes", "después"):
+            muestras = []
+            for i in range(repeticiones):
+                def escribir(at, valor=f"{modo}{i}"):
+                    campo = at.text_area(key=clave) if clave == "tareas_desarrolladas" else at.text_input(key=clave)
+                    campo.input("20123456786" if clave == "cuil_input" else valor).run()
+                muestras.append(correr(at, escribir, fragmento if modo == "después" else None))
+                assert not at.exception, at.exception
+            tiempos[modo] = statistics.median(muestras) * 1000
+        print(f"{clave:<22}{tiempos['antes']:>10.1f}{tiempos['después']:>10.1f}{tiempos['antes'] / tiempos['después']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# ================== BENCHMARK: INSTANTÁNEA DEL CATÁLOGO EN DISCO ==================
+# Cada escenario corre en un proceso nuevo contra el mismo directorio de
+# instantánea (como réplicas del mismo host):
+#   - frío: sin instantánea, el catálogo sale de la base y se publica en disco
+#   - reinicio: instantánea vencida; se sirve desde disco y se refresca en
+#     segundo plano (con un cambio en la base, que termina en una firma nueva)
+#   - réplica: instantánea vigente publicada por otro proceso; se adopta sin
+#     consultar la base
+# Verifica que el frame leído de disco sea igual al que arma construir_frame,
+# que la lectura no copie las columnas de texto (memoria asignada por Arrow) y
+# que lectores concurrentes nunca vean un sello a medio escribir.
+# Uso:
+#     python bench/bench_instantanea.py [comisiones] [latencia_ms]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ESCENARIO = r"""
+import json, os, sys, tempfile, threading, time
+sys.path.insert(0, {raiz!r})
+os.environ.update(SUPABASE_URL="http://localhost", SUPABASE_ANON_KEY="bench",
+                  CATALOGO_INSTANTANEA={directorio!r}, CATALOGO_TTL_SEGUNDOS={ttl!r})
+import pandas as pd
+import pyarrow as pa
+import catalogo
+import conexion
+from bench.cliente_memoria import instalar
+
+cliente = instalar({comisiones}, {latencia})
+if {cambiar!r}:
+    fila = cliente.tablas["vista_comisiones_abiertas"][0]
+    fila["nombre_actividad"] = "Actividad modificada"
+    fila["updated_at"] = "2030-01-01T00:00:00+00:00"
+asignado = pa.total_allocated_bytes()
+inicio = time.perf_counter()
+with conexion.obtener_pool().cliente() as supabase:
+    derivado = catalogo.obtener_catalogo(supabase)
+primero = time.perf_counter() - inicio
+resultado = {{
+    "primer_catalogo_ms": primero * 1000,
+    "llamadas_iniciales": cliente.llamadas,
+    "arrow_asignado_mb": (pa.total_allocated_bytes() - asignado) / 2**20,
+    "frame_mb": derivado.frame.memory_usage(deep=True).sum() / 2**20,
+    # Con la base cambiada: False si lo primero que se sirvió vino de la instantánea
+    "modificada_al_servir": bool((derivado.frame["nombre_actividad"] == "Actividad modificada").any()),
+}}
+# Refresco en segundo plano y escritura de la instantánea
+for hilo in threading.enumerate():
+    if hilo.name.startswith("catalogo-"):
+        hilo.join()
+with conexion.obtener_pool().cliente() as supabase:
+    derivado = catalogo.obtener_catalogo(supabase)
+for hilo in threading.enumerate():
+    if hilo.name.startswith("catalogo-"):
+        hilo.join()
+cache = catalogo.cache_catalogo
+pd.testing.assert_frame_equal(derivado.frame, catalogo.construir_frame(cache._registros))
+estadisticas = cache.estadisticas()
+resultado.update(
+    llamadas_totales=cliente.llamadas,
+    version=derivado.version,
+    adopciones=estadisticas["adopciones"],
+    refrescos_en_fondo=estadisticas["refrescos_en_fondo"],
+    refrescos_completos=estadisticas["refrescos_completos"],
+    refrescos_incrementales=estadisticas["refrescos_incrementales"],
+    firma=estadisticas["instantanea_firma"],
+    frame_igual=True,
+    modificada=bool((derivado.frame["nombre_actividad"] == "Actividad modificada").any()),
+)
+print(json.dumps(resultado))
+"""
+
+
+def correr(directorio: str, comisiones: int, latencia: float, ttl: float, cambiar: bool = False) -> dict:
+    codigo = ESCENARIO.format(
+        raiz=RAIZ, directorio=directorio, comisiones=comisiones, latencia=latencia,
+        ttl=str(ttl), cambiar=cambiar,
+    )
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, cwd=RAIZ)
+    if salida.returncode:
+        raise RuntimeError(salida.stderr)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def escrituras_concurrentes(directorio: str, versiones: int = 40) -> int:
+    # Un escritor publica versiones mientras varios lectores leen sello + archivos
+    import pyarrow as pa
+
+    sys.path.insert(0, RAIZ)
+    from instantanea import Instantanea
+
+    escritor = Instantanea(directorio, conservar=2)
+    errores = []
+    terminado = threading.Event()
+
+    def leer():
+        lector = Instantanea(directorio)
+        while not terminado.is_set():
+            sello = lector.sello()
+            if sello is None:
+                continue
+            try:
+                tabla = lector.leer(sello, "registros")
+                assert tabla.num_rows == sello["filas"], (tabla.num_rows, sello["filas"])
+            except FileNotFoundError:
+                pass  # versión ya limpiada entre sello() y leer(): se vuelve a pedir el sello
+            except Exception as e:
+                errores.append(repr(e))
+
+    lectores = [threading.Thread(target=leer) for _ in range(4)]
+    for hilo in lectores:
+        hilo.start()
+    for i in range(versiones):
+        tabla = pa.table({"id": [str(j) for j in range(1000 + i)]})
+        escritor.guardar({"registros": tabla}, marca=str(i))
+    terminado.set()
+    for hilo in lectores:
+        hilo.join()
+    if errores:
+        raise AssertionError(errores[:3])
+    return len([n for n in os.listdir(directorio) if n.endswith(".arrow")])
+
+
+def main():
+    comisiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    latencia = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+    directorio = tempfile.mkdtemp(prefix="instantanea_bench_")
+
+    frio = correr(directorio, comisiones, latencia, ttl=60)
+    # TTL corto: la instantánea del proceso anterior ya está vencida
+    reinicio = correr(directorio, comisiones, latencia, ttl=0.01, cambiar=True)
+    replica = correr(directorio, comisiones, latencia, ttl=60, cambiar=True)
+
+    print(f"{comisiones} comisiones, latencia {latencia * 1000:.0f} ms por consulta")
+    print(f"{'':32}{'frío':>10}{'reinicio':>10}{'réplica':>10}")
+    for clave in ("primer_catalogo_ms", "llamadas_totales", "arrow_asignado_mb", "frame_mb", "adopciones",
+                  "refrescos_en_fondo", "refrescos_incrementales", "modificada_al_servir", "modificada"):
+        valores = "".join(f"{float(r[clave]):10.2f}" for r in (frio, reinicio, replica))
+        print(f"{clave:32}{valores}")
+    assert frio["adopciones"] == 0 and frio["llamadas_iniciales"] > 0
+    assert reinicio["adopciones"] == 1 and not reinicio["modificada_al_servir"]
+    # Con un TTL tan corto el segundo pedido también encuentra la versión
+    # vencida y la revalida en segundo plano (stale-while-revalidate)
+    assert reinicio["refrescos_en_fondo"] >= 1 and reinicio["modificada"]
+    assert reinicio["firma"] != frio["firma"]
+    assert replica["llamadas_totales"] == 0 and replica["firma"] == reinicio["firma"] and replica["modificada"]
+    print(f"escrituras concurrentes: ok ({escrituras_concurrentes(tempfile.mkdtemp(prefix='instantanea_'))} "
+          f"archivos conservados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# ================== VERIFICACIÓN: INVALIDACIÓN DEL CATÁLOGO POR AVISOS ==================
+# Contra el Postgres local (python -m supabase_local): levanta varios procesos
+# de la app, cada uno con el catálogo cargado, la escucha de invalidacion.py y
+# un TTL de una hora (sin avisos no se refrescarían). Después cambia la base y
+# mide cuánto tarda cada proceso en servir la versión nueva:
+#   - comisión editada (trigger de comisiones, por id)
+#   - actividad renombrada (trigger de actividades: todas sus comisiones)
+#   - comisión cerrada (sale de la vista)
+#   - comisión nueva
+# Falla si algún proceso supera la demora máxima, si no ve un cambio o si
+# tuvo que volver a traer el catálogo completo. Los cambios se revierten al final.
+# Uso:
+#     python bench/bench_invalidacion.py [--dsn ...] [--procesos 3] [--demora-maxima-ms 1000]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+PROCESO = r"""
+import json, os, sys, time
+sys.path.insert(0, {raiz!r})
+os.environ.update(SUPABASE_URL="http://localhost", SUPABASE_ANON_KEY="bench",
+                  CATALOGO_INSTANTANEA="", CATALOGO_TTL_SEGUNDOS="3600")
+import catalogo, conexion, invalidacion, supabase_local
+
+backend = supabase_local.instalar({dsn!r})
+with conexion.obtener_pool().cliente() as supabase:
+    catalogo.obtener_catalogo(supabase)
+escucha = invalidacion.iniciar_escucha(catalogo.cache_catalogo, dsn={dsn!r})
+while not escucha.conectado:
+    time.sleep(0.01)
+llamadas_iniciales = backend.llamadas
+print("listo", flush=True)
+
+for linea in sys.stdin:
+    pedido = json.loads(linea)
+    if pedido.get("fin"):
+        break
+    vence = time.monotonic() + 10
+    visto = None
+    while time.monotonic() < vence:
+        # Lo mismo que pide una sesión: el frame derivado de la versión vigente
+        fila = catalogo.cache_catalogo.obtener_derivado(None).fila(pedido["id"])
+        if (fila is None) if pedido["ausente"] else (fila is not None and fila[pedido["campo"]] == pedido["valor"]):
+            visto = time.time()
+            break
+        time.sleep(0.002)
+    print(json.dumps({{"visto": visto}}), flush=True)
+
+print(json.dumps({{
+    "catalogo": catalogo.cache_catalogo.estadisticas(),
+    "escucha": escucha.estadisticas(),
+    "llamadas": backend.llamadas - llamadas_iniciales,
+}}, default=str), flush=True)
+"""
+
+
+def elegir_datos(cursor) -> dict:
+    cursor.execute(
+        "select id::text, link_externo from public.vista_comisiones_abiertas order by id_comision_sai limit 1"
+    )
+    comision, link = cursor.fetchone()
+    cursor.execute(
+        "select id_actividad, min(nombre_actividad), min(id::text), count(*) from public.vista_comisiones_abiertas "
+        "where id <> %s group by id_actividad having count(*) >= 2 order by id_actividad limit 1",
+        (comision,),
+    )
+    actividad, nombre, comision_actividad, cantidad = cursor.fetchone()
+    cursor.execute(
+        "select id::text, fecha_cierre from public.comisiones where id::text in "
+        "(select id::text from public.vista_comisiones_abiertas where id_actividad <> %s and id <> %s "
+        "order by id_comision_sai desc limit 1)",
+        (actividad, comision),
+    )
+    cierre, fecha_cierre = cursor.fetchone()
+    return {
+        "comision": comision, "link": link,
+        "actividad": actividad, "nombre": nombre, "comision_actividad": comision_actividad, "cantidad": cantidad,
+        "cierre": cierre, "fecha_cierre": fecha_cierre,
+        "nueva": str(uuid.uuid4()), "sai_nueva": f"COM-AVISO-{uuid.uuid4().hex[:6]}",
+    }
+
+
+def cambios(d: dict) -> list:
+    # (nombre, sql, parámetros, lo que debe ver cada proceso)
+    link = f"https://capacitacion.example/aviso/{uuid.uuid4().hex[:6]}"
+    nombre = d["nombre"] + " (renombrada)"
+    return [
+        ("comisión editada", "update public.comisiones set link_externo = %s, updated_at = now() where id = %s",
+         (link, d["comision"]), {"id": d["comision"], "campo": "link_externo", "valor": link, "ausente": False}),
+        ("actividad renombrada", "update public.actividades set nombre_actividad = %s where id_actividad = %s",
+         (nombre, d["actividad"]),
+         {"id": d["comision_actividad"], "campo": "nombre_actividad", "valor": nombre, "ausente": False}),
+        ("comisión cerrada", "update public.comisiones set fecha_cierre = current_date - 1 where id = %s",
+         (d["cierre"],), {"id": d["cierre"], "ausente": True}),
+        ("comisión nueva",
+         "insert into public.comisiones (id, id_comision_sai, id_actividad, fecha_desde, fecha_hasta, fecha_cierre, "
+         "modalidad_cursada, link_externo) values (%s, %s, %s, current_date + 30, current_date + 60, "
+         "current_date + 20, 'Virtual', null)",
+         (d["nueva"], d["sai_nueva"], d["actividad"]),
+         {"id": d["nueva"], "campo": "id_comision_sai", "valor": d["sai_nueva"], "ausente": False}),
+    ]
+
+
+def revertir(cursor, d: dict):
+    cursor.execute("update public.comisiones set link_externo = %s where id = %s", (d["link"], d["comision"]))
+    cursor.execute("update public.actividades set nombre_actividad = %s where id_actividad = %s",
+                   (d["nombre"], d["actividad"]))
+    cursor.execute("update public.comisiones set fecha_cierre = %s where id = %s", (d["fecha_cierre"], d["cierre"]))
+    cursor.execute("delete from public.comisiones where id = %s", (d["nueva"],))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dsn", default=os.environ.get("SUPABASE_LOCAL_DSN"))
+    parser.add_argument("--procesos", type=int, default=3)
+    parser.add_argument("--demora-maxima-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    import psycopg2
+
+    import supabase_local
+
+    dsn = args.dsn or supabase_local.iniciar_pgserver()
+    conexion = psycopg2.connect(dsn)
+    conexion.autocommit = True
+    cursor = conexion.cursor()
+    with open(os.path.join(RAIZ, "sql", "catalogo_notificaciones.sql"), encoding="utf-8") as f:
+        cursor.execute(f.read())
+    datos = elegir_datos(cursor)
+
+    procesos = [
+        subprocess.Popen([sys.executable, "-c", PROCESO.format(raiz=RAIZ, dsn=dsn)], cwd=RAIZ,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for _ in range(args.procesos)
+    ]
+    resultados = {}
+    try:
+        for p in procesos:
+            assert p.stdout.readline().strip() == "listo", "un proceso no pudo cargar el catálogo"
+
+        for nombre, sql, parametros, esperado in cambios(datos):
+            for p in procesos:
+                p.stdin.write(json.dumps(esperado) + "\n")
+                p.stdin.flush()
+            time.sleep(0.05)  # que todos estén mirando antes del cambio
+            inicio = time.time()
+            cursor.execute(sql, parametros)
+            vistos = [json.loads(p.stdout.readline())["visto"] for p in procesos]
+            resultados[nombre] = [None if v is None else (v - inicio) * 1000 for v in vistos]
+
+        for p in procesos:
+            p.stdin.write(json.dumps({"fin": True}) + "\n")
+            p.stdin.flush()
+        finales = [json.loads(p.stdout.readline()) for p in procesos]
+    finally:
+        revertir(cursor, datos)
+        for p in procesos:
+            p.kill()
+        conexion.close()
+
+    print(f"{args.procesos} procesos; demora desde el cambio en la base hasta servir la versión nueva (ms)")
+    print(f"{'cambio':24}{'p50':>8}{'máx':>8}")
+    for nombre, demoras in resultados.items():
+        validas = [x for x in demoras if x is not None]
+        print(f"{nombre:24}{statistics.median(validas) if validas else float('nan'):8.1f}"
+              f"{max(validas) if validas else float('nan'):8.1f}")
+    for i, final in enumerate(finales):
+        print(f"proceso {i}: {final['escucha']['avisos']} avisos, {final['escucha']['refrescos']} refrescos, "
+              f"{final['catalogo']['refrescos_dirigidos']} dirigidos, {final['llamadas']} consultas a la base, "
+              f"{final['catalogo']['filas_actualizadas']} filas actualizadas, "
+              f"{final['catalogo']['filas_eliminadas']} eliminadas")
+
+    for nombre, demoras in resultados.items():
+        assert None not in demoras, f"{nombre}: un proceso no vio el cambio"
+        assert max(demoras) <= args.demora_maxima_ms, f"{nombre}: {max(demoras):.0f} ms"
+    for final in finales:
+        assert final["catalogo"]["refrescos_completos"] == 1, "hubo refrescos completos además del inicial"
+        assert final["catalogo"]["refrescos_incrementales"] == 0, "hubo refrescos incrementales"
+    print(f"ok: todos los procesos vieron cada cambio en menos de {args.demora_maxima_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
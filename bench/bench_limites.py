@@ -0,0 +1,137 @@
+# ================== VERIFICACIÓN: LÍMITES DE "VALIDAR CUIL" ==================
+# Con AppTest y el cliente en memoria, cuenta cuántas RPC de elegibilidad
+# llegan a la base en cada patrón de abuso (ver limites.py):
+#   - impaciente: una sesión hace clic N veces con el mismo CUIL
+#   - enumeración: una sesión prueba N CUILs distintos (todos con dígito válido)
+#   - CUIL inexistente: N sesiones validan el mismo CUIL que no es de un agente
+#   - dígito inválido: una sesión insiste con un CUIL mal escrito
+# y el costo de un intento rechazado frente a uno que va a la base.
+# Uso:
+#     python bench/bench_limites.py [intentos] [latencia_ms]
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench")
+os.environ.setdefault("COLA_INSCRIPCIONES_SPOOL", tempfile.mkdtemp(prefix="spool_bench_"))
+os.environ.setdefault("CATALOGO_INSTANTANEA", tempfile.mkdtemp(prefix="instantanea_bench_"))
+
+from streamlit.testing.v1 import AppTest
+
+import limites
+from bench.carga_concurrente import cuil_sintetico
+from bench.cliente_memoria import _Respuesta, instalar
+
+INEXISTENTE = cuil_sintetico(999999)
+
+
+class _Inexistente:
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def execute(self):
+        self.cliente.esperar()
+        return _Respuesta([{
+            "existe": False, "ya_aprobo": False, "ya_inscripto": False,
+            "motivo_bloqueo": "no_encontrado", "datos": None,
+        }])
+
+
+def preparar_cliente(latencia: float):
+    cliente = instalar(500, latencia)
+    cliente.rpcs = 0
+    rpc = cliente.rpc
+
+    def contar(funcion: str, parametros: dict):
+        if funcion == "verificar_elegibilidad_inscripcion":
+            cliente.rpcs += 1
+            if parametros["cuil_input"] == INEXISTENTE:
+                return _Inexistente(cliente)
+        return rpc(funcion, parametros)
+
+    cliente.rpc = contar
+    return cliente
+
+
+def sesion() -> AppTest:
+    at = AppTest.from_file(os.path.join(RAIZ, "form.py"), default_timeout=60).run()
+    at.selectbox(key="actividad_key_default").select_index(1).run()
+    return at
+
+
+def validar(at: AppTest, cuil: str) -> float:
+    at.text_input(key="cuil_input").input(cuil)
+    inicio = time.perf_counter()
+    at.button(key="validar_cuil_btn").click().run()
+    assert not at.exception, at.exception
+    return time.perf_counter() - inicio
+
+
+def main():
+    intentos = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latencia = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+    cliente = preparar_cliente(latencia)
+    resultados = {}
+
+    def escenario(nombre, funcion):
+        antes = cliente.rpcs
+        funcion()
+        resultados[nombre] = cliente.rpcs - antes
+
+    tiempos_rpc, tiempos_rechazo = [], []
+
+    def impaciente():
+        at = sesion()
+        for _ in range(intentos):
+            antes = cliente.rpcs
+            tiempo = validar(at, cuil_sintetico(1))
+            if cliente.rpcs > antes:
+                tiempos_rpc.append(tiempo)
+            elif at.session_state["motivo_bloqueo"] == "limite":
+                tiempos_rechazo.append(tiempo)
+        assert at.session_state["motivo_bloqueo"] == "limite"
+
+    def enumeracion():
+        at = sesion()
+        for i in range(intentos):
+            validar(at, cuil_sintetico(1000 + i))
+
+    def inexistente():
+        for _ in range(intentos):
+            at = sesion()
+            validar(at, INEXISTENTE)
+            assert at.session_state["motivo_bloqueo"] == "no_encontrado"
+
+    def digito_invalido():
+        at = sesion()
+        for _ in range(intentos):
+            validar(at, "20123456780")
+
+    escenario("impaciente (mismo CUIL)", impaciente)
+    escenario("enumeración (CUILs distintos)", enumeracion)
+    escenario("CUIL inexistente (sesiones distintas)", inexistente)
+    escenario("dígito verificador inválido", digito_invalido)
+
+    print(f"{intentos} intentos por escenario, latencia {latencia * 1000:.0f} ms por RPC")
+    print(f"límites: sesión {limites.SESION_CAPACIDAD:.0f} + {limites.SESION_POR_MINUTO:.0f}/min, "
+          f"CUIL {limites.CUIL_CAPACIDAD:.0f} + {limites.CUIL_POR_MINUTO:.0f}/min, "
+          f"caché negativa {limites.NEGATIVOS_TTL_SEGUNDOS:.0f} s")
+    for nombre, rpcs in resultados.items():
+        print(f"{nombre:40}{rpcs:4d} RPC de {intentos} intentos")
+    print(f"clic que llega a la base (p50):         {statistics.median(tiempos_rpc) * 1000:8.1f} ms")
+    print(f"clic rechazado por límite (p50):        {statistics.median(tiempos_rechazo) * 1000:8.1f} ms")
+    print(limites.estadisticas())
+
+    assert resultados["impaciente (mismo CUIL)"] <= limites.CUIL_CAPACIDAD
+    assert resultados["enumeración (CUILs distintos)"] <= limites.SESION_CAPACIDAD
+    assert resultados["CUIL inexistente (sesiones distintas)"] == 1
+    assert resultados["dígito verificador inválido"] == 0
+
+
+if __name__ == "__main__":
+    main()
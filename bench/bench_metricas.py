@@ -0,0 +1,74 @@
+# ================== BENCHMARK: COSTO DE LA INSTRUMENTACIÓN ==================
+# Mide cuánto agrega metricas.medir() a una re-ejecución de form.py:
+#   - costo de una medición aislada (con y sin líneas JSON)
+#   - mediciones por re-ejecución completa (contadas en el registro)
+#   - tiempo de re-ejecución con métricas y el sobrecosto estimado (%)
+# Uso:
+#     python bench/bench_metricas.py [comisiones] [repeticiones]
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench")
+os.environ.setdefault("COLA_INSCRIPCIONES_SPOOL", tempfile.mkdtemp(prefix="spool_bench_"))
+os.environ.setdefault("CATALOGO_INSTANTANEA", tempfile.mkdtemp(prefix="instantanea_bench_"))
+
+from streamlit.testing.v1 import AppTest
+
+import metricas
+from bench.cliente_memoria import instalar
+
+
+def costo_medicion(n: int = 200000) -> float:
+    inicio = time.perf_counter()
+    for _ in range(n):
+        with metricas.medir("bench"):
+            pass
+    return (time.perf_counter() - inicio) / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    instalar(n)
+
+    costo = costo_medicion()
+    # Con líneas JSON (descartadas: se mide el armado, no la terminal)
+    metricas.LOG_JSON = True
+    metricas.logger.addHandler(logging.NullHandler())
+    metricas.logger.propagate = False
+    metricas.logger.setLevel(logging.INFO)
+    costo_json = costo_medicion(20000)
+    metricas.LOG_JSON = False
+
+    at = AppTest.from_file(os.path.join(RAIZ, "form.py"), default_timeout=60).run()
+    at.selectbox(key="actividad_key_default").select_index(1).run()
+    assert not at.exception, at.exception
+
+    metricas.registro.limpiar()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        at.run()
+        tiempos.append(time.perf_counter() - inicio)
+    mediciones = sum(f["total"] for f in metricas.registro.estadisticas().values()) / repeticiones
+    rerun = statistics.median(tiempos)
+
+    print(f"medición aislada:            {costo * 1e6:8.2f} µs")
+    print(f"medición con línea JSON:     {costo_json * 1e6:8.2f} µs")
+    print(f"mediciones por re-ejecución: {mediciones:8.1f}")
+    print(f"re-ejecución completa (p50): {rerun * 1000:8.2f} ms")
+    print(f"sobrecosto estimado:         {mediciones * costo / rerun * 100:8.3f} % "
+          f"({mediciones * costo_json / rerun * 100:.3f} % con JSON)")
+    print()
+    print(metricas.registro.exportar()[:1500])
+
+
+if __name__ == "__main__":
+    main()
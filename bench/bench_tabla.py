@@ -0,0 +1,75 @@
+# ================== BENCHMARK: HTML DE LA TABLA DE CURSOS ==================
+# Compara create_html_table original (iterrows + html +=) con el renderizado
+# por columnas de presentacion.py, en frío y con el fragmento en caché. Uso:
+#     python bench/bench_tabla.py [1000 5000 20000]
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from bench.datos_sinteticos import comisiones
+from catalogo import CatalogoDerivado
+from presentacion import COLUMNAS_TABLA, cache_tablas, crear_tabla_html, tabla_html
+
+
+def create_html_table_original(df):
+    table_id = f"coursesTable_{hash(str(df.values.tobytes())) % 10000}"
+    html = f'<table class="courses-table" id="{table_id}"><tbody>'
+    for _, row in df.iterrows():
+        onclick_code = f"selectActivity('{row['Actividad (Comisión)']}', this)"
+        html += f'<tr onclick="{onclick_code}">' \
+                + f'<td>{row["Actividad (Comisión)"]}</td>' \
+                + f'<td>{row["Fecha inicio"]}</td>' \
+                + f'<td>{row["Fecha fin"]}</td>' \
+                + f'<td>{row["Fecha cierre"]}</td>' \
+                + f'<td>{row["Créditos"]}</td>' \
+                + f'<td>{row["Modalidad"]}</td>' \
+                + f'<td>{row["Apto tramo"]}</td>'
+        if pd.notna(row["Ver más"]) and row["Ver más"]:
+            html += f'<td><a href="{row["Ver más"]}" target="_blank" onclick="event.stopPropagation()">Acceder</a></td>'
+        else:
+            html += '<td><span class="no-link">Sin enlace</span></td>'
+        html += '</tr>'
+    return html + "</tbody></table>"
+
+
+def medir(fn, repeticiones: int) -> tuple:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    tracemalloc.start()
+    fn()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return mejor, pico
+
+
+def main(tamanos):
+    print(f"{'filas':>8} {'variante':<14} {'tiempo ms':>10} {'pico MB':>9}")
+    for n in tamanos:
+        df = CatalogoDerivado(1, comisiones(n)).frame[["id"] + COLUMNAS_TABLA].reset_index(drop=True)
+        repeticiones = 3 if n <= 5_000 else 1
+
+        def en_cache():
+            tabla_html(df, 1, (n,))
+
+        cache_tablas.limpiar()
+        en_cache()
+        variantes = (
+            ("original", lambda: create_html_table_original(df)),
+            ("por columnas", lambda: crear_tabla_html(df, "coursesTable_bench")),
+            ("en caché", en_cache),
+        )
+        for nombre, fn in variantes:
+            tiempo, pico = medir(fn, repeticiones)
+            print(f"{n:>8} {nombre:<14} {tiempo * 1000:>10.2f} {pico / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1_000, 5_000, 20_000])
@@ -0,0 +1,202 @@
+# ================== VERIFICACIÓN: COALESCENCIA DE LLAMADAS (VUELO ÚNICO) ==================
+# N hilos piden lo mismo a la vez contra el cliente en memoria (con latencia)
+# y se cuenta cuántas consultas llegan a la base y cuántos clientes se piden
+# al pool (las sesiones le pasan el pool, como form.py):
+#   - VueloUnico solo: una llamada; el error de la líder llega a todas; si la
+#     líder se corta (st.rerun/st.stop) otra reintenta
+#   - catálogo frío: una consulta, un cliente y el mismo derivado para todas
+#   - catálogo vencido: todas responden al instante con la versión vigente y un
+#     solo refresco incremental corre en segundo plano
+#   - elegibilidad (elegibilidad.consultar_elegibilidad, lo que llama form.py):
+#     una RPC y un cliente del pool
+# Uso:
+#     python bench/bench_vuelo_unico.py [hilos] [latencia_ms]
+import os
+import statistics
+import sys
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench")
+os.environ["CATALOGO_INSTANTANEA"] = ""
+
+import catalogo
+import conexion
+import elegibilidad
+from bench.carga_concurrente import cuil_sintetico
+from bench.cliente_memoria import instalar
+from vuelo_unico import VueloUnico, vuelos
+
+
+def en_paralelo(hilos: int, funcion) -> tuple:
+    # (resultados, errores, segundos de cada hilo); arrancan todos juntos
+    barrera = threading.Barrier(hilos)
+    resultados, errores, tiempos = [None] * hilos, [None] * hilos, [0.0] * hilos
+
+    def correr(i):
+        barrera.wait()
+        inicio = time.perf_counter()
+        try:
+            resultados[i] = funcion()
+        except Exception as e:
+            errores[i] = e
+        tiempos[i] = time.perf_counter() - inicio
+
+    lista = [threading.Thread(target=correr, args=(i,)) for i in range(hilos)]
+    for hilo in lista:
+        hilo.start()
+    for hilo in lista:
+        hilo.join()
+    return resultados, errores, tiempos
+
+
+class _Corte(BaseException):
+    # Como st.rerun / st.stop: no es un error de la consulta
+    pass
+
+
+def vuelo_solo(hilos: int, latencia: float) -> dict:
+    vuelos = VueloUnico()
+    llamadas = []
+
+    def lenta():
+        llamadas.append(1)
+        time.sleep(latencia)
+        return {"valor": 1}
+
+    resultados, _, _ = en_paralelo(hilos, lambda: vuelos.hacer("clave", lenta))
+    assert len(llamadas) == 1, llamadas
+    assert all(r is resultados[0] for r in resultados)
+
+    def falla():
+        time.sleep(latencia)
+        raise RuntimeError("base caída")
+
+    _, errores, _ = en_paralelo(hilos, lambda: vuelos.hacer("error", falla))
+    assert all(isinstance(e, RuntimeError) for e in errores)
+
+    # La líder se corta: las que esperaban no heredan el corte
+    intentos = []
+
+    def cortada():
+        intentos.append(1)
+        time.sleep(latencia)
+        if len(intentos) == 1:
+            raise _Corte()
+        return "ok"
+
+    espera = []
+
+    def seguidora():
+        while not vuelos.en_vuelo("corte"):
+            time.sleep(0.001)
+        espera.append(vuelos.hacer("corte", cortada))
+
+    hilo = threading.Thread(target=seguidora)
+    hilo.start()
+    try:
+        vuelos.hacer("corte", cortada)
+    except _Corte:
+        pass
+    hilo.join()
+    assert espera == ["ok"] and len(intentos) == 2, (espera, intentos)
+    return {**vuelos.estadisticas(), "llamadas": len(llamadas)}
+
+
+def catalogo_frio(hilos: int, cliente, pool) -> dict:
+    cache = catalogo.CacheCatalogo()
+    antes, prestamos = cliente.llamadas, pool.prestamos
+
+    resultados, errores, tiempos = en_paralelo(hilos, lambda: cache.obtener_derivado(pool))
+    assert not any(errores), errores
+    assert all(r is resultados[0] for r in resultados)
+    llamadas = cliente.llamadas - antes
+    assert llamadas == 1, llamadas
+    assert pool.prestamos - prestamos == 1, pool.prestamos - prestamos
+    return {"llamadas": llamadas, "clientes": pool.prestamos - prestamos,
+            "p50_ms": statistics.median(tiempos) * 1000, "cache": cache}
+
+
+def catalogo_vencido(hilos: int, cliente, pool, cache) -> dict:
+    version = cache.version
+    cache._sincronizado_en -= cache.ttl + 1
+    antes, prestamos = cliente.llamadas, pool.prestamos
+
+    _, errores, tiempos = en_paralelo(hilos, lambda: cache.obtener(pool))
+    assert not any(errores), errores
+    al_responder = cliente.llamadas - antes
+    for hilo in threading.enumerate():
+        if hilo.name == "catalogo-refresco":
+            hilo.join()
+    llamadas = cliente.llamadas - antes
+    # Refresco incremental: marca de agua + ids vigentes; el cliente lo pide el hilo de fondo
+    assert cache.refrescos_en_fondo == 1 and cache.refrescos_incrementales == 1, cache.estadisticas()
+    assert llamadas == 2, llamadas
+    assert pool.prestamos - prestamos == 1, pool.prestamos - prestamos
+    return {
+        "llamadas": llamadas,
+        "clientes": pool.prestamos - prestamos,
+        "llamadas_al_responder": al_responder,
+        "version_servida": version,
+        "p50_ms": statistics.median(tiempos) * 1000,
+        "max_ms": max(tiempos) * 1000,
+        "vencidos_servidos": cache.vencidos_servidos,
+    }
+
+
+def elegibilidad_simultanea(hilos: int, cliente, pool) -> dict:
+    cuil, comision, actividad = cuil_sintetico(7), "c-1", "a-1"
+    rpcs = []
+    rpc = cliente.rpc
+
+    def contar(funcion, parametros):
+        rpcs.append(funcion)
+        return rpc(funcion, parametros)
+
+    cliente.rpc = contar
+    prestamos, compartidas = pool.prestamos, vuelos.compartidas
+    try:
+        resultados, errores, tiempos = en_paralelo(
+            hilos, lambda: elegibilidad.consultar_elegibilidad(pool, cuil, comision, actividad)
+        )
+    finally:
+        cliente.rpc = rpc
+    assert not any(errores), errores
+    assert len(rpcs) == 1, rpcs
+    # Solo la llamada líder pidió un cliente; las demás esperaron sin ocupar uno
+    assert pool.prestamos - prestamos == 1, pool.prestamos - prestamos
+    assert vuelos.compartidas - compartidas == hilos - 1
+    # Cada sesión recibe su propia copia de la fila
+    assert all(r == resultados[0] for r in resultados)
+    assert len({id(r) for r in resultados}) == hilos
+    return {"llamadas": len(rpcs), "clientes": pool.prestamos - prestamos,
+            "p50_ms": statistics.median(tiempos) * 1000}
+
+
+def main():
+    hilos = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latencia = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.1
+    cliente = instalar(2000, latencia)
+    pool = conexion.obtener_pool()
+
+    solo = vuelo_solo(hilos, latencia)
+    frio = catalogo_frio(hilos, cliente, pool)
+    vencido = catalogo_vencido(hilos, cliente, pool, frio.pop("cache"))
+    rpc = elegibilidad_simultanea(hilos, cliente, pool)
+
+    print(f"{hilos} pedidos simultáneos, latencia {latencia * 1000:.0f} ms por consulta, pool de {pool.tamano}")
+    print(f"{'escenario':28}{'consultas':>10}{'clientes':>10}{'p50 ms':>10}")
+    print(f"{'VueloUnico solo':28}{solo['llamadas']:10d}{'':>10}{'':>10}")
+    print(f"{'catálogo frío':28}{frio['llamadas']:10d}{frio['clientes']:10d}{frio['p50_ms']:10.1f}")
+    print(f"{'catálogo vencido (SWR)':28}{vencido['llamadas']:10d}{vencido['clientes']:10d}{vencido['p50_ms']:10.1f}"
+          f"   (máx {vencido['max_ms']:.1f} ms, {vencido['llamadas_al_responder']} consultas del refresco ya iniciadas al responder)")
+    print(f"{'RPC de elegibilidad':28}{rpc['llamadas']:10d}{rpc['clientes']:10d}{rpc['p50_ms']:10.1f}")
+    print(f"VueloUnico: {solo['compartidas']} llamadas compartidas, tasa {solo['tasa_compartidas']:.2f}")
+    print(f"ok: {hilos} pedidos iguales, una consulta a la base por escenario")
+
+
+if __name__ == "__main__":
+    main()
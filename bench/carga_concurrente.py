@@ -0,0 +1,245 @@
+# ================== PRUEBA DE CARGA: SESIONES CONCURRENTES ==================
+# Simula muchas personas inscribiéndose a la vez. Cada sesión es un AppTest
+# que recorre los cuatro pasos de form.py (filtrar, seleccionar, validar CUIL,
+# enviar) contra el cliente en memoria o, con --dsn, contra el Postgres local
+# de supabase_local (python -m supabase_local), con latencia configurable.
+# AppTest no se puede usar desde varios hilos (Runtime global, compilación del
+# script), así que las sesiones concurrentes corren en procesos separados:
+# --concurrencia es la cantidad de procesos, cada uno con su pool y sus cachés.
+# Informa p50/p95/p99 por paso, throughput, CPU y memoria por sesión, y guarda
+# el resultado en JSON para comparar entre commits. Uso:
+#     python bench/carga_concurrente.py --sesiones 200 --concurrencia 8 --latencia-ms 20
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench")
+
+import numpy as np
+
+PASOS = ["carga", "filtrar", "seleccionar", "validar", "enviar"]
+MULTIPLICADORES_CUIL = [5, 4, 3, 2, 7, 6, 5, 4, 3, 2]
+
+
+def cuil_sintetico(numero: int) -> str:
+    base = f"20{20000000 + numero:08d}"
+    verificador = 11 - sum(int(d) * m for d, m in zip(base, MULTIPLICADORES_CUIL)) % 11
+    verificador = {11: 0, 10: 9}.get(verificador, verificador)
+    return base + str(verificador)
+
+
+def memoria_rss() -> int:
+    # RSS actual en bytes (Linux); si no hay /proc, el máximo de getrusage
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# ========== PROCESOS DE TRABAJO ==========
+_config = {}
+
+
+def iniciar_proceso(dsn: str, comisiones: int, latencia: float, variacion: float, semilla: int, timeout: float):
+    # AppTest fuera de un servidor avisa por cada hilo sin contexto de script
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    # Spool propio por proceso, antes de importar la app
+    os.environ["COLA_INSCRIPCIONES_SPOOL"] = tempfile.mkdtemp(prefix="spool_carga_")
+    os.environ.setdefault("CATALOGO_INSTANTANEA", tempfile.mkdtemp(prefix="instantanea_carga_"))
+    if dsn:
+        import supabase_local
+
+        backend = supabase_local.instalar(dsn, latencia, variacion)
+    else:
+        from bench.cliente_memoria import instalar
+
+        backend = instalar(comisiones, latencia, variacion)
+    _config.update(backend=backend, semilla=semilla, timeout=timeout)
+    # Una sesión previa calienta las cachés del proceso (catálogo, tablas),
+    # como en un servidor que ya está atendiendo
+    sesion(-1, semilla, timeout)
+    _config.update(cpu=time.process_time(), rss=memoria_rss(), llamadas=_config["backend"].llamadas)
+
+
+def correr_sesion(numero: int) -> dict:
+    resultado = sesion(numero, _config["semilla"], _config["timeout"])
+    resultado["pid"] = os.getpid()
+    return resultado
+
+
+def cerrar_proceso(_=None) -> dict:
+    # Vacía la cola de inscripciones y devuelve los totales del proceso
+    import conexion
+    from cola_inscripciones import obtener_cola
+
+    cola = obtener_cola(conexion.obtener_pool())
+    cola.detener()
+    return {
+        "pid": os.getpid(),
+        "cpu": time.process_time() - _config["cpu"],
+        "rss_inicial": _config["rss"],
+        "rss_final": memoria_rss(),
+        "llamadas_backend": _config["backend"].llamadas - _config["llamadas"],
+        "cola": cola.estadisticas(),
+        "pool": conexion.obtener_pool().estadisticas(),
+    }
+
+
+def sesion(numero: int, semilla: int, timeout: float) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    rnd = random.Random(semilla + numero)
+    tiempos = {}
+
+    def medir(paso, accion):
+        inicio = time.perf_counter()
+        at = accion()
+        tiempos[paso] = time.perf_counter() - inicio
+        if at.exception:
+            raise RuntimeError(f"{paso}: {at.exception[0].message}")
+        return at
+
+    try:
+        at = medir("carga", lambda: AppTest.from_file(os.path.join(RAIZ, "form.py"), default_timeout=timeout).run())
+        modalidades = at.selectbox[1].options
+        medir("filtrar", lambda: at.selectbox[1].select(rnd.choice(modalidades)).run())
+        opciones = at.selectbox(key="actividad_key_default").options
+        if len(opciones) < 2:
+            # El filtro no dejó comisiones en el catálogo: se vuelve a "Todos"
+            at.selectbox[1].select_index(0).run()
+            opciones = at.selectbox(key="actividad_key_default").options
+        medir("seleccionar", lambda: at.selectbox(key="actividad_key_default").select_index(rnd.randrange(1, len(opciones))).run())
+        at.text_input(key="cuil_input").input(cuil_sintetico(numero))
+        medir("validar", lambda: at.button(key="validar_cuil_btn").click().run())
+        at.text_input(key="titulo").input("LICENCIATURA")
+        at.text_area(key="tareas_desarrolladas").input("tareas administrativas")
+        at = medir("enviar", lambda: at.button(key="enviar_inscripcion").click().run())
+        if not at.success:
+            raise RuntimeError("enviar: no se mostró la confirmación")
+        return {"ok": True, "tiempos": tiempos}
+    except Exception as e:
+        return {"ok": False, "tiempos": tiempos, "error": str(e)}
+
+
+def percentiles(valores: list) -> dict:
+    if not valores:
+        return {}
+    ms = np.array(valores) * 1000
+    return {
+        "n": len(valores),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "max_ms": round(float(ms.max()), 1),
+    }
+
+
+def commit_actual() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sesiones", type=int, default=50)
+    parser.add_argument("--concurrencia", type=int, default=10)
+    parser.add_argument("--dsn", help="Postgres preparado con python -m supabase_local (por defecto, en memoria)")
+    parser.add_argument("--comisiones", type=int, default=2000, help="solo para el cliente en memoria")
+    parser.add_argument("--latencia-ms", type=float, default=20.0)
+    parser.add_argument("--variacion-ms", type=float, default=5.0)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--salida", default=os.path.join(RAIZ, "bench", "resultados"))
+    args = parser.parse_args()
+
+    # AppTest reemplaza __main__ en los procesos hijos: las funciones se pasan
+    # desde el módulo importado para que se puedan deserializar allá
+    from bench import carga_concurrente as modulo
+
+    with ProcessPoolExecutor(
+        max_workers=args.concurrencia,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=modulo.iniciar_proceso,
+        initargs=(args.dsn, args.comisiones, args.latencia_ms / 1000, args.variacion_ms / 1000, args.semilla, args.timeout),
+    ) as ejecutor:
+        # Todos los procesos listos (y calientes) antes de empezar a medir
+        list(ejecutor.map(time.sleep, [0.1] * args.concurrencia))
+        inicio = time.perf_counter()
+        resultados = list(ejecutor.map(modulo.correr_sesion, range(args.sesiones)))
+        duracion = time.perf_counter() - inicio
+        procesos = {}
+        while len(procesos) < len({r["pid"] for r in resultados}):
+            for total in ejecutor.map(modulo.cerrar_proceso, range(args.concurrencia)):
+                procesos[total["pid"]] = total
+    procesos = list(procesos.values())
+
+    completas = [r for r in resultados if r["ok"]]
+    por_paso = {paso: percentiles([r["tiempos"][paso] for r in resultados if paso in r["tiempos"]]) for paso in PASOS}
+    reruns = sum(len(r["tiempos"]) for r in resultados)
+    informe = {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit_actual(),
+        "python": platform.python_version(),
+        "configuracion": vars(args),
+        "sesiones_ok": len(completas),
+        "sesiones_error": len(resultados) - len(completas),
+        "errores": sorted({r["error"] for r in resultados if not r["ok"]})[:10],
+        "duracion_s": round(duracion, 2),
+        "throughput": {
+            "inscripciones_por_s": round(len(completas) / duracion, 2),
+            "reruns_por_s": round(reruns / duracion, 2),
+        },
+        "latencia_por_paso": por_paso,
+        "cpu_por_sesion_ms": round(sum(p["cpu"] for p in procesos) / max(1, len(resultados)) * 1000, 1),
+        "memoria": {
+            "rss_inicial_mb_por_proceso": round(np.mean([p["rss_inicial"] for p in procesos]) / 2**20, 1),
+            "rss_final_mb_por_proceso": round(np.mean([p["rss_final"] for p in procesos]) / 2**20, 1),
+            "por_sesion_kb": round(
+                sum(p["rss_final"] - p["rss_inicial"] for p in procesos) / max(1, len(resultados)) / 1024, 1
+            ),
+        },
+        "llamadas_backend": sum(p["llamadas_backend"] for p in procesos),
+        "inscripciones_confirmadas_con_calentamiento": sum(p["cola"]["confirmadas"] for p in procesos),
+        "procesos": procesos,
+    }
+
+    os.makedirs(args.salida, exist_ok=True)
+    nombre = f"carga_{informe['commit'] or 'local'}_{args.sesiones}x{args.concurrencia}_{int(time.time())}.json"
+    ruta = os.path.join(args.salida, nombre)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+
+    print(f"{informe['sesiones_ok']}/{len(resultados)} sesiones completas en {duracion:.1f}s "
+          f"({informe['throughput']['inscripciones_por_s']} inscripciones/s)")
+    print(f"{'paso':<12}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    for paso in PASOS:
+        p = por_paso[paso]
+        if p:
+            print(f"{paso:<12}{p['p50_ms']:>9}{p['p95_ms']:>9}{p['p99_ms']:>9}")
+    print(f"CPU por sesión: {informe['cpu_por_sesion_ms']} ms · memoria por sesión: {informe['memoria']['por_sesion_kb']} KB")
+    for error in informe["errores"]:
+        print("error:", error)
+    print(f"Resultado guardado en {ruta}")
+
+
+if __name__ == "__main__":
+    main()
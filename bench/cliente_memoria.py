@@ -0,0 +1,107 @@
+# ================== CLIENTE SUPABASE EN MEMORIA PARA BENCHMARKS ==================
+# Imita lo que la app usa del cliente (table/select/gte/in_/upsert/insert/rpc)
+# sobre listas en memoria, para medir la app sin red ni base. La latencia de
+# cada llamada se puede simular (sleep, como una espera de red: libera el GIL).
+import random
+import threading
+import time
+
+from bench.datos_sinteticos import comisiones
+
+
+class _Respuesta:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Consulta:
+    def __init__(self, db, tabla: str):
+        self.db = db
+        self.tabla = tabla
+        self.columnas = None
+        self.condiciones = []
+        self.filas = None
+
+    def select(self, columnas: str):
+        self.columnas = [c.strip() for c in columnas.split(",")]
+        return self
+
+    def gte(self, columna: str, valor):
+        self.condiciones.append(lambda r: r.get(columna) is not None and r[columna] >= valor)
+        return self
+
+    def in_(self, columna: str, valores):
+        valores = set(valores)
+        self.condiciones.append(lambda r: r.get(columna) in valores)
+        return self
+
+    def insert(self, filas, **_):
+        self.filas = filas if isinstance(filas, list) else [filas]
+        return self
+
+    def upsert(self, filas, **_):
+        return self.insert(filas)
+
+    def execute(self):
+        self.db.esperar()
+        if self.filas is not None:
+            with self.db.lock:
+                self.db.tablas.setdefault(self.tabla, []).extend(self.filas)
+            return _Respuesta(self.filas)
+        filas = [r for r in self.db.tablas.get(self.tabla, []) if all(c(r) for c in self.condiciones)]
+        if self.columnas and self.columnas != ["*"]:
+            filas = [{c: r.get(c) for c in self.columnas} for r in filas]
+        return _Respuesta(filas)
+
+
+class _Rpc:
+    def __init__(self, db, funcion: str, parametros: dict):
+        self.db = db
+        self.funcion = funcion
+        self.parametros = parametros
+
+    def execute(self):
+        self.db.esperar()
+        datos = {"nombre": "AGENTE", "apellido": "DE PRUEBA", "email": "agente@example.org"}
+        if self.funcion == "verificar_elegibilidad_inscripcion":
+            return _Respuesta([{
+                "existe": True, "ya_aprobo": False, "ya_inscripto": False,
+                "motivo_bloqueo": "", "datos": datos,
+            }])
+        if self.funcion == "verificar_elegibilidad_lote":
+            return _Respuesta([
+                {"cuil": c, "existe": True, "ya_aprobo": False, "ya_inscripto": False,
+                 "motivo_bloqueo": "", "datos": datos}
+                for c in self.parametros["cuiles_input"]
+            ])
+        return _Respuesta([])
+
+
+class ClienteMemoria:
+    def __init__(self, n_comisiones: int = 500, latencia: float = 0.0, variacion: float = 0.0):
+        self.tablas = {"vista_comisiones_abiertas": comisiones(n_comisiones)}
+        self.latencia = latencia
+        self.variacion = variacion
+        self.lock = threading.Lock()
+        self.llamadas = 0
+
+    def esperar(self):
+        with self.lock:
+            self.llamadas += 1
+        if self.latencia or self.variacion:
+            time.sleep(max(0.0, self.latencia + random.uniform(-self.variacion, self.variacion)))
+
+    def table(self, nombre: str):
+        return _Consulta(self, nombre)
+
+    def rpc(self, funcion: str, parametros: dict):
+        return _Rpc(self, funcion, parametros)
+
+
+def instalar(n_comisiones: int = 500, latencia: float = 0.0, variacion: float = 0.0) -> ClienteMemoria:
+    # El pool de la app entrega este cliente en lugar de crear uno real
+    import conexion
+
+    cliente = ClienteMemoria(n_comisiones, latencia, variacion)
+    conexion.PoolSupabase._crear = lambda self: cliente
+    return cliente
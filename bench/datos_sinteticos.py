@@ -0,0 +1,36 @@
+# ================== DATOS SINTÉTICOS PARA BENCHMARKS ==================
+# Filas con la misma forma que vista_comisiones_abiertas y cardinalidades
+# parecidas a la oferta real (pocos organismos/modalidades, muchas actividades).
+import random
+from datetime import date, timedelta
+
+ORGANISMOS = [f"ORGANISMO {i:02d}" for i in range(40)]
+MODALIDADES = ["Virtual", "Presencial", "Semipresencial", "Virtual asincrónica"]
+TEMAS = [
+    "Capacitación", "Gestión", "Administración", "Liderazgo", "Ética pública",
+    "Presupuesto", "Comunicación", "Innovación", "Atención ciudadana", "Datos",
+]
+
+
+def comisiones(n: int, semilla: int = 0) -> list:
+    rnd = random.Random(semilla)
+    base = date(2026, 3, 1)
+    filas = []
+    for i in range(n):
+        desde = base + timedelta(days=rnd.randint(0, 180))
+        filas.append({
+            "id": f"00000000-0000-4000-8000-{i:012d}",
+            "id_comision_sai": f"COM-{i:06d}",
+            "organismo": rnd.choice(ORGANISMOS),
+            "id_actividad": f"ACT-{i // 4:05d}",
+            "nombre_actividad": f"{rnd.choice(TEMAS)} {rnd.choice(TEMAS).lower()} nivel {i % 7 + 1}",
+            "fecha_desde": desde.isoformat(),
+            "fecha_hasta": (desde + timedelta(days=rnd.randint(7, 90))).isoformat(),
+            "fecha_cierre": (desde - timedelta(days=rnd.randint(1, 15))).isoformat(),
+            "creditos": rnd.choice([None, 0, 3, 5, 8, 10, 12, 15, 20, 30, 40]),
+            "modalidad_cursada": rnd.choice(MODALIDADES),
+            "link_externo": rnd.choice([None, f"https://capacitacion.example/act/{i}"]),
+            "apto_tramo": rnd.choice([None, "Sí", "No"]),
+            "updated_at": f"2026-01-01T00:00:{i % 60:02d}+00:00",
+        })
+    return filas
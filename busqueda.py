@@ -0,0 +1,116 @@
+# ================== BÚSQUEDA DE COMISIONES (ÍNDICE DE TRIGRAMAS) ==================
+# Búsqueda del lado del servidor para el paso 2: en lugar de mandar al
+# navegador todas las etiquetas del catálogo, se muestran las mejores N
+# coincidencias. Texto de cada comisión = nombre de la actividad + organismo +
+# código de comisión, normalizado sin tildes ni mayúsculas ("capacitación" ==
+# "capacitacion"). El índice (trigrama -> posiciones de fila, como pg_trgm) se
+# arma una vez por versión del catálogo; una consulta suma coincidencias con
+# np.bincount sobre las listas de los trigramas de la consulta.
+import math
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from cache_lru import CacheLRU
+
+COLUMNAS_BUSQUEDA = ["nombre_actividad", "organismo", "id_comision_sai"]
+MAX_RESULTADOS = int(os.environ.get("BUSQUEDA_RESULTADOS", "50"))
+# Fracción mínima de los trigramas de la consulta que debe tener una comisión
+UMBRAL_COINCIDENCIA = float(os.environ.get("BUSQUEDA_UMBRAL", "0.5"))
+MAX_CONSULTAS_MEMORIZADAS = 256
+
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+def normalizar(texto: str) -> str:
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return _NO_ALFANUMERICO.sub(" ", texto.lower()).strip()
+
+
+def normalizar_serie(serie: pd.Series) -> pd.Series:
+    # normalizar() una vez por valor distinto (nombres y organismos se repiten)
+    codigos, unicos = pd.factorize(serie.astype(object).where(serie.notna(), ""))
+    normalizados = np.array([normalizar(v) for v in unicos] + [""], dtype=object)
+    return pd.Series(normalizados[codigos], index=serie.index, dtype=object)
+
+
+def trigramas(texto: str, parcial: bool = False) -> set:
+    # Cada palabra con dos espacios adelante y uno atrás (como pg_trgm). Con
+    # parcial=True la última palabra queda abierta: se está escribiendo
+    palabras = texto.split()
+    resultado = set()
+    for i, palabra in enumerate(palabras):
+        relleno = "  " + palabra + ("" if parcial and i == len(palabras) - 1 else " ")
+        resultado.update(relleno[j:j + 3] for j in range(len(relleno) - 2))
+    return resultado
+
+
+class IndiceBusqueda:
+    def __init__(self, frame: pd.DataFrame, max_memorizadas: int = MAX_CONSULTAS_MEMORIZADAS):
+        texto = normalizar_serie(frame[COLUMNAS_BUSQUEDA[0]])
+        for columna in COLUMNAS_BUSQUEDA[1:]:
+            texto = texto + " " + normalizar_serie(frame[columna])
+        self.textos = texto.tolist()
+        self.filas = len(self.textos)
+        self.listas = self._armar_listas(texto)
+        self._memo = CacheLRU(max_memorizadas)
+
+    def _armar_listas(self, texto: pd.Series) -> dict:
+        # Los trigramas se calculan una vez por palabra distinta (los nombres de
+        # actividad se repiten entre comisiones) y los pares (trigrama, fila) se
+        # arman con NumPy: trigrama -> posiciones de fila ordenadas, sin repetidos
+        palabras = texto.str.split().explode().dropna()
+        codigos, unicas = pd.factorize(palabras)
+        ids = {}
+        por_palabra = [
+            np.array([ids.setdefault(t, len(ids)) for t in trigramas(p)], dtype=np.int64)
+            for p in unicas
+        ]
+        if not ids:
+            return {}
+        largos = np.array([len(t) for t in por_palabra])
+        inicios = np.concatenate(([0], np.cumsum(largos)[:-1]))
+        planos = np.concatenate(por_palabra)
+
+        cantidad = largos[codigos]
+        desplazamiento = np.arange(cantidad.sum()) - np.repeat(np.cumsum(cantidad) - cantidad, cantidad)
+        trigrama = planos[np.repeat(inicios[codigos], cantidad) + desplazamiento]
+        fila = np.repeat(palabras.index.to_numpy(dtype=np.int64), cantidad)
+
+        # Orden por trigrama y luego por fila; se descartan los pares repetidos
+        pares = np.sort(trigrama * self.filas + fila)
+        pares = pares[np.concatenate(([True], pares[1:] != pares[:-1]))]
+        trigrama, fila = np.divmod(pares, self.filas)
+        cortes = np.flatnonzero(np.diff(trigrama)) + 1
+        nombres = {i: t for t, i in ids.items()}
+        return {
+            nombres[int(grupo[0])]: filas.astype(np.int32)
+            for grupo, filas in zip(np.split(trigrama, cortes), np.split(fila, cortes))
+        }
+
+    def buscar(self, consulta: str, limite: int = MAX_RESULTADOS) -> np.ndarray:
+        # Posiciones de fila de las mejores coincidencias: primero las que contienen
+        # la consulta literal, después por trigramas en común; a igualdad, orden del catálogo
+        consulta = normalizar(consulta)
+        clave = (consulta, limite)
+        resultado = self._memo.obtener(clave)
+        if resultado is not None:
+            return resultado
+
+        buscados = trigramas(consulta, parcial=True)
+        listas = [self.listas[t] for t in buscados if t in self.listas]
+        if not listas:
+            resultado = np.empty(0, dtype=np.int32)
+        else:
+            cuentas = np.bincount(np.concatenate(listas), minlength=self.filas)
+            minimo = max(1, math.ceil(len(buscados) * UMBRAL_COINCIDENCIA))
+            candidatos = np.flatnonzero(cuentas >= minimo)
+            literal = np.fromiter((consulta in self.textos[i] for i in candidatos), bool, len(candidatos))
+            orden = np.lexsort((candidatos, -cuentas[candidatos], ~literal))
+            resultado = candidatos[orden[:limite]]
+
+        self._memo.guardar(clave, resultado)
+        return resultado
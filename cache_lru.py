@@ -0,0 +1,82 @@
+# ================== CACHÉ LRU ACOTADA ==================
+# Caché en memoria del proceso, acotada por cantidad de entradas y
+# (opcionalmente) por tamaño total y antigüedad (TTL). Segura para usar desde varios hilos.
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    def __init__(self, max_entradas: int, max_bytes: int = None, tamano=len, ttl: float = None):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._tamano = tamano
+        self._datos = OrderedDict()   # clave -> (valor, bytes, vencimiento)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Estadísticas
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.expirados = 0
+
+    def obtener(self, clave, defecto=None):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada[2] is not None and entrada[2] <= time.monotonic():
+                del self._datos[clave]
+                self._bytes -= entrada[1]
+                self.expirados += 1
+                entrada = None
+            if entrada is None:
+                self.fallos += 1
+                return defecto
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[0]
+
+    def guardar(self, clave, valor):
+        bytes_valor = self._tamano(valor) if self.max_bytes is not None else 0
+        vencimiento = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            anterior = self._datos.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+            if self.max_bytes is not None and bytes_valor > self.max_bytes:
+                return  # no entra nunca: no se desaloja todo lo demás por él
+            self._datos[clave] = (valor, bytes_valor, vencimiento)
+            self._bytes += bytes_valor
+            while len(self._datos) > self.max_entradas or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, (_, liberados, _) = self._datos.popitem(last=False)
+                self._bytes -= liberados
+                self.desalojos += 1
+
+    def invalidar(self, clave):
+        with self._lock:
+            entrada = self._datos.pop(clave, None)
+            if entrada is not None:
+                self._bytes -= entrada[1]
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+    def estadisticas(self) -> dict:
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._datos),
+            "bytes": self._bytes,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "desalojos": self.desalojos,
+            "expirados": self.expirados,
+        }
@@ -0,0 +1,159 @@
+# ================== CARGA MASIVA DE PREINSCRIPCIONES ==================
+# Para coordinadores de RRHH: un archivo CSV/XLSX con CUILs + una comisión.
+# Los dígitos verificadores se validan de una vez con NumPy, la elegibilidad se
+# resuelve en lotes contra verificar_elegibilidad_lote y las filas aceptadas se
+# insertan en cursos_inscripciones en inserciones múltiples.
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from cola_inscripciones import CONFLICTO
+from inscripciones import TABLA_INSCRIPCIONES, armar_inscripcion
+from metricas import medir
+
+MULTIPLICADORES_CUIL = np.array([5, 4, 3, 2, 7, 6, 5, 4, 3, 2])
+LOTE_ELEGIBILIDAD = int(os.environ.get("CARGA_MASIVA_LOTE_ELEGIBILIDAD", "1000"))
+LOTE_INSERCION = int(os.environ.get("CARGA_MASIVA_LOTE_INSERCION", "500"))
+
+# Columnas opcionales del archivo que completan la inscripción
+COLUMNAS_OPCIONALES = ["nivel_educativo", "titulo", "tareas_desarrolladas", "email_alternativo"]
+
+MOTIVOS = {
+    "cuil_invalido": "CUIL/CUIT inválido",
+    "duplicado": "CUIL repetido en el archivo",
+    "no_encontrado": "No corresponde a un agente activo",
+    "ya_aprobo": "Ya realizó esta actividad y fue APROBADA",
+    "ya_inscripto": "Ya está inscripto en esta comisión",
+    "error_consulta": "Error al verificar en la base de datos",
+    "error_insercion": "Error al guardar la inscripción",
+}
+
+
+def validar_cuiles(cuiles: pd.Series) -> np.ndarray:
+    # Versión vectorizada de validar_cuil (form.py): 11 dígitos + dígito verificador.
+    # Solo dígitos ASCII: \d también acepta otros (ancho completo, arábigos, ...)
+    cuiles = cuiles.fillna("").astype(str)
+    formato = cuiles.str.fullmatch(r"[0-9]{11}").to_numpy(dtype=bool)
+    validos = np.zeros(len(cuiles), dtype=bool)
+    if formato.any():
+        texto = "".join(cuiles[formato]).encode("ascii")
+        digitos = np.frombuffer(texto, dtype=np.uint8).reshape(-1, 11).astype(np.int64) - ord("0")
+        verificador = 11 - (digitos[:, :10] @ MULTIPLICADORES_CUIL) % 11
+        verificador[verificador == 11] = 0
+        verificador[verificador == 10] = 9
+        validos[formato] = verificador == digitos[:, 10]
+    return validos
+
+
+def leer_archivo(nombre: str, contenido: bytes) -> pd.DataFrame:
+    if nombre.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(io.BytesIO(contenido), dtype=str)
+    else:
+        df = pd.read_csv(io.BytesIO(contenido), dtype=str, sep=None, engine="python")
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    if "cuil" not in df.columns:
+        df = df.rename(columns={df.columns[0]: "cuil"})
+    # Sin guiones, puntos ni espacios; los dígitos no ASCII se quitan también y
+    # el CUIL queda inválido (no es un número que se pueda cargar así)
+    df["cuil"] = df["cuil"].fillna("").astype(str).str.replace(r"[^0-9]", "", regex=True)
+    return df
+
+
+def verificar_lote(supabase, cuiles: list, comision_id: str, id_actividad: str) -> dict:
+    # cuil -> fila de elegibilidad, en llamadas de LOTE_ELEGIBILIDAD CUILs
+    resultado = {}
+    for inicio in range(0, len(cuiles), LOTE_ELEGIBILIDAD):
+        with medir("rpc.verificar_elegibilidad_lote"):
+            response = supabase.rpc("verificar_elegibilidad_lote", {
+                "cuiles_input": cuiles[inicio:inicio + LOTE_ELEGIBILIDAD],
+                "comision_id_input": comision_id,
+                "id_actividad_input": id_actividad
+            }).execute()
+        for fila in response.data or []:
+            resultado[fila["cuil"]] = fila
+    return resultado
+
+
+def insertar_lote(supabase, filas: list) -> list:
+    # Devuelve, por cada fila, None si se insertó o el error del lote que la contenía
+    errores = []
+    for inicio in range(0, len(filas), LOTE_INSERCION):
+        lote = filas[inicio:inicio + LOTE_INSERCION]
+        try:
+            # Idempotente: reprocesar el mismo archivo no duplica inscripciones
+            with medir("insercion_masiva"):
+                supabase.table(TABLA_INSCRIPCIONES).upsert(
+                    lote, returning="minimal", ignore_duplicates=True, on_conflict=CONFLICTO
+                ).execute()
+            errores.extend([None] * len(lote))
+        except Exception as e:
+            errores.extend([str(e)] * len(lote))
+    return errores
+
+
+def procesar_carga(pool, df: pd.DataFrame, comision_id: str, id_actividad: str) -> pd.DataFrame:
+    informe = pd.DataFrame({
+        "fila": np.arange(2, len(df) + 2),  # fila del archivo (1 = encabezado)
+        "cuil": df["cuil"].to_numpy(),
+        "estado": "Rechazado",
+        "motivo": "",
+    })
+
+    validos = validar_cuiles(df["cuil"])
+    informe.loc[~validos, "motivo"] = MOTIVOS["cuil_invalido"]
+    duplicados = validos & df["cuil"].duplicated(keep="first").to_numpy()
+    informe.loc[duplicados, "motivo"] = MOTIVOS["duplicado"]
+    pendientes = np.flatnonzero(validos & ~duplicados)
+    if not len(pendientes):
+        return informe
+
+    cuiles = df["cuil"].to_numpy()[pendientes].tolist()
+    try:
+        with pool.cliente() as supabase:
+            elegibilidad = verificar_lote(supabase, cuiles, comision_id, id_actividad)
+    except Exception:
+        informe.loc[pendientes, ["estado", "motivo"]] = ["Error", MOTIVOS["error_consulta"]]
+        return informe
+
+    opcionales = [c for c in COLUMNAS_OPCIONALES if c in df.columns]
+    aceptadas, filas = [], []
+    for pos, cuil in zip(pendientes, cuiles):
+        resultado = elegibilidad.get(cuil)
+        if resultado is None:
+            informe.at[pos, "estado"] = "Error"
+            informe.at[pos, "motivo"] = MOTIVOS["error_consulta"]
+        elif resultado.get("motivo_bloqueo"):
+            informe.at[pos, "motivo"] = MOTIVOS.get(resultado["motivo_bloqueo"], resultado["motivo_bloqueo"])
+        else:
+            extra = {c: df.at[df.index[pos], c] for c in opcionales}
+            extra = {c: (None if pd.isna(v) else v) for c, v in extra.items()}
+            filas.append(armar_inscripcion(
+                resultado.get("datos") or {},
+                comision_id=comision_id,
+                cuil=cuil,
+                nivel_educativo=(extra.get("nivel_educativo") or "").upper() or None,
+                titulo=(extra.get("titulo") or "").upper(),
+                tareas=(extra.get("tareas_desarrolladas") or "").lower(),
+                email_alternativo=extra.get("email_alternativo") or "",
+            ))
+            aceptadas.append(pos)
+
+    if filas:
+        with pool.cliente() as supabase:
+            errores = insertar_lote(supabase, filas)
+        for pos, error in zip(aceptadas, errores):
+            if error is None:
+                informe.at[pos, "estado"] = "Inscripto"
+            else:
+                informe.at[pos, "estado"] = "Error"
+                informe.at[pos, "motivo"] = MOTIVOS["error_insercion"]
+    return informe
+
+
+def informe_xlsx(informe: pd.DataFrame) -> bytes:
+    salida = io.BytesIO()
+    with pd.ExcelWriter(salida, engine="xlsxwriter") as writer:
+        informe.to_excel(writer, index=False, sheet_name="Resultado")
+    return salida.getvalue()
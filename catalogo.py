@@ -0,0 +1,655 @@
+# ================== CATÁLOGO DE COMISIONES (CACHÉ COMPARTIDA) ==================
+# El script de Streamlit se re-ejecuta en cada interacción, pero los módulos
+# importados viven una sola vez por proceso: este caché es compartido por
+# todas las sesiones del servidor.
+# Con CATALOGO_INSTANTANEA (por defecto .catalogo/) cada versión se publica
+# además en disco (ver instantanea.py): un proceso que reinicia sirve desde
+# ahí al instante y refresca en segundo plano, y los demás procesos del host
+# adoptan la versión que publicó otro en lugar de consultar a Supabase.
+# Vencido el TTL se sigue sirviendo la versión actual mientras un solo hilo de
+# fondo la revalida (stale-while-revalidate, ver vuelo_unico.py); solo si pasó
+# además CATALOGO_MAXIMO_VENCIDO_SEGUNDOS la sesión espera el refresco.
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from busqueda import IndiceBusqueda, normalizar, normalizar_serie
+from cache_lru import CacheLRU
+from conexion import cliente_de
+from instantanea import crear_instantanea
+from metricas import medida, medir
+from perfilado import asignaciones
+from vuelo_unico import VueloUnico
+
+# El frame derivado se comparte entre sesiones y no debe mutarse: con
+# copy-on-write (siempre activo desde pandas 3, ver requirements.txt) cualquier
+# filtro o asignación posterior trabaja sobre su propia copia.
+
+VISTA_COMISIONES = "vista_comisiones_abiertas"
+COLUMNAS_COMISIONES = (
+    "id, id_comision_sai, organismo, id_actividad, nombre_actividad, "
+    "fecha_desde, fecha_hasta, fecha_cierre, creditos, modalidad_cursada, "
+    "link_externo, apto_tramo"
+)
+
+CAMPOS_COMISIONES = [c.strip() for c in COLUMNAS_COMISIONES.split(",")]
+CAMPOS_OBLIGATORIOS = ["id_comision_sai", "nombre_actividad", "fecha_desde", "fecha_hasta"]
+
+# Columna de la vista que se actualiza con cada cambio de la fila (marca de agua)
+COLUMNA_MARCA = os.environ.get("CATALOGO_COLUMNA_MARCA", "updated_at")
+# Resincronización completa forzada cada tantos refrescos incrementales o
+# minutos: lo que cambia sin mover la marca de agua (ej. una vista de
+# producción que solo toma comisiones.updated_at) termina llegando igual
+RESINCRONIZAR_CADA = int(os.environ.get("CATALOGO_RESINCRONIZAR_CADA", "30"))
+RESINCRONIZAR_MINUTOS = float(os.environ.get("CATALOGO_RESINCRONIZAR_MINUTOS", "30"))
+# Postgres undefined_column: la vista no expone la marca de agua
+COLUMNA_INEXISTENTE = "42703"
+TTL_SEGUNDOS = float(os.environ.get("CATALOGO_TTL_SEGUNDOS", "60"))
+# Cuánto más allá del TTL se sirve la versión vencida mientras se revalida (0: nunca)
+MAXIMO_VENCIDO_SEGUNDOS = float(os.environ.get("CATALOGO_MAXIMO_VENCIDO_SEGUNDOS", "300"))
+# Tras un refresco de fondo fallido, pausa antes de intentar otro
+ESPERA_TRAS_FALLO = 5.0
+# Relecturas de un refresco dirigido cuando otro refresco cambia la versión mientras tanto
+INTENTOS_DIRIGIDO = 3
+
+logger = logging.getLogger("catalogo")
+
+
+def _falta_columna(error: Exception) -> bool:
+    # PostgREST devuelve el código de Postgres en APIError.code; el backend local
+    # (psycopg2, ver supabase_local) en pgcode
+    return COLUMNA_INEXISTENTE in (getattr(error, "code", None), getattr(error, "pgcode", None))
+
+
+class CacheCatalogo:
+    def __init__(self, ttl: float = TTL_SEGUNDOS, columna_marca: str = COLUMNA_MARCA, instantanea=None,
+                 maximo_vencido: float = MAXIMO_VENCIDO_SEGUNDOS, resincronizar_cada: int = RESINCRONIZAR_CADA,
+                 resincronizar_minutos: float = RESINCRONIZAR_MINUTOS):
+        self.ttl = ttl
+        self.maximo_vencido = maximo_vencido
+        self.resincronizar_cada = resincronizar_cada
+        self.resincronizar_segundos = resincronizar_minutos * 60
+        self.columna_marca = columna_marca
+        self._lock = threading.Lock()
+        self._filas: dict = {}       # id -> registro de la vista
+        self._registros: list = []   # filas materializadas de la versión actual
+        self._marca = None           # mayor valor de la marca de agua visto
+        self._sincronizado_en = 0.0
+        self._incremental = bool(columna_marca)
+        self._incrementales_seguidos = 0
+        self._completo_en = time.monotonic()
+        self.version = 0
+        self._derivado = None
+        self._lock_derivado = threading.Lock()
+        # Refresco de fondo: uno solo en curso por proceso
+        self._vuelos = VueloUnico()
+        self._fallo_en_fondo = -ESPERA_TRAS_FALLO
+
+        # Instantánea en disco
+        self.instantanea = instantanea
+        self._firma = None               # firma de la versión en memoria, si está publicada
+        self._sincronizado_reloj = 0.0   # time.time() del último dato confirmado con la base
+        self._frame_instantanea = None   # (versión, frame mapeado) para el próximo derivado
+        self._lock_escritura = threading.Lock()
+
+        # Contadores
+        self.aciertos = 0
+        self.fallos = 0
+        self.refrescos_completos = 0
+        self.refrescos_incrementales = 0
+        self.filas_actualizadas = 0
+        self.filas_eliminadas = 0
+        self.adopciones = 0
+        self.refrescos_en_fondo = 0
+        self.refrescos_dirigidos = 0
+        self.vencidos_servidos = 0
+
+    # origen: el pool de la app o un cliente ya prestado (ver conexion.cliente_de).
+    # Con el pool, una sesión que se sirve de memoria no ocupa ningún cliente.
+    def obtener(self, origen) -> list:
+        return self._sincronizar(origen)[1]
+
+    def obtener_derivado(self, origen) -> "CatalogoDerivado":
+        return self._derivar(*self._sincronizar(origen))
+
+    def _derivar(self, version: int, registros: list) -> "CatalogoDerivado":
+        with self._lock_derivado:
+            if self._derivado is None or self._derivado.version != version:
+                mapeado = self._frame_instantanea
+                if mapeado is not None and mapeado[0] == version:
+                    self._derivado = CatalogoDerivado(version, registros, frame=mapeado[1])
+                else:
+                    self._derivado = CatalogoDerivado(version, registros)
+                    self._publicar(self._derivado, registros)
+                self._frame_instantanea = None
+            return self._derivado
+
+    def _sincronizar(self, origen) -> tuple:
+        if self.version and self._vuelos.en_vuelo("refresco"):
+            # Mientras un refresco (de fondo o por aviso) consulta la base con
+            # self._lock tomado se sirve la versión actual
+            self.vencidos_servidos += 1
+            return self.version, self._registros
+
+        # Las sesiones que llegan mientras otra trae el catálogo esperan en el
+        # lock y después encuentran la versión nueva: una sola consulta
+        with self._lock:
+            edad = time.monotonic() - self._sincronizado_en
+            if self.version and edad < self.ttl:
+                self.aciertos += 1
+                return self.version, self._registros
+
+            if self._adoptar_instantanea():
+                self.aciertos += 1
+                return self.version, self._registros
+
+            if self.version and edad < self.ttl + self.maximo_vencido:
+                # stale-while-revalidate: se responde ya y se revalida en segundo plano
+                self.vencidos_servidos += 1
+                if time.monotonic() - self._fallo_en_fondo >= ESPERA_TRAS_FALLO:
+                    self._refrescar_en_fondo()
+                return self.version, self._registros
+
+            self.fallos += 1
+            with cliente_de(origen) as supabase:
+                self._refrescar(supabase)
+            return self.version, self._registros
+
+    def _refrescar(self, supabase):
+        if not self.version or not self._incremental or self._toca_resincronizar():
+            self._refresco_completo(supabase)
+        else:
+            try:
+                self._refresco_incremental(supabase)
+            except Exception:
+                self._refresco_completo(supabase)
+
+    def _toca_resincronizar(self) -> bool:
+        return (
+            (self.resincronizar_cada and self._incrementales_seguidos >= self.resincronizar_cada)
+            or (self.resincronizar_segundos and time.monotonic() - self._completo_en >= self.resincronizar_segundos)
+        )
+
+    def invalidar(self):
+        with self._lock:
+            self._sincronizado_en = 0.0
+
+    def refrescar_dirigido(self, supabase, columna: str = None, claves: list = None):
+        # Refresco pedido por una notificación de la base (ver invalidacion.py):
+        # se vuelven a leer solo las filas de esas claves (id o id_actividad).
+        # Sin claves se hace el refresco incremental de siempre, en el mismo
+        # vuelo que el de fondo: mientras corre, las sesiones no esperan el lock.
+        if not self.version:
+            return  # nada cargado: la primera sesión trae el catálogo completo
+        if not claves or columna not in ("id", "id_actividad"):
+            self._vuelos.hacer("refresco", self._refrescar_con_lock, supabase)
+            return
+
+        # La consulta va sin self._lock (las sesiones siguen sirviéndose de
+        # memoria); el lock se toma solo para combinar las filas. Si otro
+        # refresco cambió la versión mientras tanto, se vuelve a leer.
+        claves = {str(c) for c in claves}
+        for _ in range(INTENTOS_DIRIGIDO):
+            version = self.version
+            with medir("consulta.catalogo_dirigido"):
+                resp = supabase.table(VISTA_COMISIONES).select(self._columnas()).in_(columna, list(claves)).execute()
+            with self._lock:
+                if self.version == version:
+                    self._combinar_dirigido(columna, claves, resp.data or [])
+                    return
+        # Sin una versión quieta para combinar: el próximo pedido refresca
+        self.invalidar()
+
+    def _combinar_dirigido(self, columna: str, claves: set, datos: list):
+        # Con self._lock tomado
+        vigentes = {r["id"]: r for r in datos}
+        afectadas = {i for i, r in self._filas.items() if str(r.get(columna)) in claves}
+
+        # Se conserva el orden del catálogo: las filas existentes quedan en su lugar
+        filas = dict(self._filas)
+        eliminadas = 0
+        for i in afectadas - vigentes.keys():
+            del filas[i]
+            eliminadas += 1
+        actualizadas = 0
+        for i, r in vigentes.items():
+            if self._filas.get(i) != r:
+                filas[i] = r
+                actualizadas += 1
+
+        self.refrescos_dirigidos += 1
+        self.filas_actualizadas += actualizadas
+        self.filas_eliminadas += eliminadas
+        if actualizadas or eliminadas:
+            # La marca de agua no avanza: el resto de las filas no se revisó
+            self._aplicar(filas, sincronizado=False)
+
+    def _refrescar_con_lock(self, supabase):
+        with self._lock:
+            self._refrescar(supabase)
+
+    def estadisticas(self) -> dict:
+        consultas = self.aciertos + self.fallos
+        return {
+            "version": self.version,
+            "filas": len(self._registros),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "refrescos_completos": self.refrescos_completos,
+            "refrescos_incrementales": self.refrescos_incrementales,
+            "filas_actualizadas": self.filas_actualizadas,
+            "filas_eliminadas": self.filas_eliminadas,
+            "marca": self._marca,
+            "adopciones": self.adopciones,
+            "refrescos_en_fondo": self.refrescos_en_fondo,
+            "refrescos_dirigidos": self.refrescos_dirigidos,
+            "vencidos_servidos": self.vencidos_servidos,
+            **{f"instantanea_{k}": v for k, v in (self.instantanea.estadisticas() if self.instantanea else {}).items()},
+        }
+
+    # ---------- Sincronización ----------
+    def _columnas(self) -> str:
+        if self._incremental:
+            return f"{COLUMNAS_COMISIONES}, {self.columna_marca}"
+        return COLUMNAS_COMISIONES
+
+    def _refresco_completo(self, supabase):
+        try:
+            with medir("consulta.catalogo_completo"):
+                resp = supabase.table(VISTA_COMISIONES).select(self._columnas()).execute()
+        except Exception as e:
+            # Solo si la vista no expone la marca de agua quedan refrescos completos;
+            # un timeout o un corte de red no apaga la sincronización incremental
+            if not self._incremental or not _falta_columna(e):
+                raise
+            logger.warning("La vista no expone %s: solo refrescos completos", self.columna_marca)
+            self._incremental = False
+            resp = supabase.table(VISTA_COMISIONES).select(self._columnas()).execute()
+
+        filas = {r["id"]: r for r in (resp.data or [])}
+        self._marca = self._mayor_marca(filas.values(), None)
+        self._incrementales_seguidos = 0
+        self._completo_en = time.monotonic()
+        self.refrescos_completos += 1
+        if self.version and filas == self._filas:
+            # Resincronización sin diferencias: se conserva la versión (y su frame)
+            self._confirmar_sincronizado()
+        else:
+            self._aplicar(filas)
+
+    def _refresco_incremental(self, supabase):
+        consulta = supabase.table(VISTA_COMISIONES).select(self._columnas())
+        if self._marca is not None:
+            # gte y no gt: filas con la misma marca que la última vista pueden haber llegado después
+            consulta = consulta.gte(self.columna_marca, self._marca)
+        with medir("consulta.catalogo_incremental"):
+            cambios = consulta.execute().data or []
+
+            # Las comisiones que cierran desaparecen de la vista: se detectan por diferencia de ids
+            vigentes = {r["id"] for r in (supabase.table(VISTA_COMISIONES).select("id").execute().data or [])}
+
+        filas = {i: r for i, r in self._filas.items() if i in vigentes}
+        eliminadas = len(self._filas) - len(filas)
+        actualizadas = 0
+        for r in cambios:
+            if r["id"] in vigentes and self._filas.get(r["id"]) != r:
+                filas[r["id"]] = r
+                actualizadas += 1
+
+        # Filas que reaparecen en la vista sin haber cambiado su marca (ej. reapertura)
+        faltantes = vigentes - filas.keys()
+        if faltantes:
+            resp = supabase.table(VISTA_COMISIONES).select(self._columnas()).in_("id", list(faltantes)).execute()
+            for r in resp.data or []:
+                filas[r["id"]] = r
+                actualizadas += 1
+            cambios = cambios + (resp.data or [])
+
+        self._marca = self._mayor_marca(cambios, self._marca)
+        self._incrementales_seguidos += 1
+        self.refrescos_incrementales += 1
+        self.filas_actualizadas += actualizadas
+        self.filas_eliminadas += eliminadas
+        if actualizadas or eliminadas:
+            self._aplicar(filas)
+        else:
+            self._confirmar_sincronizado()
+
+    def _confirmar_sincronizado(self):
+        # La base no cambió: la versión actual sigue vigente
+        self._sincronizado_en = time.monotonic()
+        self._sincronizado_reloj = time.time()
+        if self.instantanea is not None and self._firma is not None:
+            self._renovar_instantanea(self._firma)
+
+    def _aplicar(self, filas: dict, sincronizado: bool = True):
+        self._filas = filas
+        self._registros = list(filas.values())
+        if sincronizado:
+            self._sincronizado_en = time.monotonic()
+        # Una instantánea escrita antes de este momento es más vieja que lo que hay en memoria
+        self._sincronizado_reloj = time.time()
+        self._firma = None
+        self.version += 1
+
+    def _mayor_marca(self, filas, actual):
+        marcas = [r.get(self.columna_marca) for r in filas if r.get(self.columna_marca) is not None]
+        if not marcas:
+            return actual
+        mayor = max(marcas)
+        return mayor if actual is None or mayor > actual else actual
+
+    # ---------- Instantánea en disco ----------
+    def _adoptar_instantanea(self) -> bool:
+        # Antes de ir a la base (con self._lock tomado): ¿hay en disco una
+        # versión más nueva que la de este proceso? Al arrancar se adopta
+        # aunque esté vencida, y se refresca en segundo plano
+        if self.instantanea is None:
+            return False
+        sello = self.instantanea.sello()
+        if sello is None or sello["escrito"] <= self._sincronizado_reloj:
+            return False
+        edad = max(0.0, time.time() - sello["escrito"])
+        vigente = edad < self.ttl
+        if not vigente and self.version:
+            return False
+
+        if sello["firma"] == self._firma:
+            # Otro proceso confirmó hace poco que la base no cambió
+            self._sincronizado_en = time.monotonic() - edad
+            self._sincronizado_reloj = sello["escrito"]
+            return True
+
+        try:
+            registros = self.instantanea.leer(sello, "registros").to_pylist()
+            frame = frame_desde_arrow(self.instantanea.leer(sello, "frame"))
+        except Exception as e:
+            self.instantanea.errores += 1
+            logger.warning("No se pudo leer la instantánea %s: %s", sello.get("firma"), e)
+            return False
+
+        self._filas = {r["id"]: r for r in registros}
+        self._registros = registros
+        self._marca = sello["marca"]
+        self._firma = sello["firma"]
+        self._sincronizado_reloj = sello["escrito"]
+        self._sincronizado_en = time.monotonic() - (edad if vigente else 0.0)
+        self.version += 1
+        self._frame_instantanea = (self.version, frame)
+        self.adopciones += 1
+        if not vigente:
+            self._refrescar_en_fondo()
+        return True
+
+    def _refrescar_en_fondo(self):
+        self._vuelos.en_fondo("refresco", self._refresco_de_fondo, nombre="catalogo-refresco")
+
+    def _refresco_de_fondo(self):
+        # El cliente sale del pool de la app: el que trajo la sesión es prestado
+        try:
+            from conexion import obtener_pool
+
+            with obtener_pool().cliente() as supabase:
+                with self._lock:
+                    self._refrescar(supabase)
+                    version, registros = self.version, self._registros
+                self.refrescos_en_fondo += 1
+            # El frame de la versión nueva se arma acá y no en la próxima sesión
+            self._derivar(version, registros)
+        except Exception as e:
+            self._fallo_en_fondo = time.monotonic()
+            logger.warning("Refresco del catálogo en segundo plano falló: %s", e)
+
+    def _publicar(self, derivado: "CatalogoDerivado", registros: list):
+        # Se escribe en un hilo aparte: la sesión que armó el frame no espera al disco
+        if self.instantanea is None:
+            return
+        with self._lock:
+            if self.version != derivado.version:
+                return  # ya hay una versión más nueva, que se publicará sola
+            marca = self._marca
+
+        def tarea():
+            try:
+                with self._lock_escritura:
+                    tablas = {
+                        "registros": pa.Table.from_pylist(registros),
+                        "frame": pa.Table.from_pandas(derivado.frame, preserve_index=False),
+                    }
+                    sello = self.instantanea.guardar(tablas, marca=marca)
+                with self._lock:
+                    if self.version == derivado.version:
+                        self._firma = sello["firma"]
+                        self._sincronizado_reloj = max(self._sincronizado_reloj, sello["escrito"])
+            except Exception as e:
+                self.instantanea.errores += 1
+                logger.warning("No se pudo escribir la instantánea del catálogo: %s", e)
+
+        threading.Thread(target=tarea, name="catalogo-instantanea", daemon=True).start()
+
+    def _renovar_instantanea(self, firma: str):
+        # Con self._lock tomado (viene de _confirmar_sincronizado)
+        try:
+            sello = self.instantanea.renovar(firma)
+            if sello is not None:
+                self._sincronizado_reloj = sello["escrito"]
+        except OSError as e:
+            self.instantanea.errores += 1
+            logger.warning("No se pudo renovar el sello de la instantánea: %s", e)
+
+
+# ========== FRAME DERIVADO (UNA VEZ POR VERSIÓN) ==========
+FORMATO_FECHA = "%d/%m/%Y"
+
+DURACION_CORTES = [-np.inf, 1, 10, 20, np.inf]
+DURACION_ETIQUETAS = [
+    "SIN CLASIFICAR",
+    "BREVE (hasta 10 hs)",
+    "INTERMEDIA (entre 10 y 20 hs)",
+    "PROLONGADA (más de 20 hs)",
+]
+
+
+def _formatear_fechas(fechas: pd.Series) -> pd.Series:
+    # Pocas fechas distintas: se formatean los valores únicos y se expanden por código
+    codigos, unicas = pd.factorize(fechas)
+    textos = np.append(np.asarray(unicas.strftime(FORMATO_FECHA), dtype=object), None)
+    return pd.Series(textos[codigos], index=fechas.index)  # código -1 (NaT) -> None
+
+
+def clasificar_duracion(creditos: pd.Series) -> pd.Series:
+    return pd.cut(creditos, bins=DURACION_CORTES, labels=DURACION_ETIQUETAS, right=False)
+
+
+@medida("frame_derivado")
+@asignaciones("frame_derivado")
+def construir_frame(registros: list) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(registros, columns=CAMPOS_COMISIONES)
+
+    # Conversión de fechas
+    for col in ("fecha_desde", "fecha_hasta", "fecha_cierre"):
+        df[col] = pd.to_datetime(df[col], errors="coerce", format="ISO8601")
+
+    # Campos obligatorios
+    df = df.dropna(subset=CAMPOS_OBLIGATORIOS).reset_index(drop=True)
+
+    # Campos visuales
+    df["Actividad"] = df["nombre_actividad"]
+    df["Comisión"] = df["id_comision_sai"]
+    df["Fecha inicio"] = _formatear_fechas(df["fecha_desde"])
+    df["Fecha fin"] = _formatear_fechas(df["fecha_hasta"])
+    df["Fecha cierre"] = _formatear_fechas(df["fecha_cierre"])
+    df["Actividad dropdown"] = (
+        df["nombre_actividad"] + " (" + df["Fecha inicio"] + " al " + df["Fecha fin"] + ")"
+    )
+    df["Actividad (Comisión)"] = df["nombre_actividad"] + " (" + df["id_comision_sai"] + ")"
+    df["Créditos"] = pd.to_numeric(df["creditos"], errors="coerce").fillna(0).astype(int)
+    df["Duración"] = clasificar_duracion(df["Créditos"])
+    df["Ver más"] = df["link_externo"]  # solo URL
+
+    # Columnas de baja cardinalidad como categóricas
+    df["organismo"] = df["organismo"].astype("category")
+    df["Modalidad"] = df["modalidad_cursada"].astype("category")
+    df["Apto tramo"] = df["apto_tramo"].fillna("No").astype("category")
+    return df
+
+
+def frame_desde_arrow(tabla: pa.Table) -> pd.DataFrame:
+    # Las columnas de texto quedan respaldadas por los buffers de Arrow (sin copia):
+    # depende del tipo str de pandas >= 3, respaldado por pyarrow (en 2.x cada
+    # proceso las copiaría a objetos de Python). Fechas, números y categóricas
+    # se convierten como en construir_frame
+    return tabla.to_pandas(split_blocks=True)
+
+
+# ========== ÍNDICE DE FILTROS (PASO 1) ==========
+# faceta -> columna del frame derivado
+FACETAS = {"organismo": "organismo", "modalidad": "Modalidad", "duracion": "Duración"}
+MAX_FILTROS_MEMORIZADOS = int(os.environ.get("CATALOGO_MAX_FILTROS_MEMORIZADOS", "64"))
+
+
+class IndiceFiltros:
+    def __init__(self, frame: pd.DataFrame, max_memorizados: int = MAX_FILTROS_MEMORIZADOS):
+        self.frame = frame
+        # faceta -> {valor: posiciones (ordenadas) de las filas con ese valor}
+        self.posiciones = {
+            faceta: frame.groupby(col, observed=True, sort=True).indices
+            for faceta, col in FACETAS.items()
+        }
+        # Opciones de los selectbox: solo valores presentes, ordenados
+        self.opciones = {faceta: sorted(pos) for faceta, pos in self.posiciones.items()}
+        self._memo = CacheLRU(max_memorizados)
+
+    def filtrar(self, organismo=None, modalidad=None, duracion=None) -> pd.DataFrame:
+        clave = (organismo, modalidad, duracion)
+        resultado = self._memo.obtener(clave)
+        if resultado is not None:
+            return resultado
+
+        elegidas = [
+            self.posiciones[faceta].get(valor, np.empty(0, dtype=np.intp))
+            for faceta, valor in zip(FACETAS, clave)
+            if valor is not None
+        ]
+        if not elegidas:
+            resultado = self.frame
+        else:
+            # Se intersecta empezando por el conjunto más chico
+            elegidas.sort(key=len)
+            pos = elegidas[0]
+            for otras in elegidas[1:]:
+                pos = np.intersect1d(pos, otras, assume_unique=True)
+            resultado = self.frame.take(pos)
+
+        self._memo.guardar(clave, resultado)
+        return resultado
+
+
+# ========== CONSULTAS PAGINADAS (TABLA AGGRID) ==========
+# columna visible -> columna por la que se ordena
+COLUMNAS_ORDEN = {
+    "Actividad (Comisión)": "Actividad (Comisión)",
+    "Fecha inicio": "fecha_desde",
+    "Fecha fin": "fecha_hasta",
+    "Fecha cierre": "fecha_cierre",
+    "Créditos": "Créditos",
+    "Modalidad": "Modalidad",
+}
+MAX_CONSULTAS_MEMORIZADAS = int(os.environ.get("CATALOGO_MAX_CONSULTAS_MEMORIZADAS", "256"))
+
+
+class ConsultasPaginadas:
+    # Ordena y busca en el servidor sobre posiciones de filas: en el frame derivado
+    # la etiqueta de cada fila coincide con su posición (reset_index en construir_frame).
+    def __init__(self, frame: pd.DataFrame, filtros: IndiceFiltros,
+                 max_memorizadas: int = MAX_CONSULTAS_MEMORIZADAS):
+        self.frame = frame
+        self.filtros = filtros
+        self._rangos = {}       # columna -> rango de cada fila en el orden global
+        self._texto = None      # texto en minúsculas para la búsqueda rápida
+        self._lock = threading.Lock()
+        self._memo = CacheLRU(max_memorizadas)
+
+    def _rango(self, columna: str) -> np.ndarray:
+        with self._lock:
+            if columna not in self._rangos:
+                # Código del valor en el orden de sus únicos; los nulos al final
+                codigos, unicos = pd.factorize(self.frame[COLUMNAS_ORDEN[columna]], sort=True)
+                self._rangos[columna] = np.where(codigos < 0, len(unicos), codigos)
+            return self._rangos[columna]
+
+    def _texto_busqueda(self) -> pd.Series:
+        with self._lock:
+            if self._texto is None:
+                # Sin tildes ni mayúsculas, igual que la consulta (ver busqueda.py)
+                self._texto = normalizar_serie(
+                    self.frame["Actividad (Comisión)"] + " " + self.frame["organismo"].astype(str)
+                )
+            return self._texto
+
+    def posiciones(self, filtros: tuple, busqueda: str = "", orden: str = None,
+                   ascendente: bool = True) -> np.ndarray:
+        busqueda = normalizar(busqueda or "")
+        clave = (filtros, busqueda, orden, ascendente)
+        pos = self._memo.obtener(clave)
+        if pos is not None:
+            return pos
+
+        pos = self.filtros.filtrar(*filtros).index.to_numpy()
+        if busqueda:
+            coincide = self._texto_busqueda().take(pos).str.contains(busqueda, regex=False)
+            pos = pos[coincide.to_numpy(dtype=bool)]
+        if orden in COLUMNAS_ORDEN:
+            pos = pos[np.argsort(self._rango(orden)[pos], kind="stable")]
+            if not ascendente:
+                pos = pos[::-1]
+
+        self._memo.guardar(clave, pos)
+        return pos
+
+    def pagina(self, posiciones: np.ndarray, numero: int, tamano: int) -> pd.DataFrame:
+        return self.frame.take(posiciones[numero * tamano:(numero + 1) * tamano])
+
+
+class CatalogoDerivado:
+    # Todo lo que se calcula a partir de una versión del catálogo cuelga de este objeto:
+    # al cambiar la versión se descarta completo.
+    def __init__(self, version: int, registros: list, frame: pd.DataFrame = None):
+        self.version = version
+        # frame: el de una instantánea en disco, ya derivado de estos registros
+        self.frame = construir_frame(registros) if frame is None else frame
+        self.filtros = IndiceFiltros(self.frame)
+        self.consultas = ConsultasPaginadas(self.frame, self.filtros)
+        # Selección por id de comisión (paso 2, enlaces ?comision=<id>): posición y etiqueta en O(1)
+        self.ids = self.frame["id"].tolist()
+        self.posiciones = dict(zip(self.ids, range(len(self.ids))))
+        self.etiquetas = dict(zip(self.ids, self.frame["Actividad (Comisión)"]))
+        self._busqueda = None
+        self._lock_busqueda = threading.Lock()
+
+    @property
+    def busqueda(self) -> IndiceBusqueda:
+        # Índice de trigramas del paso 2: se arma con la primera búsqueda de esta versión
+        if self._busqueda is None:
+            with self._lock_busqueda:
+                if self._busqueda is None:
+                    self._busqueda = IndiceBusqueda(self.frame)
+        return self._busqueda
+
+    def fila(self, id_comision: str):
+        # Fila del frame derivado, o None si la comisión no está en esta versión
+        posicion = self.posiciones.get(id_comision)
+        return None if posicion is None else self.frame.iloc[posicion]
+
+
+cache_catalogo = CacheCatalogo(instantanea=crear_instantanea())
+
+
+def obtener_catalogo(origen) -> CatalogoDerivado:
+    return cache_catalogo.obtener_derivado(origen)
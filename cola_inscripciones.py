@@ -0,0 +1,297 @@
+# ================== COLA DE INSCRIPCIONES (WRITE-BEHIND) ==================
+# El botón "ENVIAR INSCRIPCIÓN" ya no espera a la base: la fila se guarda en un
+# spool local (un archivo JSON por recibo, escrito de forma atómica) y se
+# devuelve un recibo al instante. Un hilo de fondo junta lo pendiente y lo
+# envía en inserciones múltiples con upsert sobre (cuil, comision_id), así un
+# doble clic o un reintento nunca duplican la inscripción
+# (ver sql/inscripciones_unicidad.sql). Si la base falla se reintenta con
+# backoff; lo que quedó en el spool se vuelve a encolar al reiniciar el proceso.
+# El recibo no es la confirmación: estado(recibo) dice si la base ya la aceptó
+# o si quedó fallida tras MAX_INTENTOS (form.py se lo muestra al agente).
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from cache_lru import CacheLRU
+from inscripciones import TABLA_INSCRIPCIONES
+from metricas import medir
+
+DIRECTORIO_SPOOL = os.environ.get("COLA_INSCRIPCIONES_SPOOL", ".spool_inscripciones")
+LOTE_MAXIMO = int(os.environ.get("COLA_INSCRIPCIONES_LOTE", "200"))
+INTERVALO_FLUSH = float(os.environ.get("COLA_INSCRIPCIONES_INTERVALO", "0.5"))
+MAX_INTENTOS = int(os.environ.get("COLA_INSCRIPCIONES_MAX_INTENTOS", "8"))
+BACKOFF_BASE = float(os.environ.get("COLA_INSCRIPCIONES_BACKOFF", "1"))
+BACKOFF_MAXIMO = float(os.environ.get("COLA_INSCRIPCIONES_BACKOFF_MAX", "60"))
+# Tras este número de fallos las filas se envían de a una, para que una fila
+# rechazada por la base no arrastre a las demás del lote
+INTENTOS_ANTES_DE_AISLAR = 2
+
+CONFLICTO = "cuil,comision_id"
+
+logger = logging.getLogger("cola_inscripciones")
+
+PENDIENTE = "pendiente"
+CONFIRMADA = "confirmada"
+FALLIDA = "fallida"
+
+
+def clave_idempotencia(fila: dict) -> str:
+    return f"{fila['cuil']}:{fila['comision_id']}"
+
+
+class ColaInscripciones:
+    def __init__(
+        self,
+        pool,
+        directorio: str = DIRECTORIO_SPOOL,
+        lote_maximo: int = LOTE_MAXIMO,
+        intervalo: float = INTERVALO_FLUSH,
+        max_intentos: int = MAX_INTENTOS,
+    ):
+        self.pool = pool
+        self.directorio = directorio
+        self.fallidas_dir = os.path.join(directorio, "fallidas")
+        self.lote_maximo = max(1, lote_maximo)
+        self.intervalo = intervalo
+        self.max_intentos = max_intentos
+        os.makedirs(self.fallidas_dir, exist_ok=True)
+
+        self._pendientes = OrderedDict()   # clave -> entrada (orden de llegada)
+        self._estados = CacheLRU(10000)    # recibo -> estado, para consultarlo después
+        self._condicion = threading.Condition()
+        self._hilo = None
+        self._detenida = False
+
+        # Estadísticas
+        self.encoladas = 0
+        self.duplicadas = 0
+        self.confirmadas = 0
+        self.fallidas = 0
+        self.reintentos = 0
+        self.lotes = 0
+        self.tiempo_flush = 0.0
+        self.flush_maximo = 0.0
+        self.espera_total = 0.0
+        self.errores_spool = 0          # disco lleno, permisos, directorio borrado...
+        self.ultimo_error_spool = ""
+        self.errores_trabajador = 0
+
+        self._recuperar_spool()
+
+    # ========== SPOOL ==========
+    def _ruta(self, recibo: str, directorio: str = None) -> str:
+        return os.path.join(directorio or self.directorio, recibo + ".json")
+
+    def _escribir(self, entrada: dict):
+        ruta = self._ruta(entrada["recibo"])
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(entrada, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+
+    def _archivar_fallida(self, entrada: dict):
+        self._escribir(entrada)
+        os.makedirs(self.fallidas_dir, exist_ok=True)
+        os.replace(self._ruta(entrada["recibo"]), self._ruta(entrada["recibo"], self.fallidas_dir))
+
+    def _error_spool(self, accion: str, entrada: dict, error: OSError):
+        # Con self._condicion tomado. El hilo sigue: las demás entradas no se traban
+        self.errores_spool += 1
+        self.ultimo_error_spool = f"{accion} {entrada['recibo']}: {error}"
+        logger.error("Spool de inscripciones: no se pudo %s %s: %s", accion, entrada["recibo"], error)
+
+    def _borrar(self, recibo: str):
+        try:
+            os.remove(self._ruta(recibo))
+        except FileNotFoundError:
+            pass
+
+    def _recuperar_spool(self):
+        archivos = sorted(
+            (os.path.join(self.directorio, n) for n in os.listdir(self.directorio) if n.endswith(".json")),
+            key=os.path.getmtime,
+        )
+        for ruta in archivos:
+            try:
+                with open(ruta, encoding="utf-8") as f:
+                    entrada = json.load(f)
+            except (OSError, ValueError):
+                continue  # ilegible: queda en el directorio para revisarlo a mano
+            entrada["proximo_intento"] = 0.0
+            entrada["encolada"] = time.monotonic()
+            self._pendientes[clave_idempotencia(entrada["fila"])] = entrada
+            self._estados.guardar(entrada["recibo"], PENDIENTE)
+
+    # ========== API ==========
+    def encolar(self, fila: dict) -> str:
+        # Devuelve el recibo; un segundo envío de la misma (cuil, comisión)
+        # mientras la primera sigue pendiente devuelve el mismo recibo
+        clave = clave_idempotencia(fila)
+        with self._condicion:
+            existente = self._pendientes.get(clave)
+            if existente is not None:
+                self.duplicadas += 1
+                return existente["recibo"]
+            entrada = {
+                "recibo": uuid.uuid4().hex,
+                "fila": fila,
+                "intentos": 0,
+                "proximo_intento": 0.0,
+                "encolada": time.monotonic(),
+            }
+            self._escribir(entrada)
+            self._pendientes[clave] = entrada
+            self._estados.guardar(entrada["recibo"], PENDIENTE)
+            self.encoladas += 1
+            self._condicion.notify()
+        self._iniciar()
+        return entrada["recibo"]
+
+    def estado(self, recibo: str) -> str:
+        return self._estados.obtener(recibo)
+
+    def _iniciar(self):
+        if self._hilo is None or not self._hilo.is_alive():
+            with self._condicion:
+                if self._hilo is None or not self._hilo.is_alive():
+                    self._detenida = False
+                    self._hilo = threading.Thread(target=self._trabajar, name="cola-inscripciones", daemon=True)
+                    self._hilo.start()
+
+    def detener(self, vaciar: bool = True, espera: float = 10.0):
+        if vaciar:
+            limite = time.monotonic() + espera
+            while self._pendientes and time.monotonic() < limite:
+                self.vaciar()
+                if self._pendientes:
+                    time.sleep(min(0.1, self.intervalo))
+        with self._condicion:
+            self._detenida = True
+            self._condicion.notify_all()
+        if self._hilo is not None:
+            self._hilo.join(timeout=espera)
+
+    # ========== HILO DE FONDO ==========
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                if self._detenida:
+                    return
+                if not self._listas():
+                    self._condicion.wait(self.intervalo)
+                    continue
+            try:
+                self.vaciar()
+            except Exception:
+                # Un error inesperado no puede dejar la cola sin hilo que la vacíe
+                self.errores_trabajador += 1
+                logger.exception("Error al vaciar la cola de inscripciones")
+                time.sleep(self.intervalo)
+
+    def _listas(self) -> list:
+        ahora = time.monotonic()
+        return [e for e in self._pendientes.values() if e["proximo_intento"] <= ahora]
+
+    def vaciar(self) -> int:
+        # Envía un lote de lo que esté listo; devuelve cuántas filas se confirmaron
+        with self._condicion:
+            listas = self._listas()
+            if not listas:
+                return 0
+            if listas[0]["intentos"] >= INTENTOS_ANTES_DE_AISLAR:
+                lote = listas[:1]
+            else:
+                lote = [e for e in listas if e["intentos"] < INTENTOS_ANTES_DE_AISLAR][:self.lote_maximo]
+
+        inicio = time.perf_counter()
+        try:
+            with medir("insercion"), self.pool.cliente() as supabase:
+                supabase.table(TABLA_INSCRIPCIONES).upsert(
+                    [e["fila"] for e in lote],
+                    returning="minimal",
+                    ignore_duplicates=True,
+                    on_conflict=CONFLICTO,
+                ).execute()
+            error = None
+        except Exception as e:
+            error = e
+        duracion = time.perf_counter() - inicio
+
+        with self._condicion:
+            self.lotes += 1
+            self.tiempo_flush += duracion
+            self.flush_maximo = max(self.flush_maximo, duracion)
+            ahora = time.monotonic()
+            for entrada in lote:
+                clave = clave_idempotencia(entrada["fila"])
+                if error is None:
+                    self._pendientes.pop(clave, None)
+                    try:
+                        self._borrar(entrada["recibo"])
+                    except OSError as e:
+                        # Ya está en la base: si se reencola al reiniciar, el upsert la ignora
+                        self._error_spool("borrar", entrada, e)
+                    self._estados.guardar(entrada["recibo"], CONFIRMADA)
+                    self.confirmadas += 1
+                    self.espera_total += ahora - entrada["encolada"]
+                    continue
+                entrada["intentos"] += 1
+                self.reintentos += 1
+                if entrada["intentos"] >= self.max_intentos:
+                    # Queda guardada aparte para revisarla a mano; no se pierde
+                    self._pendientes.pop(clave, None)
+                    entrada["error"] = str(error)
+                    try:
+                        self._archivar_fallida(entrada)
+                    except OSError as e:
+                        # Sin poder moverla, la fila queda al menos en el log
+                        self._error_spool("archivar", entrada, e)
+                        logger.error("Inscripción fallida sin archivar: %s",
+                                     json.dumps(entrada["fila"], ensure_ascii=False, default=str))
+                    self._estados.guardar(entrada["recibo"], FALLIDA)
+                    self.fallidas += 1
+                else:
+                    espera = min(BACKOFF_MAXIMO, BACKOFF_BASE * 2 ** (entrada["intentos"] - 1))
+                    entrada["proximo_intento"] = ahora + espera * random.uniform(0.5, 1.0)
+        return 0 if error is not None else len(lote)
+
+    def estadisticas(self) -> dict:
+        with self._condicion:
+            return {
+                "profundidad": len(self._pendientes),
+                "encoladas": self.encoladas,
+                "duplicadas": self.duplicadas,
+                "confirmadas": self.confirmadas,
+                "fallidas": self.fallidas,
+                "reintentos": self.reintentos,
+                "lotes": self.lotes,
+                "latencia_flush_promedio": self.tiempo_flush / self.lotes if self.lotes else 0.0,
+                "latencia_flush_maxima": self.flush_maximo,
+                "espera_promedio": self.espera_total / self.confirmadas if self.confirmadas else 0.0,
+                "errores_spool": self.errores_spool,
+                "ultimo_error_spool": self.ultimo_error_spool,
+                "errores_trabajador": self.errores_trabajador,
+                "trabajador_activo": self._hilo is not None and self._hilo.is_alive(),
+            }
+
+
+_cola = None
+_cola_lock = threading.Lock()
+
+
+def obtener_cola(pool) -> ColaInscripciones:
+    global _cola
+    if _cola is None:
+        with _cola_lock:
+            if _cola is None:
+                _cola = ColaInscripciones(pool)
+                if _cola._pendientes:
+                    _cola._iniciar()
+    return _cola
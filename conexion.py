@@ -0,0 +1,179 @@
+# ================== CONEXIÓN A SUPABASE (POOL COMPARTIDO) ==================
+# Un único pool por proceso: cada cliente mantiene su sesión HTTP (keep-alive)
+# hacia PostgREST, así las re-ejecuciones no repiten handshakes TLS.
+# supabase (y httpx) se importan al crear el primer cliente, no al importar el módulo.
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_ANON_KEY = os.environ.get("SUPABASE_ANON_KEY")
+# Clave de la carga masiva (pages/carga_masiva.py): service_role o un rol de RRHH.
+# verificar_elegibilidad_lote no se puede ejecutar con la clave anónima.
+SUPABASE_CLAVE_RRHH = os.environ.get("SUPABASE_CLAVE_RRHH") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+
+TAMANO_POOL = int(os.environ.get("SUPABASE_POOL_TAMANO", "4"))
+TAMANO_POOL_RRHH = int(os.environ.get("SUPABASE_POOL_RRHH_TAMANO", "2"))
+ESPERA_MAXIMA = float(os.environ.get("SUPABASE_POOL_ESPERA", "10"))
+TIMEOUT_CONEXION = float(os.environ.get("SUPABASE_TIMEOUT_CONEXION", "5"))
+TIMEOUT_LECTURA = float(os.environ.get("SUPABASE_TIMEOUT_LECTURA", "15"))
+
+
+class PoolAgotado(Exception):
+    pass
+
+
+class PoolSupabase:
+    def __init__(
+        self,
+        url: str,
+        clave: str,
+        tamano: int = TAMANO_POOL,
+        espera_maxima: float = ESPERA_MAXIMA,
+        timeout_conexion: float = TIMEOUT_CONEXION,
+        timeout_lectura: float = TIMEOUT_LECTURA,
+    ):
+        self.url = url
+        self.clave = clave
+        self.tamano = max(1, tamano)
+        self.espera_maxima = espera_maxima
+        self.timeout_conexion = timeout_conexion
+        self.timeout_lectura = timeout_lectura
+        # LIFO: se reutiliza primero el cliente con las conexiones más recientes
+        self._libres = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+        # Estadísticas
+        self.creados = 0
+        self.en_uso = 0
+        self.prestamos = 0
+        self.esperas = 0
+        self.tiempo_espera = 0.0
+        self.agotamientos = 0
+
+    def _crear(self):
+        import httpx
+        from supabase import create_client
+        from supabase.lib.client_options import ClientOptions
+
+        timeout = httpx.Timeout(self.timeout_lectura, connect=self.timeout_conexion)
+        return create_client(self.url, self.clave, options=ClientOptions(postgrest_client_timeout=timeout))
+
+    def _tomar(self):
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self.creados < self.tamano:
+                self.creados += 1
+                crear = True
+            else:
+                crear = False
+        if crear:
+            try:
+                return self._crear()
+            except Exception:
+                with self._lock:
+                    self.creados -= 1
+                raise
+
+        inicio = time.perf_counter()
+        try:
+            cli = self._libres.get(timeout=self.espera_maxima)
+        except queue.Empty:
+            with self._lock:
+                self.agotamientos += 1
+            raise PoolAgotado(f"No hay clientes de Supabase libres tras {self.espera_maxima}s")
+        with self._lock:
+            self.esperas += 1
+            self.tiempo_espera += time.perf_counter() - inicio
+        return cli
+
+    def precalentar(self, cantidad: int = None) -> int:
+        # Crea clientes por adelantado (al arrancar el proceso, ver servidor.py);
+        # devuelve cuántos se crearon
+        creados = 0
+        for _ in range(min(cantidad or self.tamano, self.tamano)):
+            with self._lock:
+                if self.creados >= self.tamano:
+                    break
+                self.creados += 1
+            try:
+                cli = self._crear()
+            except Exception:
+                with self._lock:
+                    self.creados -= 1
+                raise
+            self._libres.put(cli)
+            creados += 1
+        return creados
+
+    @contextmanager
+    def cliente(self):
+        cli = self._tomar()
+        with self._lock:
+            self.en_uso += 1
+            self.prestamos += 1
+        try:
+            yield cli
+        finally:
+            with self._lock:
+                self.en_uso -= 1
+            self._libres.put(cli)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "tamano": self.tamano,
+                "creados": self.creados,
+                "en_uso": self.en_uso,
+                "libres": self._libres.qsize(),
+                "prestamos": self.prestamos,
+                "esperas": self.esperas,
+                "tiempo_espera_promedio": self.tiempo_espera / self.esperas if self.esperas else 0.0,
+                "agotamientos": self.agotamientos,
+                "timeout_conexion": self.timeout_conexion,
+                "timeout_lectura": self.timeout_lectura,
+            }
+
+
+@contextmanager
+def cliente_de(origen):
+    # origen: un cliente ya prestado o el pool. Con el pool el cliente se pide
+    # recién acá, cuando de verdad hay que ir a la base
+    if isinstance(origen, PoolSupabase):
+        with origen.cliente() as supabase:
+            yield supabase
+    else:
+        yield origen
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obtener_pool() -> PoolSupabase:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolSupabase(SUPABASE_URL, SUPABASE_ANON_KEY)
+    return _pool
+
+
+_pool_rrhh = None
+_pool_rrhh_lock = threading.Lock()
+
+
+def obtener_pool_rrhh() -> PoolSupabase:
+    # Pool aparte con SUPABASE_CLAVE_RRHH, solo para la carga masiva
+    global _pool_rrhh
+    if _pool_rrhh is None:
+        with _pool_rrhh_lock:
+            if _pool_rrhh is None:
+                _pool_rrhh = PoolSupabase(SUPABASE_URL, SUPABASE_CLAVE_RRHH, tamano=TAMANO_POOL_RRHH)
+    return _pool_rrhh
@@ -0,0 +1,41 @@
+# ================== ELEGIBILIDAD DE UN CUIL (PASO 3) ==================
+# Una sola RPC (sql/verificar_elegibilidad_inscripcion.sql): existencia, historial,
+# inscripción previa, datos del agente y motivo de bloqueo.
+# El perfil sale de la caché de agentes si está (ver agentes.py); existencia,
+# historial e inscripción en la comisión se consultan siempre. La RPC devuelve
+# el perfil solo para un CUIL habilitado, y solo entonces se completa.
+# Pedidos simultáneos con los mismos datos (doble clic, varias pestañas)
+# comparten una sola RPC (ver vuelo_unico.py). El cliente del pool se pide
+# dentro de la llamada compartida: solo la que va a la base ocupa uno.
+from agentes import guardar_perfil, perfil_en_cache
+from conexion import cliente_de
+from metricas import medir
+from vuelo_unico import vuelos
+
+
+def rpc_elegibilidad(origen, cuil: str, comision_id: str, id_actividad: str, omitir_perfil: bool):
+    with cliente_de(origen) as supabase, medir("rpc.verificar_elegibilidad_inscripcion"):
+        return supabase.rpc("verificar_elegibilidad_inscripcion", {
+            "cuil_input": cuil,
+            "comision_id_input": comision_id,
+            "id_actividad_input": id_actividad,
+            "omitir_perfil_input": omitir_perfil
+        }).execute().data
+
+
+def consultar_elegibilidad(origen, cuil: str, comision_id: str, id_actividad: str):
+    # origen: el pool o un cliente ya prestado. Resultado de la RPC, o None si
+    # no devolvió filas; los errores (incluido PoolAgotado) se propagan
+    perfil = perfil_en_cache(cuil)
+    clave = ("elegibilidad", cuil, comision_id, id_actividad, perfil is not None)
+    datos = vuelos.hacer(clave, rpc_elegibilidad, origen, cuil, comision_id, id_actividad, perfil is not None)
+    if not isinstance(datos, list) or not datos:
+        return None
+    resultado = dict(datos[0])  # el resultado compartido no se modifica
+    if resultado.get("motivo_bloqueo"):
+        resultado["datos"] = None
+    elif perfil is not None:
+        resultado["datos"] = perfil
+    else:
+        guardar_perfil(cuil, resultado.get("datos"))
+    return resultado
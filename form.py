@@ -1,36 +1,109 @@
 # ================== IMPORTACIONES ==================
+# Solo lo que usa la primera ejecución: supabase se importa al crear el primer
+# cliente (conexion.py) y st_aggrid al elegir la tabla paginada (tabla_paginada.py)
+import time
 import streamlit as st
 import pandas as pd
-import time
-import random
-from datetime import date, datetime
-from st_aggrid import AgGrid, GridOptionsBuilder, JsCode
-from supabase import create_client, Client
-from collections import defaultdict
 import os
-import streamlit.components.v1 as components
+import uuid
+import agentes
+from busqueda import MAX_RESULTADOS
+from catalogo import cache_catalogo, obtener_catalogo
+from cola_inscripciones import CONFIRMADA, FALLIDA, PENDIENTE, obtener_cola
+from elegibilidad import consultar_elegibilidad
+from invalidacion import iniciar_escucha
+from inscripciones import armar_inscripcion
+import limites
+import metricas
+import perfilado
+from metricas import medida, medir
+from perfilado import asignaciones
+from conexion import SUPABASE_URL, SUPABASE_ANON_KEY, PoolAgotado, obtener_pool
+from presentacion import COLUMNAS_TABLA, ESTILOS_TARJETAS, cache_tablas, cache_tarjetas, tabla_html, tarjetas_html
+from selector_comisiones import selector_comisiones
+from tabla_paginada import mostrar_tabla_paginada
+from vuelo_unico import vuelos
+
+inicio_rerun = time.perf_counter()
+
+# ========== PERFILADO (opcional) ==========
+# ?perfilar=<PERFILADO_CLAVE> perfila esta ejecución completa (ver perfilado.py)
+perfil = perfilado.iniciar(st.query_params)
 
 # ========== CONEXIÓN A SUPABASE ==========
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_ANON_KEY = os.environ.get("SUPABASE_ANON_KEY")
-
 if not SUPABASE_URL or not SUPABASE_ANON_KEY:
     st.error("❌ No se encontraron las credenciales de Supabase en las variables de entorno.")
     st.stop()
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+# Pool compartido por todas las sesiones del proceso (ver conexion.py)
+pool = obtener_pool()
+# Las inscripciones se reciben al instante y se escriben en segundo plano (ver cola_inscripciones.py)
+cola = obtener_cola(pool)
+# Avisos de la base cuando cambia el catálogo (ver invalidacion.py); sin DSN, solo TTL
+escucha = iniciar_escucha(cache_catalogo)
+
+# ========== MÉTRICAS ==========
+# Histogramas por fase + estadísticas de pool, cola y cachés (ver metricas.py);
+# el endpoint se abre una sola vez por proceso si METRICAS_PUERTO está definido
+metricas.registrar_colector("pool", pool.estadisticas)
+metricas.registrar_colector("cola", cola.estadisticas)
+metricas.registrar_colector("catalogo", cache_catalogo.estadisticas)
+metricas.registrar_colector("tablas", cache_tablas.estadisticas)
+metricas.registrar_colector("tarjetas", cache_tarjetas.estadisticas)
+metricas.registrar_colector("perfiles", agentes.estadisticas)
+metricas.registrar_colector("limites", limites.estadisticas)
+metricas.registrar_colector("vuelos", vuelos.estadisticas)
+if escucha is not None:
+    metricas.registrar_colector("invalidacion", escucha.estadisticas)
+metricas.iniciar_servidor()
 
 # ========== CONFIGURACIÓN DE PÁGINA ==========
 st.set_page_config(layout="wide")
 
-# ========== RESET GLOBAL (post inscripción) ==========
-if st.session_state.get("inscripcion_exitosa", False):
+# ========== CONFIRMACIÓN (post inscripción) ==========
+# La deja enviar_inscripcion(); se muestra una sola vez, sin pausar el hilo ni forzar otro rerun.
+# En ese momento la inscripción está en el spool, todavía no en la base.
+confirmacion = st.session_state.pop("confirmacion_inscripcion", None)
+if confirmacion:
     st.balloons()
-    st.success("✅ ¡Preinscripción exitosa! Tus datos fueron enviados correctamente.")
-    time.sleep(1.5)
-    st.session_state.clear()
-    st.query_params.clear()
-    st.rerun()
+    st.success(f"📨 ¡Preinscripción recibida en {confirmacion['actividad']}! "
+               "Queda pendiente de confirmación: te avisamos en esta página cuando se registre.")
+    st.caption(f"Número de recibo: {confirmacion['recibo']}")
+
+# ========== ESTADO DE LAS INSCRIPCIONES ENVIADAS ==========
+# recibo -> actividad, mientras la cola no la confirme ni la dé por fallida.
+# Un fragmento consulta cola.estado() cada ENVIOS_CONSULTA_CADA segundos y,
+# cuando alguna se resuelve, pide una ejecución completa para mostrar el resultado.
+ENVIOS_CONSULTA_CADA = 2
+
+
+def resolver_envios() -> bool:
+    # Muestra y retira las ya resueltas; True si queda alguna pendiente
+    envios = st.session_state.get("envios_pendientes", {})
+    for recibo, actividad in list(envios.items()):
+        estado = cola.estado(recibo)
+        if estado == PENDIENTE:
+            continue
+        del envios[recibo]
+        if estado == CONFIRMADA:
+            st.success(f"✅ Preinscripción confirmada en {actividad}.")
+        elif estado == FALLIDA:
+            st.error(f"❌ No se pudo registrar la preinscripción en {actividad}. "
+                     f"Volvé a enviarla o comunicate con la coordinación (recibo {recibo}).")
+    return bool(envios)
+
+
+@st.fragment(run_every=ENVIOS_CONSULTA_CADA)
+def seguir_envios():
+    envios = st.session_state.get("envios_pendientes", {})
+    if any(cola.estado(recibo) != PENDIENTE for recibo in envios):
+        st.rerun()
+    for recibo, actividad in envios.items():
+        st.info(f"⏳ Preinscripción en {actividad} pendiente de confirmación (recibo {recibo}).")
+
+
+if resolver_envios():
+    seguir_envios()
 
 # ========== ESTILOS PERSONALIZADOS ==========
 st.markdown("""
@@ -68,6 +141,9 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ========== FUNCIONES ==========
+# Todos los clientes del pool ocupados más de SUPABASE_POOL_ESPERA (ver conexion.py)
+MENSAJE_POOL_AGOTADO = "⏳ Hay mucha demanda en este momento. Volvé a intentar en unos segundos."
+
 def validar_cuil(cuil: str) -> bool:
     if not cuil.isdigit() or len(cuil) != 11:
         return False
@@ -78,841 +154,482 @@ def validar_cuil(cuil: str) -> bool:
     elif verificador == 10: verificador = 9
     return verificador == int(cuil[-1])
 
-def verificar_formulario_cuil(supabase: Client, cuil: str) -> bool:
-    try:
-        response = supabase.rpc("verificar_formulario_cuil", {"cuil_input": cuil}).execute()
-        return response.data[0].get("existe", False)
-    except Exception:
-        st.error("Error al verificar el CUIL en la base de datos.")
-        return False
-
-def verificar_formulario_historial(supabase: Client, cuil: str, id_actividad: str) -> bool:
-    try:
-        response = supabase.rpc("verificar_formulario_historial", {
-            "cuil_input": cuil,
-            "id_actividad_input": id_actividad
-        }).execute()
-        if isinstance(response.data, list) and response.data:
-            return response.data[0].get("existe", False)
-        return False
-    except Exception:
-        return False
+def id_sesion() -> str:
+    # Clave del límite por sesión (ver limites.py); vive mientras viva la sesión
+    return st.session_state.setdefault("id_sesion", uuid.uuid4().hex)
 
-def verificar_formulario_comision(supabase: Client, cuil: str, comision_id: str) -> bool:
+def verificar_elegibilidad(cuil: str, comision_id: str, id_actividad: str):
+    # Ver elegibilidad.py: una RPC compartida entre pedidos iguales simultáneos,
+    # con el cliente del pool pedido solo por la que va a la base.
+    # None si falla la consulta.
     try:
-        response = supabase.rpc("verificar_formulario_comision", {
-            "cuil_input": cuil,
-            "comision_id_input": comision_id
-        }).execute()
-        if isinstance(response.data, list) and response.data:
-            return response.data[0].get("existe", False)
-        return False
-    except Exception:
-        return False
-
-def obtener_datos_para_formulario(supabase: Client, cuil: str) -> dict:
-    try:
-        response = supabase.rpc("obtener_datos_para_formulario", {"cuil_input": cuil}).execute()
-        if response.data and isinstance(response.data, list):
-            return response.data[0]  # Devuelve un dict
-        return {}
+        return consultar_elegibilidad(pool, cuil, comision_id, id_actividad)
+    except PoolAgotado:
+        st.error(MENSAJE_POOL_AGOTADO)
+        return None
     except Exception as e:
-        st.error(f"Error al obtener los datos del formulario: {e}")
-        return {}
-
-# ========== CARGA DE DATOS DESDE VISTA ==========
-def obtener_comisiones():
-    resp = supabase.table("vista_comisiones_abiertas").select(
-        "id, id_comision_sai, organismo, id_actividad, nombre_actividad, "
-        "fecha_desde, fecha_hasta, fecha_cierre, creditos, modalidad_cursada, "
-        "link_externo, apto_tramo"
-    ).execute()
-    return resp.data if resp.data else []
-
-comisiones_raw = obtener_comisiones()
-
-# ========== CREAR DATAFRAME ==========
-df_temp = pd.DataFrame(comisiones_raw)
-
-# Conversión de fechas
-df_temp["fecha_desde"] = pd.to_datetime(df_temp["fecha_desde"], errors="coerce")
-df_temp["fecha_hasta"] = pd.to_datetime(df_temp["fecha_hasta"], errors="coerce")
-df_temp["fecha_cierre"] = pd.to_datetime(df_temp["fecha_cierre"], errors="coerce")
-
-# Campos obligatorios
-required_cols = ["id_comision_sai", "nombre_actividad", "fecha_desde", "fecha_hasta"]
-df_temp = df_temp.dropna(subset=required_cols)
-
-# Campos visuales
-df_temp["Actividad"] = df_temp["nombre_actividad"]
-df_temp["Comisión"] = df_temp["id_comision_sai"]
-df_temp["Fecha inicio"] = df_temp["fecha_desde"].dt.strftime("%d/%m/%Y")
-df_temp["Fecha fin"] = df_temp["fecha_hasta"].dt.strftime("%d/%m/%Y")
-df_temp["Fecha cierre"] = df_temp["fecha_cierre"].dt.strftime("%d/%m/%Y")
-df_temp["Actividad dropdown"] = (
-    df_temp["nombre_actividad"] + " (" + df_temp["Fecha inicio"] + " al " + df_temp["Fecha fin"] + ")"
-)
-df_temp["Actividad (Comisión)"] = df_temp["nombre_actividad"] + " (" + df_temp["id_comision_sai"] + ")"
-df_temp["Créditos"] = df_temp["creditos"].fillna(0).astype(int)
-
-def clasificar_duracion(creditos):
-    if 1 <= creditos < 10: return "BREVE (hasta 10 hs)"
-    elif 10 <= creditos < 20: return "INTERMEDIA (entre 10 y 20 hs)"
-    elif creditos >= 20: return "PROLONGADA (más de 20 hs)"
-    return "SIN CLASIFICAR"
-
-df_temp["Duración"] = df_temp["Créditos"].apply(clasificar_duracion)
-df_temp["Modalidad"] = df_temp["modalidad_cursada"]
-df_temp["Apto tramo"] = df_temp["apto_tramo"].fillna("No")
-df_temp["Ver más"] = df_temp["link_externo"]  # solo URL
-
-# ========== PASO 1: FILTROS ==========
-with st.container():
-    st.markdown('<div class="paso-container">', unsafe_allow_html=True)
-    st.markdown("##### 1) Revisá la oferta de actividades disponibles.")
-
-    organismos = sorted(df_temp["organismo"].dropna().unique().tolist())
-    modalidades = sorted(df_temp["Modalidad"].dropna().unique().tolist())
-    duraciones = sorted(df_temp["Duración"].dropna().unique().tolist())
-
-    organismos.insert(0, "Todos")
-    modalidades.insert(0, "Todos")
-    duraciones.insert(0, "Todas")
-
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        organismo_sel = st.selectbox("Organismo", organismos, index=0)
-    with col2:
-        modalidad_sel = st.selectbox("Modalidad", modalidades, index=0)
-    with col3:
-        duracion_sel = st.selectbox("Duración", duraciones, index=0)
-
-    df_filtrado = df_temp.copy()
-    if organismo_sel != "Todos":
-        df_filtrado = df_filtrado[df_filtrado["organismo"] == organismo_sel]
-    if modalidad_sel != "Todos":
-        df_filtrado = df_filtrado[df_filtrado["Modalidad"] == modalidad_sel]
-    if duracion_sel != "Todas":
-        df_filtrado = df_filtrado[df_filtrado["Duración"] == duracion_sel]
-
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# ========== TABLA CON ALTURA FIJA ==========
-with st.container():
-    st.markdown('<div class="tabla-container">', unsafe_allow_html=True)
-
-    # Recalcular columna combinada como Actividad (Comisión)
-    #df_temp["Actividad (Comisión)"] = df_temp["nombre_actividad"] + " (" + df_temp["id_comision_sai"] + ")"
-    df_filtrado["Actividad (Comisión)"] = df_filtrado["nombre_actividad"] + " (" + df_filtrado["id_comision_sai"] + ")"
-
-
-    df_comisiones = df_filtrado[[
-        "Actividad (Comisión)", "Fecha inicio", "Fecha fin", "Fecha cierre",
-        "Créditos", "Modalidad", "Apto tramo", "Ver más"
-    ]].reset_index(drop=True)
-
-    def create_html_table(df):
-        if df.empty:
-            st.warning("No se encontraron cursos con los filtros seleccionados.")
-            return ""
-
-        table_id = f"coursesTable_{hash(str(df.values.tobytes())) % 10000}"
-
-        html = f"""
-        <style>
-        .courses-table {{
-            width: 90%;
-            margin: 0 auto;
-            border-collapse: collapse;
-            font-size: 12px;
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-            border-radius: 8px;
-            overflow: hidden;
-            background-color: white;
-        }}
-        .courses-table thead tr {{
-            background-color: #136ac1;
-            color: #ffffff;
-            text-align: left;
-            font-weight: bold;
-        }}
-        .courses-table th, .courses-table td {{
-            padding: 10px 8px;
-            border-bottom: 1px solid #e0e0e0;
-        }}
-        .courses-table tbody tr {{
-            background-color: #ffffff;
-            transition: all 0.3s ease;
-            cursor: pointer;
-        }}
-        .courses-table tbody tr:hover {{
-            background-color: #e3f2fd;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(19, 106, 193, 0.3);
-        }}
-        .courses-table tbody tr.selected {{
-            background-color: #bbdefb !important;
-            border-left: 4px solid #136ac1;
-        }}
-        .courses-table a {{
-            color: #136ac1;
-            text-decoration: none;
-            font-weight: bold;
-            padding: 4px 8px;
-            border: 2px solid #136ac1;
-            border-radius: 5px;
-            transition: all 0.3s ease;
-            display: inline-block;
-        }}
-        .courses-table a:hover {{
-            background-color: #136ac1;
-            color: white;
-            transform: scale(1.05);
-        }}
-        .no-link {{
-            color: #bdc3c7;
-            font-style: italic;
-        }}
-        </style>
-        <div style="overflow-x: auto; margin-bottom: 0;">
-        <table class="courses-table" id="{table_id}">
-        <thead>
-        <tr>
-            <th>Actividad (Comisión)</th>
-            <th>Inicio</th>
-            <th>Fin</th>
-            <th>Cierre</th>
-            <th>Créditos</th>
-            <th>Modalidad</th>
-            <th>Tramo</th>
-            <th>INAP</th>
-        </tr>
-        </thead>
-        <tbody>
-        """
-
-        for _, row in df.iterrows():
-            onclick_code = f"selectActivity('{row['Actividad (Comisión)']}', this)"
-            html += f'<tr onclick="{onclick_code}">' \
-                    + f'<td>{row["Actividad (Comisión)"]}</td>' \
-                    + f'<td>{row["Fecha inicio"]}</td>' \
-                    + f'<td>{row["Fecha fin"]}</td>' \
-                    + f'<td>{row["Fecha cierre"]}</td>' \
-                    + f'<td>{row["Créditos"]}</td>' \
-                    + f'<td>{row["Modalidad"]}</td>' \
-                    + f'<td>{row["Apto tramo"]}</td>'
-
-            if pd.notna(row["Ver más"]) and row["Ver más"]:
-                html += f'<td><a href="{row["Ver más"]}" target="_blank" onclick="event.stopPropagation()">Acceder</a></td>'
-            else:
-                html += '<td><span class="no-link">Sin enlace</span></td>'
-
-            html += '</tr>'
-
-        html += """
-        </tbody>
-        </table>
-        </div>
-        <script>
-        let selectedRow = null;
-        function selectActivity(activityName, row) {
-            if (selectedRow) selectedRow.classList.remove('selected');
-            selectedRow = row;
-            row.classList.add('selected');
-            sessionStorage.setItem('selected_activity', activityName);
-            window.parent.postMessage({
-                type: 'streamlit:setQueryParams',
-                queryParams: { "selected_activity": activityName }
-            }, '*');
-        }
-        </script>
-        """
-
-        return html
-
-    html_code = create_html_table(df_comisiones)
-
-    # DataTables
-    html_code += """
-    <link rel="stylesheet" href="https://cdn.datatables.net/1.13.4/css/jquery.dataTables.min.css">
-    <script src="https://code.jquery.com/jquery-3.6.0.min.js"></script>
-    <script src="https://cdn.datatables.net/1.13.4/js/jquery.dataTables.min.js"></script>
-    <script>
-    $(document).ready(function() {
-        const table = $("table").first();
-        table.DataTable({
-            pageLength: 10,
-            dom: '<"top"f<"length-menu"l>>rt<"bottom"ip><"clear">',
-            language: {
-                search: "", searchPlaceholder: "🔍 Buscar...",
-                lengthMenu: "Mostrar _MENU_ registros por página",
-                zeroRecords: "No se encontraron resultados",
-                info: "Mostrando página _PAGE_ de _PAGES_",
-                infoEmpty: "No hay registros disponibles",
-                infoFiltered: "(filtrado de _MAX_ registros totales)",
-                paginate: { previous: "Anterior", next: "Siguiente" }
-            }
-        });
-        $(".dataTables_filter").css({ "float": "left", "margin-bottom": "10px" });
-        $(".dataTables_filter input").css({ "width": "300px" });
-        $(".dataTables_length").css({ "float": "right" });
-    });
-    </script>
-    """
-
-    altura_dinamica = min(600, 100 + (len(df_comisiones) * 50))
-    components.html(html_code, height=altura_dinamica, scrolling=True)
-
-# ========== TARJETAS DESTACADAS ==========
-st.markdown("---")
-st.subheader("🌟 Actividades destacadas")
+        st.error(f"Error al verificar el CUIL en la base de datos: {e}")
+        return None
+
+# Estado del flujo de inscripción (pasos 2 a 4). Filtros, modo de tabla y
+# paginado no se tocan: después de inscribirse se sigue en el mismo listado.
+CLAVES_INSCRIPCION = [
+    "actividad_key_default", "actividad_anterior", "actividad_seleccionada", "campo_actividad",
+    "comision_seleccionada_id", "actividad_nombre", "comision_nombre", "fecha_inicio", "fecha_fin",
+    "comision_id", "id_actividad", "cuil_input", "cuil", "cuil_valido", "validado", "motivo_bloqueo",
+    "limite_espera", "datos_agenteform", "nivel_educativo", "titulo", "tareas_desarrolladas",
+    "email_alternativo",
+]
+
+
+def enviar_inscripcion():
+    # Callback del botón ENVIAR: corre antes del rerun, así puede limpiar los
+    # widgets del formulario sin esperar ni pedir otra ejecución
+    estado = st.session_state
+    # Un clic tardío (otra pestaña, doble clic) puede llegar con el flujo ya limpio
+    if not estado.get("cuil_valido") or not estado.get("comision_id"):
+        estado["error_envio"] = "⚠️ Validá el CUIL y elegí una comisión antes de enviar."
+        return
+
+    email_alternativo = estado.get("email_alternativo", "")
+    if email_alternativo and "@" not in email_alternativo:
+        estado["error_envio"] = "⚠️ El correo alternativo no es válido."
+        return
+
+    nivel_educativo = estado.get("nivel_educativo")
+    datos_inscripcion = armar_inscripcion(
+        estado.get("datos_agenteform", {}),
+        comision_id=estado.get("comision_id"),
+        cuil=estado.get("cuil", ""),
+        nivel_educativo=nivel_educativo if nivel_educativo != "-Seleccioná último nivel completo-" else None,
+        titulo=estado.get("titulo", "").upper(),
+        tareas=estado.get("tareas_desarrolladas", "").lower(),
+        email_alternativo=email_alternativo,
+    )
+    try:
+        recibo = cola.encolar(datos_inscripcion)
+    except OSError:
+        estado["error_envio"] = "❌ Ocurrió un error al guardar la inscripción."
+        return
 
-tarjetas = df_comisiones.head(6).to_dict(orient="records")
+    estado["confirmacion_inscripcion"] = {"actividad": estado.get("actividad_nombre"), "recibo": recibo}
+    estado.setdefault("envios_pendientes", {})[recibo] = estado.get("actividad_nombre")
+    for clave in CLAVES_INSCRIPCION:
+        estado.pop(clave, None)
 
-# CSS para tarjetas
-st.markdown("""
-<style>
-.card-grid {
-    display: grid;
-    grid-template-columns: repeat(3, 1fr);
-    gap: 25px;
-    margin-top: 20px;
-}
 
-.card {
-    background-color: #f9f9f9;
-    padding: 20px;
-    border-left: 5px solid #136ac1;
-    border-radius: 10px;
-    box-shadow: 1px 1px 5px rgba(0,0,0,0.05);
-    transition: transform 0.2s ease, box-shadow 0.2s ease;
-    height: 220px;
-}
+# ========== CARGA DE DATOS DESDE VISTA ==========
+# Caché compartida por proceso (TTL + sincronización incremental). El DataFrame
+# derivado se construye una sola vez por versión del catálogo (ver catalogo.py).
+# Se pasa el pool: solo la sesión que trae el catálogo de la base toma un cliente.
+try:
+    with medir("catalogo"):
+        catalogo_actual = obtener_catalogo(pool)
+except PoolAgotado:
+    st.error(MENSAJE_POOL_AGOTADO)
+    st.button("Reintentar", key="reintentar_catalogo")
+    st.stop()
 
-.card:hover {
-    transform: scale(1.03);
-    box-shadow: 0 8px 18px rgba(0,0,0,0.15);
-}
+# ========== FRAGMENTOS POR PASO ==========
+# Cada paso es un st.fragment: escribir el CUIL o completar el formulario
+# re-ejecuta solo ese paso, no el catálogo, la tabla ni las tarjetas.
+# Lo que un paso le pasa a los siguientes viaja por session_state; cuando eso
+# cambia durante la re-ejecución de un fragmento se pide una ejecución completa
+# para que los demás pasos lo vean (avisar_cambio).
+corrida_completa = True  # vuelve a False al final del script
 
-.card h4 {
-    margin-top: 0;
-    font-size: 16px;
-    color: #136ac1;
-}
 
-.card p {
-    margin: 6px 0;
-    font-size: 14px;
-}
+def avisar_cambio():
+    if not corrida_completa:
+        st.rerun()
 
-/* Responsivo */
-@media (max-width: 900px) {
-  .card-grid {
-    grid-template-columns: repeat(2, 1fr);
-  }
-}
-@media (max-width: 600px) {
-  .card-grid {
-    grid-template-columns: 1fr;
-  }
-}
-</style>
-""", unsafe_allow_html=True)
 
-# HTML de las tarjetas
-html_tarjetas = '<div class="card-grid">'
-
-for item in tarjetas:
-    html_tarjetas += (
-        '<div class="card">'
-        f"<h4>{item['Actividad (Comisión)']}</h4>"
-        f"<p><b>📅 Fechas:</b> {item['Fecha inicio']} al {item['Fecha fin']}</p>"
-        f"<p><b>🎓 Modalidad:</b> {item['Modalidad']}</p>"
-        f"<p><b>⭐ Créditos:</b> {item['Créditos']}</p>"
-        "</div>"
-    )
+def seleccionar_comision(catalogo, id_comision: str):
+    # Deja la comisión elegida lista para el dropdown del paso 2
+    etiqueta = catalogo.etiquetas.get(id_comision)
+    if etiqueta is not None:
+        st.session_state["actividad_pendiente"] = id_comision
+        st.session_state["actividad_seleccionada"] = etiqueta
+        st.session_state["campo_actividad"] = etiqueta
+        st.session_state["comision_seleccionada_id"] = id_comision
+        avisar_cambio()
 
-html_tarjetas += '</div>'
 
-# Mostrar tarjetas (HTML renderizado)
-st.markdown(html_tarjetas, unsafe_allow_html=True)
+@medida("filtrado")
+@asignaciones("filtrado")
+def comisiones_filtradas(catalogo) -> pd.DataFrame:
+    filtros_sel = st.session_state.get("filtros_sel", (None, None, None))
+    return catalogo.filtros.filtrar(*filtros_sel)[["id"] + COLUMNAS_TABLA].reset_index(drop=True)
 
 
-# ========== TARJETAS INTERACTIVAS (con botones reales y animación) ==========
+# ========== PASO 1: FILTROS + TABLA ==========
+MODOS_TABLA = ["Tabla completa", "Tabla paginada"]
 
-st.markdown("---")
-st.subheader("📝 Actividades destacadas (modo interactivo)")
 
-# Inicializar variable en session_state para guardar la selección
-if "actividad_seleccionada" not in st.session_state:
-    st.session_state.actividad_seleccionada = ""
+@st.fragment
+@medida("paso_filtros_tabla")
+def paso_filtros_tabla(catalogo):
+    with st.container():
+        st.markdown('<div class="paso-container">', unsafe_allow_html=True)
+        st.markdown("##### 1) Revisá la oferta de actividades disponibles.")
 
-tarjetas = df_comisiones.head(6).to_dict(orient="records")
+        indice = catalogo.filtros
+        organismos = ["Todos"] + indice.opciones["organismo"]
+        modalidades = ["Todos"] + indice.opciones["modalidad"]
+        duraciones = ["Todas"] + indice.opciones["duracion"]
 
-# CSS para animación y botones alineados
-st.markdown("""
-<style>
-.card {
-    background-color:#f9f9f9;
-    padding:20px;
-    border-left:5px solid #136ac1;
-    border-radius:10px;
-    box-shadow:1px 1px 5px rgba(0,0,0,0.05);
-    margin-bottom:15px;
-    min-height:220px;
-    transition: transform 0.25s ease, box-shadow 0.25s ease;
-}
-.card:hover {
-    transform: scale(1.03);
-    box-shadow: 0 8px 18px rgba(0,0,0,0.15);
-}
-.card h4 {
-    color:#136ac1;
-    font-size:16px;
-    margin:0 0 8px 0;
-}
-.card p {
-    margin:4px 0;
-}
-.card-buttons {
-    display: flex;
-    gap: 10px;
-    margin-top: 12px;
-}
-.card-buttons a, .card-buttons button {
-    flex: 1;
-    text-align: center;
-    padding: 6px 12px;
-    border-radius: 6px;
-    font-size: 13px;
-    font-weight: bold;
-    cursor: pointer;
-    transition: all 0.2s ease;
-}
-.btn-acceder {
-    background-color:#136ac1;
-    color:white;
-    border:none;
-    text-decoration:none;
-}
-.btn-acceder:hover {
-    background-color:#0e4f91;
-}
-.btn-anotarse {
-    background-color:white;
-    border:2px solid #136ac1;
-    color:#136ac1;
-}
-.btn-anotarse:hover {
-    background-color:#136ac1;
-    color:white;
-}
-</style>
-""", unsafe_allow_html=True)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            organismo_sel = st.selectbox("Organismo", organismos, index=0)
+        with col2:
+            modalidad_sel = st.selectbox("Modalidad", modalidades, index=0)
+        with col3:
+            duracion_sel = st.selectbox("Duración", duraciones, index=0)
+
+        # Resultado memorizado por combinación de filtros para la versión actual del catálogo
+        filtros_sel = (
+            None if organismo_sel == "Todos" else organismo_sel,
+            None if modalidad_sel == "Todos" else modalidad_sel,
+            None if duracion_sel == "Todas" else duracion_sel,
+        )
+        if st.session_state.get("filtros_sel") != filtros_sel:
+            # Las tarjetas destacadas dependen de los filtros
+            st.session_state["filtros_sel"] = filtros_sel
+            avisar_cambio()
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # ========== TABLA CON ALTURA FIJA ==========
+    with st.container():
+        st.markdown('<div class="tabla-container">', unsafe_allow_html=True)
+
+        df_comisiones = comisiones_filtradas(catalogo)
+
+        modo_tabla = st.radio(
+            "Vista de la tabla", MODOS_TABLA, horizontal=True, key="modo_tabla",
+            index=1 if os.environ.get("MODO_TABLA") == "paginada" else 0,
+        )
+
+        if modo_tabla == "Tabla paginada":
+            # Solo la página visible viaja al navegador (ver tabla_paginada.py)
+            id_grilla = mostrar_tabla_paginada(catalogo, filtros_sel)
+            if id_grilla and id_grilla != st.session_state.get("grilla_id_aplicado"):
+                st.session_state["grilla_id_aplicado"] = id_grilla
+                seleccionar_comision(catalogo, id_grilla)
+        elif df_comisiones.empty:
+            st.warning("No se encontraron cursos con los filtros seleccionados.")
+        else:
+            # Fragmento HTML en caché por versión del catálogo + filtros (ver presentacion.py).
+            # El clic en una fila devuelve el id de la comisión (ver selector_comisiones.py)
+            html_code = tabla_html(df_comisiones, catalogo.version, filtros_sel)
+            id_tabla = selector_comisiones(
+                html_code, "tabla", key="selector_tabla",
+                seleccionado=st.session_state.get("comision_seleccionada_id"),
+            )
+            if id_tabla:
+                seleccionar_comision(catalogo, id_tabla)
 
-# Grid de 3 tarjetas por fila
-cols = st.columns(3)
-
-for i, item in enumerate(tarjetas):
-    with cols[i % 3]:
-        # Caja con estilo + botones alineados
-        st.markdown(f"""
-        <div class="card">
-            <h4>{item['Actividad (Comisión)']}</h4>
-            <p><b>📅 Fechas:</b> {item['Fecha inicio']} al {item['Fecha fin']}</p>
-            <p><b>🎓 Modalidad:</b> {item['Modalidad']}</p>
-            <p><b>⭐ Créditos:</b> {item['Créditos']}</p>
-            <div class="card-buttons">
-                {"<a href='" + item['Ver más'] + "' target='_blank' class='btn-acceder'>🌐 Acceder</a>" if item["Ver más"] else "<span class='no-link'>Sin enlace</span>"}
-                <button onclick="window.parent.postMessage({{type: 'streamlit:setSessionState', key: 'actividad_seleccionada', value: '{item['Actividad (Comisión)']}' }}, '*');" class="btn-anotarse">📝 Anotarse</button>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
 
-# Campo vacío debajo que se llena al hacer clic en "Anotarse"
-st.markdown("### 🏷️ Actividad seleccionada")
-st.text_input("Nombre de la actividad", st.session_state.actividad_seleccionada, key="campo_actividad")
+# ========== TARJETAS DESTACADAS ==========
+# Las tres secciones muestran la misma selección (criterio en DESTACADAS_ORDEN)
+# con el HTML en caché por versión del catálogo + filtros + variante (ver presentacion.py)
+@st.fragment
+@medida("tarjetas")
+def paso_tarjetas(catalogo):
+    filtros_sel = st.session_state.get("filtros_sel", (None, None, None))
+    filtradas = catalogo.filtros.filtrar(*filtros_sel)
+
+    st.markdown("---")
+    st.subheader("🌟 Actividades destacadas")
+
+    # Estilos de las tarjetas de la página (grilla y flip) junto con la grilla
+    st.markdown(
+        ESTILOS_TARJETAS + tarjetas_html(filtradas, catalogo.version, filtros_sel, "grilla"),
+        unsafe_allow_html=True,
+    )
 
+    # ========== TARJETAS INTERACTIVAS (con botones reales y animación) ==========
 
+    st.markdown("---")
+    st.subheader("📝 Actividades destacadas (modo interactivo)")
 
+    # Inicializar variable en session_state para guardar la selección
+    if "actividad_seleccionada" not in st.session_state:
+        st.session_state.actividad_seleccionada = ""
 
+    # Tarjetas dentro del componente de selección: "Anotarse" devuelve el id de la comisión
+    id_tarjeta = selector_comisiones(
+        tarjetas_html(filtradas, catalogo.version, filtros_sel, "interactiva"), "tarjetas", key="selector_tarjetas",
+        seleccionado=st.session_state.get("comision_seleccionada_id"),
+    )
+    if id_tarjeta:
+        seleccionar_comision(catalogo, id_tarjeta)
 
-# ========== TARJETAS FLIP (efecto volteo) ==========
+    # Campo vacío debajo que se llena al hacer clic en "Anotarse"
+    st.markdown("### 🏷️ Actividad seleccionada")
+    if "campo_actividad" not in st.session_state:
+        st.session_state["campo_actividad"] = st.session_state.actividad_seleccionada
+    st.text_input("Nombre de la actividad", key="campo_actividad")
 
-st.markdown("---")
-st.subheader("🎴 Actividades destacadas (efecto flip)")
+    # ========== TARJETAS FLIP (efecto volteo) ==========
 
-tarjetas = df_comisiones.head(6).to_dict(orient="records")
-
-# CSS del flip
-st.markdown("""
-<style>
-.flip-card {
-  background-color: transparent;
-  width: 430px;
-  height: 230px;
-  perspective: 1000px;
-  margin: 10px auto;
-}
-.flip-card-inner {
-  position: relative;
-  width: 100%;
-  height: 100%;
-  text-align: center;
-  transition: transform 0.8s;
-  transform-style: preserve-3d;
-}
-.flip-card:hover .flip-card-inner {
-  transform: rotateY(180deg);
-}
-.flip-card-front, .flip-card-back {
-  position: absolute;
-  width: 100%;
-  height: 100%;
-  -webkit-backface-visibility: hidden;
-  backface-visibility: hidden;
-  border-radius: 10px;
-  box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-  display: flex;
-  justify-content: center;
-  align-items: center;
-  padding: 15px;
-}
-.flip-card-front {
-  background-color: #136ac1;
-  color: white;
-  font-weight: bold;
-  font-size: 14px;
-}
-.flip-card-back {
-  background-color: #f9f9f9;
-  color: #333;
-  transform: rotateY(180deg);
-  font-size: 13px;
-  line-height: 1.4;
-}
-</style>
-""", unsafe_allow_html=True)
-
-# Grid de 3 tarjetas
-cols = st.columns(3)
-
-for i, item in enumerate(tarjetas):
-    with cols[i % 3]:
-        st.markdown(f"""
-        <div class="flip-card">
-          <div class="flip-card-inner">
-            <div class="flip-card-front">
-              {item['Actividad (Comisión)']}
-            </div>
-            <div class="flip-card-back">
-              <p><b>📅 Fechas:</b> {item['Fecha inicio']} al {item['Fecha fin']}</p>
-              <p><b>🎓 Modalidad:</b> {item['Modalidad']}</p>
-              <p><b>⭐ Créditos:</b> {item['Créditos']}</p>
-            </div>
-          </div>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown("---")
+    st.subheader("🎴 Actividades destacadas (efecto flip)")
 
+    st.markdown(tarjetas_html(filtradas, catalogo.version, filtros_sel, "flip"), unsafe_allow_html=True)
 
 
 # ========== PASO 2: Selección de actividad ==========
-with st.container():
-    st.markdown('<div class="paso-container">', unsafe_allow_html=True)
-    st.markdown("##### 2) Seleccioná la actividad en la cual querés preinscribirte.")
-
-    # Actividad (Comisión) ya está en formato "nombre (ID)"
-    dropdown_list = ["-Seleccioná una actividad para preinscribirte-"] + df_temp["Actividad (Comisión)"].tolist()
-
-    # Leer valor desde query params o session_state
-    selected_from_query = st.query_params.get("selected_activity", [None])[0]
-    initial_index = 0
-
-    # Si hay valor en query param, usarlo
-    if selected_from_query in dropdown_list:
-        initial_index = dropdown_list.index(selected_from_query)
-    else:
-        selected_from_query = None
-        initial_index = 0
-
-    # 🔁 Mostrar dropdown con clave variable para forzar su reinicio completo
-    clave_selectbox = f"actividad_key_{random.randint(0, 999999)}" if st.session_state.get("__reset_placeholder") else "actividad_key_default"
-    actividad_seleccionada = st.selectbox("Actividad disponible", dropdown_list, index=initial_index, key=clave_selectbox)
-
-    # 🔐 Asegurarse de que el valor sea válido
-    if actividad_seleccionada not in dropdown_list:
-        actividad_seleccionada = dropdown_list[0]
-
-    # 🔁 Reinicio visual después de cerrar éxito
-    if st.session_state.get("__reset_placeholder", False):
-        st.session_state["__reset_placeholder"] = False
-        st.session_state["actividad_anterior"] = "-Seleccioná una actividad para preinscribirte-"
-
-    # 🧼 Detectar si cambió la selección
-    if "actividad_anterior" not in st.session_state:
-        st.session_state["actividad_anterior"] = ""
-
-    if actividad_seleccionada != st.session_state["actividad_anterior"]:
-        st.session_state["actividad_anterior"] = actividad_seleccionada
-        st.session_state["cuil_valido"] = False
-        st.session_state["validado"] = False
-        st.session_state["cuil"] = ""
-        st.session_state["datos_agenteform"] = {}
-
-    # ========== MOSTRAR DETALLES DE LA COMISIÓN ==========
-    if actividad_seleccionada != "-Seleccioná una actividad para preinscribirte-":
-        fila = df_temp[df_temp["Actividad (Comisión)"] == actividad_seleccionada].iloc[0]
-
-        # Guardar en session_state para uso posterior
-        st.session_state["actividad_nombre"] = fila["Actividad"]
-        st.session_state["comision_nombre"] = fila["Comisión"]
-        st.session_state["fecha_inicio"] = fila["Fecha inicio"]
-        st.session_state["fecha_fin"] = fila["Fecha fin"]
-        st.session_state["comision_id"] = fila["id"]
-        st.session_state["id_actividad"] = fila["id_actividad"]
-
-        # Mostrar
-        st.markdown(f"""
-        <div style="background-color: #f0f8ff; padding: 15px; border-left: 5px solid #136ac1; border-radius: 5px;">
-          <b>🟦 Actividad:</b> {fila['nombre_actividad']}<br>
-          <b>🆔 Comisión:</b> {fila['id_comision_sai']}<br>
-          <b>🧬 UUID Comisión:</b> <code>{fila['id']}</code><br>
-          <b>📅 Fechas:</b> {fila['fecha_desde']} al {fila['fecha_hasta']}<br>
-          <b>📌 Cierre Inscripción:</b> {fila['fecha_cierre']}<br>
-          <b>⭐ Créditos:</b> {fila['creditos']}<br>
-          <b>🎓 Modalidad:</b> {fila['modalidad_cursada']}<br>
-          <b>❓ Apto tramo:</b> {fila['apto_tramo']}<br>
-        </div>
-        """, unsafe_allow_html=True)
-
-
-
-    st.markdown('</div>', unsafe_allow_html=True)
+SIN_ACTIVIDAD = "-Seleccioná una actividad para preinscribirte-"
+# Enlace directo a una comisión: ?comision=<id>
+PARAMETRO_COMISION = "comision"
+
+
+@st.fragment
+@medida("paso_actividad")
+def paso_actividad(catalogo):
+    with st.container():
+        st.markdown('<div class="paso-container">', unsafe_allow_html=True)
+        st.markdown("##### 2) Seleccioná la actividad en la cual querés preinscribirte.")
+
+        # Las opciones son ids de comisión; la etiqueta sale del mapa id -> "nombre (ID)".
+        # Al navegador viajan solo las mejores coincidencias de la búsqueda
+        # (índice de trigramas, ver busqueda.py), no el catálogo completo
+        clave_selectbox = "actividad_key_default"
+
+        # Enlace ?comision=<id>: se aplica una vez por sesión y por id
+        id_enlace = st.query_params.get(PARAMETRO_COMISION)
+        if id_enlace and id_enlace != st.session_state.get("comision_enlace_aplicada"):
+            st.session_state["comision_enlace_aplicada"] = id_enlace
+            if id_enlace in catalogo.posiciones:
+                st.session_state["actividad_pendiente"] = id_enlace
+                st.session_state["comision_seleccionada_id"] = id_enlace
+
+        # Selección hecha en la tabla, las tarjetas o el enlace: se aplica al dropdown una sola vez
+        actividad_pendiente = st.session_state.pop("actividad_pendiente", None)
+        if actividad_pendiente in catalogo.posiciones:
+            st.session_state[clave_selectbox] = actividad_pendiente
+        elif st.session_state.get(clave_selectbox) not in catalogo.posiciones:
+            # La comisión elegida ya no está en esta versión del catálogo
+            st.session_state.pop(clave_selectbox, None)
+
+        consulta = st.text_input(
+            "🔍 Buscar actividad", key="actividad_busqueda",
+            placeholder="Nombre de la actividad, organismo o código de comisión",
+        )
+        if consulta.strip():
+            ids = [catalogo.ids[i] for i in catalogo.busqueda.buscar(consulta)]
+            if not ids:
+                st.caption("No se encontraron actividades para esa búsqueda.")
+        else:
+            ids = catalogo.ids[:MAX_RESULTADOS]
+            if len(catalogo.ids) > MAX_RESULTADOS:
+                st.caption(f"Mostrando {MAX_RESULTADOS} de {len(catalogo.ids)} actividades: escribí para buscar el resto.")
+        # La comisión ya elegida sigue disponible aunque no esté entre los resultados
+        elegida = st.session_state.get(clave_selectbox)
+        if elegida and elegida not in ids:
+            ids = [elegida] + ids
+
+        etiquetas = catalogo.etiquetas
+        actividad_seleccionada = st.selectbox(
+            "Actividad disponible", [None] + ids, key=clave_selectbox,
+            format_func=lambda i: SIN_ACTIVIDAD if i is None else etiquetas.get(i, i),
+        )
+
+        # 🧼 Detectar si cambió la selección (actividad_anterior es lo que leen los pasos 3 y 4)
+        if "actividad_anterior" not in st.session_state:
+            st.session_state["actividad_anterior"] = None
+
+        if actividad_seleccionada != st.session_state["actividad_anterior"]:
+            st.session_state["actividad_anterior"] = actividad_seleccionada
+            st.session_state["cuil_valido"] = False
+            st.session_state["validado"] = False
+            st.session_state["cuil"] = ""
+            st.session_state["datos_agenteform"] = {}
+            avisar_cambio()
+
+        # ========== MOSTRAR DETALLES DE LA COMISIÓN ==========
+        fila = catalogo.fila(actividad_seleccionada)
+        if fila is not None:
+
+            # Guardar en session_state para uso posterior
+            st.session_state["actividad_nombre"] = fila["Actividad"]
+            st.session_state["comision_nombre"] = fila["Comisión"]
+            st.session_state["fecha_inicio"] = fila["Fecha inicio"]
+            st.session_state["fecha_fin"] = fila["Fecha fin"]
+            st.session_state["comision_id"] = fila["id"]
+            st.session_state["id_actividad"] = fila["id_actividad"]
+
+            # Mostrar
+            st.markdown(f"""
+            <div style="background-color: #f0f8ff; padding: 15px; border-left: 5px solid #136ac1; border-radius: 5px;">
+              <b>🟦 Actividad:</b> {fila['nombre_actividad']}<br>
+              <b>🆔 Comisión:</b> {fila['id_comision_sai']}<br>
+              <b>🧬 UUID Comisión:</b> <code>{fila['id']}</code><br>
+              <b>📅 Fechas:</b> {fila['fecha_desde']} al {fila['fecha_hasta']}<br>
+              <b>📌 Cierre Inscripción:</b> {fila['fecha_cierre']}<br>
+              <b>⭐ Créditos:</b> {fila['creditos']}<br>
+              <b>🎓 Modalidad:</b> {fila['modalidad_cursada']}<br>
+              <b>❓ Apto tramo:</b> {fila['apto_tramo']}<br>
+            </div>
+            """, unsafe_allow_html=True)
 
+        st.markdown('</div>', unsafe_allow_html=True)
 
 
 # ========== PASO 3: Validación de CUIL ==========
-with st.container():
-    st.markdown('<div class="paso-container">', unsafe_allow_html=True)
-
-    if actividad_seleccionada != "-Seleccioná una actividad para preinscribirte-":
-        st.markdown("##### 3) Ingresá tu número de CUIL y validalo con el botón.")
-
-        cuil_input = st.text_input("CUIL (11 dígitos)", max_chars=11, key="cuil_input")
-
-        if st.button("Validar CUIL", key="validar_cuil_btn"):
-
-            def validar_cuil(cuil: str) -> bool:
-                if not cuil.isdigit() or len(cuil) != 11:
-                    return False
-                mult = [5, 4, 3, 2, 7, 6, 5, 4, 3, 2]
-                total = sum(int(cuil[i]) * mult[i] for i in range(10))
-                verificador = 11 - (total % 11)
-                if verificador == 11:
-                    verificador = 0
-                elif verificador == 10:
-                    verificador = 9
-                return verificador == int(cuil[-1])
-
-            def verificar_formulario_cuil(supabase: Client, cuil: str) -> bool:
-                try:
-                    response = supabase.rpc("verificar_formulario_cuil", {"cuil_input": cuil}).execute()
-                    return response.data[0].get("existe", False)
-                except:
-                    return False
-
-            def verificar_formulario_historial(supabase: Client, cuil: str, id_actividad: str) -> bool:
-                try:
-                    response = supabase.rpc("verificar_formulario_historial", {
-                        "cuil_input": cuil,
-                        "id_actividad_input": id_actividad
-                    }).execute()
-                    if isinstance(response.data, list) and response.data:
-                        return response.data[0].get("existe", False)
-                    return False
-                except:
-                    return False
-
-            def verificar_formulario_comision(supabase: Client, cuil: str, comision_id: str) -> bool:
-                try:
-                    response = supabase.rpc("verificar_formulario_comision", {
-                        "cuil_input": cuil,
-                        "comision_id_input": comision_id
-                    }).execute()
-                    if isinstance(response.data, list) and response.data:
-                        return response.data[0].get("existe", False)
-                    return False
-                except:
-                    return False
-
-            def obtener_datos_para_formulario(supabase: Client, cuil: str) -> dict:
-                try:
-                    response = supabase.rpc("obtener_datos_para_formulario", {"cuil_input": cuil}).execute()
-                    if response.data and isinstance(response.data, list):
-                        return response.data[0]
-                    return {}
-                except:
-                    return {}
-
-            if not validar_cuil(cuil_input):
-                st.session_state["cuil_valido"] = False
-                st.session_state["validado"] = True
-                st.session_state["motivo_bloqueo"] = "cuil_invalido"
-                st.error("CUIL/CUIT inválido. Verificá que tenga 11 dígitos y sea correcto.")
-
-            else:
-                existe = verificar_formulario_cuil(supabase, cuil_input)
-
-                # 🔍 DEBUG OPCIONAL
-                st.markdown("---")
-                st.subheader("🧪 DEBUG DE VALIDACIÓN DE CUIL")
-                st.write("🔍 CUIL ingresado:", cuil_input)
-                st.write("🔍 UUID comisión seleccionada:", st.session_state.get("comision_id"))
-            
-                resultado = verificar_formulario_comision(supabase, cuil_input, st.session_state.get("comision_id"))
-                st.write("✅ ¿Ya está inscripto según Supabase?", resultado)
-
-                
-                if not existe:
+@st.fragment
+@medida("paso_cuil")
+def paso_cuil():
+    with st.container():
+        st.markdown('<div class="paso-container">', unsafe_allow_html=True)
+
+        if st.session_state.get("actividad_anterior"):
+            st.markdown("##### 3) Ingresá tu número de CUIL y validalo con el botón.")
+
+            cuil_input = st.text_input("CUIL (11 dígitos)", max_chars=11, key="cuil_input")
+
+            if st.button("Validar CUIL", key="validar_cuil_btn"):
+                habilitado_antes = st.session_state.get("cuil_valido", False)
+
+                # Límite de intentos por sesión y por CUIL, y CUILs ya rechazados hace
+                # poco: se resuelve en el proceso, sin ir a la base (ver limites.py)
+                espera = limites.permitir_sesion(id_sesion())
+                motivo_previo = None if espera else limites.resultado_negativo(cuil_input)
+                if not espera and motivo_previo is None and not validar_cuil(cuil_input):
+                    motivo_previo = "cuil_invalido"
+                    limites.guardar_negativo(cuil_input, motivo_previo)
+                if not espera and motivo_previo is None:
+                    espera = limites.permitir_cuil(cuil_input)
+
+                if espera:
                     st.session_state["cuil_valido"] = False
                     st.session_state["validado"] = True
-                    st.session_state["motivo_bloqueo"] = "no_encontrado"
-                    st.error("⚠️ El CUIL/CUIT no corresponde a un agente activo.")
+                    st.session_state["motivo_bloqueo"] = "limite"
+                    st.session_state["limite_espera"] = espera
+
+                elif motivo_previo:
+                    st.session_state["cuil_valido"] = False
+                    st.session_state["validado"] = True
+                    st.session_state["motivo_bloqueo"] = motivo_previo
+
                 else:
-                    id_actividad = st.session_state.get("id_actividad", "")
-                    ya_aprobo = verificar_formulario_historial(supabase, cuil_input, id_actividad)
+                    elegibilidad = verificar_elegibilidad(
+                        cuil_input,
+                        st.session_state.get("comision_id", ""),  # UUID de la comisión
+                        st.session_state.get("id_actividad", ""),
+                    )
 
-                    if ya_aprobo:
+                    if elegibilidad is None:
                         st.session_state["cuil_valido"] = False
-                        st.session_state["validado"] = True
-                        st.session_state["motivo_bloqueo"] = "ya_aprobo"
-                        st.warning("⚠️ Ya realizaste esta actividad y fue APROBADA.")
+                        st.session_state["validado"] = False
                     else:
-                        #comision_id = st.session_state.get("comision_nombre", "")
-                        comision_id = st.session_state.get("comision_id", "")  # ✅ Esto es el UUID correcto
-                        ya_inscripto = verificar_formulario_comision(supabase, cuil_input, comision_id)
-
-                        if ya_inscripto:
-                            st.session_state["cuil_valido"] = False
-                            st.session_state["validado"] = True
-                            st.session_state["motivo_bloqueo"] = "ya_inscripto"
-                            st.warning("⚠️ Ya estás inscripto en esta comisión.")
-                        else:
+                        motivo = elegibilidad.get("motivo_bloqueo") or ""
+                        limites.guardar_negativo(cuil_input, motivo)
+                        st.session_state["validado"] = True
+                        st.session_state["motivo_bloqueo"] = motivo
+                        st.session_state["cuil_valido"] = not motivo
+                        if not motivo:
                             st.session_state["cuil"] = cuil_input
-                            st.session_state["cuil_valido"] = True
-                            st.session_state["validado"] = True
-                            st.session_state["motivo_bloqueo"] = ""
-
-                            st.success("✅ CUIL/CUIT válido. Podés continuar con la preinscripción.")
-
-                            datos = obtener_datos_para_formulario(supabase, cuil_input)
-                            st.session_state["datos_agenteform"] = datos
-
-                            if datos:
-                                st.markdown("---")
-                                st.markdown("### 🧾 Datos obtenidos del agente")
-                                for campo, valor in datos.items():
-                                    st.markdown(f"**{campo.replace('_', ' ').capitalize()}:** {valor if valor else '-'}")
-                                st.markdown("---")
+                            st.session_state["datos_agenteform"] = elegibilidad.get("datos") or {}
+
+                # El formulario del paso 4 aparece o desaparece
+                if st.session_state.get("cuil_valido", False) != habilitado_antes:
+                    avisar_cambio()
+
+            # Resultado de la última validación: se arma desde session_state para
+            # que siga visible aunque el paso se vuelva a ejecutar
+            if st.session_state.get("validado", False):
+                motivo = st.session_state.get("motivo_bloqueo", "")
+                if motivo == "limite":
+                    espera = int(st.session_state.get("limite_espera", 0)) + 1
+                    st.warning(f"⏳ Demasiados intentos de validación. Esperá {espera} segundos y volvé a intentar.")
+                elif motivo == "cuil_invalido":
+                    st.error("CUIL/CUIT inválido. Verificá que tenga 11 dígitos y sea correcto.")
+                elif motivo == "no_encontrado":
+                    st.error("⚠️ El CUIL/CUIT no corresponde a un agente activo.")
+                elif motivo == "ya_aprobo":
+                    st.warning("⚠️ Ya realizaste esta actividad y fue APROBADA.")
+                elif motivo == "ya_inscripto":
+                    st.warning("⚠️ Ya estás inscripto en esta comisión.")
+                elif st.session_state.get("cuil_valido", False):
+                    st.success("✅ CUIL/CUIT válido. Podés continuar con la preinscripción.")
+
+                    datos = st.session_state.get("datos_agenteform", {})
+                    if datos:
+                        st.markdown("---")
+                        st.markdown("### 🧾 Datos obtenidos del agente")
+                        for campo, valor in datos.items():
+                            st.markdown(f"**{campo.replace('_', ' ').capitalize()}:** {valor if valor else '-'}")
+                        st.markdown("---")
 
 # ========== PASO 4: Formulario de inscripción ==========
-with st.container():
-    st.markdown('<div class="paso-container">', unsafe_allow_html=True)
-
-    if (
-        st.session_state.get("validado", False)
-        and st.session_state.get("cuil_valido", False)
-        and not st.session_state.get("inscripcion_exitosa", False)
-    ):
-        datos_agente = st.session_state.get("datos_agenteform", {})
-        nombre_agente = f"{datos_agente.get('nombre', '')} {datos_agente.get('apellido', '')}".strip()
-
-        st.markdown(f"### 👤 {nombre_agente}")
-        st.markdown("Completá los siguientes campos para finalizar tu preinscripción:")
-
-        # --- CAMPOS: Nivel educativo + Título
-        col1, col2 = st.columns(2)
-        niveles_educativos = [
-            "-Seleccioná último nivel completo-", "PRIMARIO", "SECUNDARIO",
-            "TERCIARIO", "UNIVERSITARIO", "POSGRADO"
-        ]
-        valor_nivel = datos_agente.get("nivel_educativo", "")
-        indice_nivel = niveles_educativos.index(valor_nivel) if valor_nivel in niveles_educativos else 0
-
-        with col1:
-            nivel_educativo = st.selectbox("Nivel educativo", niveles_educativos, index=indice_nivel, key="nivel_educativo")
-
-        with col2:
-            titulo_valor = datos_agente.get("titulo", "").upper() if datos_agente.get("titulo") else ""
-            titulo = st.text_input("Título", value=titulo_valor, key="titulo").upper()
-
-        # --- TAREAS DESARROLLADAS
-        tareas = st.text_area("Tareas desarrolladas", height=100, key="tareas_desarrolladas").lower()
+@st.fragment
+@medida("paso_formulario")
+def paso_formulario():
+    # Tras enviar, enviar_inscripcion() ya limpió los pasos 2 y 3: se muestra la confirmación
+    if "confirmacion_inscripcion" in st.session_state:
+        avisar_cambio()
+
+    with st.container():
+        st.markdown('<div class="paso-container">', unsafe_allow_html=True)
+
+        if (
+            st.session_state.get("validado", False)
+            and st.session_state.get("cuil_valido", False)
+        ):
+            datos_agente = st.session_state.get("datos_agenteform", {})
+            nombre_agente = f"{datos_agente.get('nombre', '')} {datos_agente.get('apellido', '')}".strip()
+
+            st.markdown(f"### 👤 {nombre_agente}")
+            st.markdown("Completá los siguientes campos para finalizar tu preinscripción:")
+
+            # --- CAMPOS: Nivel educativo + Título
+            col1, col2 = st.columns(2)
+            niveles_educativos = [
+                "-Seleccioná último nivel completo-", "PRIMARIO", "SECUNDARIO",
+                "TERCIARIO", "UNIVERSITARIO", "POSGRADO"
+            ]
+            valor_nivel = datos_agente.get("nivel_educativo", "")
+            indice_nivel = niveles_educativos.index(valor_nivel) if valor_nivel in niveles_educativos else 0
+
+            with col1:
+                st.selectbox("Nivel educativo", niveles_educativos, index=indice_nivel, key="nivel_educativo")
+
+            with col2:
+                titulo_valor = datos_agente.get("titulo", "").upper() if datos_agente.get("titulo") else ""
+                st.text_input("Título", value=titulo_valor, key="titulo")
+
+            # --- TAREAS DESARROLLADAS
+            st.text_area("Tareas desarrolladas", height=100, key="tareas_desarrolladas")
+
+            # --- MAIL ALTERNATIVO
+            correo_oficial = datos_agente.get("email", "")
+            st.markdown(f"📧 Te vamos a contactar al correo registrado: **{correo_oficial}**")
+            email_alternativo = st.text_input("Correo alternativo (opcional)", key="email_alternativo")
+            if email_alternativo and "@" not in email_alternativo:
+                st.warning("📧 El correo alternativo no tiene un formato válido.")
 
-        # --- MAIL ALTERNATIVO
-        correo_oficial = datos_agente.get("email", "")
-        st.markdown(f"📧 Te vamos a contactar al correo registrado: **{correo_oficial}**")
-        email_alternativo = st.text_input("Correo alternativo (opcional)", key="email_alternativo")
-        if email_alternativo and "@" not in email_alternativo:
-            st.warning("📧 El correo alternativo no tiene un formato válido.")
+            # --- BOTÓN FINAL DE ENVÍO (ver enviar_inscripcion)
+            st.button("ENVIAR INSCRIPCIÓN", key="enviar_inscripcion", on_click=enviar_inscripcion)
 
-        # --- BOTÓN FINAL DE ENVÍO
-        if st.button("ENVIAR INSCRIPCIÓN", key="enviar_inscripcion"):
+        # Fuera del if: un clic tardío puede llegar con el formulario ya oculto
+        error_envio = st.session_state.pop("error_envio", None)
+        if error_envio:
+            st.error(error_envio)
 
-            if email_alternativo and "@" not in email_alternativo:
-                st.error("⚠️ El correo alternativo no es válido.")
-            else:
-                # Cálculo de edad
-                fecha_nacimiento = datos_agente.get("fecha_nacimiento")
-                edad = None
-                if fecha_nacimiento:
-                    try:
-                        fecha_nac = pd.to_datetime(fecha_nacimiento)
-                        hoy = pd.Timestamp.today()
-                        edad = hoy.year - fecha_nac.year - ((hoy.month, hoy.day) < (fecha_nac.month, fecha_nac.day))
-                    except:
-                        edad = None
-
-                datos_inscripcion = {
-                    "comision_id": st.session_state.get("comision_id"),
-                    "cuil": st.session_state.get("cuil", ""),
-                    "fecha_inscripcion": date.today().isoformat(),
-                    "estado_inscripcion": "Nueva",
-                    "vacante": False,
-                    "nivel_educativo": nivel_educativo if nivel_educativo != "-Seleccioná último nivel completo-" else None,
-                    "titulo": titulo,
-                    "tareas_desarrolladas": tareas,
-                    "email": correo_oficial,
-                    "email_alternativo": email_alternativo,
-                    "fecha_nacimiento": fecha_nacimiento,
-                    "edad_inscripcion": edad,
-                    "sexo": datos_agente.get("sexo"),
-                    "situacion_revista": datos_agente.get("situacion_revista"),
-                    "nivel": datos_agente.get("nivel"),
-                    "grado": datos_agente.get("grado"),
-                    "agrupamiento": datos_agente.get("agrupamiento"),
-                    "tramo": datos_agente.get("tramo"),
-                    "id_dependencia_simple": datos_agente.get("id_dependencia_simple"),
-                    "id_dependencia_general": datos_agente.get("id_dependencia_general")
-                }
-
-                result = supabase.table("cursos_inscripciones").insert(datos_inscripcion).execute()
-
-                if result.data:
-                    st.session_state["nombre_actividad_exito"] = st.session_state.get("actividad_nombre")
-                    st.session_state["inscripcion_exitosa"] = True
-
-                    st.balloons()
-                    st.success("✅ ¡Preinscripción exitosa!")
-
-                    # 🔁 Forzar limpieza total en próximo run
-                    st.session_state["resetear_todo"] = True
-                    st.rerun()
-                else:
-                    st.error("❌ Ocurrió un error al guardar la inscripción.")
+        st.markdown('</div>', unsafe_allow_html=True)
 
-    st.markdown('</div>', unsafe_allow_html=True)
 
+# ========== EJECUCIÓN DE LOS PASOS ==========
+paso_filtros_tabla(catalogo_actual)
+paso_tarjetas(catalogo_actual)
+paso_actividad(catalogo_actual)
+paso_cuil()
+paso_formulario()
 
+corrida_completa = False
+metricas.observar("rerun", time.perf_counter() - inicio_rerun)
 
+if perfil is not None:
+    perfilado.mostrar(perfil.terminar())
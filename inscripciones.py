@@ -0,0 +1,53 @@
+# ================== INSCRIPCIONES (cursos_inscripciones) ==================
+# Armado de la fila a insertar, compartido por el formulario individual y la
+# carga masiva.
+from datetime import date
+
+import pandas as pd
+
+TABLA_INSCRIPCIONES = "cursos_inscripciones"
+
+
+def calcular_edad(fecha_nacimiento):
+    if not fecha_nacimiento:
+        return None
+    try:
+        fecha_nac = pd.to_datetime(fecha_nacimiento)
+        hoy = pd.Timestamp.today()
+        return hoy.year - fecha_nac.year - ((hoy.month, hoy.day) < (fecha_nac.month, fecha_nac.day))
+    except Exception:
+        return None
+
+
+def armar_inscripcion(
+    datos_agente: dict,
+    comision_id: str,
+    cuil: str,
+    nivel_educativo: str = None,
+    titulo: str = "",
+    tareas: str = "",
+    email_alternativo: str = "",
+) -> dict:
+    fecha_nacimiento = datos_agente.get("fecha_nacimiento")
+    return {
+        "comision_id": comision_id,
+        "cuil": cuil,
+        "fecha_inscripcion": date.today().isoformat(),
+        "estado_inscripcion": "Nueva",
+        "vacante": False,
+        "nivel_educativo": nivel_educativo,
+        "titulo": titulo,
+        "tareas_desarrolladas": tareas,
+        "email": datos_agente.get("email", ""),
+        "email_alternativo": email_alternativo,
+        "fecha_nacimiento": fecha_nacimiento,
+        "edad_inscripcion": calcular_edad(fecha_nacimiento),
+        "sexo": datos_agente.get("sexo"),
+        "situacion_revista": datos_agente.get("situacion_revista"),
+        "nivel": datos_agente.get("nivel"),
+        "grado": datos_agente.get("grado"),
+        "agrupamiento": datos_agente.get("agrupamiento"),
+        "tramo": datos_agente.get("tramo"),
+        "id_dependencia_simple": datos_agente.get("id_dependencia_simple"),
+        "id_dependencia_general": datos_agente.get("id_dependencia_general")
+    }
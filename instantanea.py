@@ -0,0 +1,160 @@
+# ================== INSTANTÁNEA DEL CATÁLOGO EN DISCO (ARROW IPC) ==================
+# Los procesos de Streamlit del mismo host dejan acá la última versión del
+# catálogo: los registros de la vista (para seguir con refrescos incrementales
+# después de un reinicio) y el frame derivado. Formato Arrow IPC sin
+# compresión, leído con memory map: las columnas de texto del frame apuntan
+# directo a las páginas del archivo, que el sistema comparte entre procesos,
+# en lugar de que cada proceso arme su propia copia.
+#   - los archivos de datos llevan la firma (hash de los registros) en el
+#     nombre y no se reescriben nunca: un proceso puede seguir leyendo una
+#     versión mientras otro publica la siguiente
+#   - escritura atómica: archivo temporal + fsync + os.replace
+#   - sello: JSON chico con firma, marca de agua, hora de escritura y nombres
+#     de archivo; se publica último. Ver si hay una versión nueva cuesta un
+#     os.stat (el JSON se relee solo si cambió el archivo)
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+DIRECTORIO = os.environ.get("CATALOGO_INSTANTANEA", ".catalogo")  # vacío: sin instantánea
+# Versiones anteriores que quedan en disco (otros procesos pueden tenerlas mapeadas)
+CONSERVAR = int(os.environ.get("CATALOGO_INSTANTANEA_CONSERVAR", "3"))
+# Cambia cuando cambian las columnas del frame derivado: un sello de otro formato se ignora
+FORMATO = 1
+ARCHIVO_SELLO = "sello.json"
+
+
+def _escribir_atomico(ruta: str, datos: bytes):
+    temporal = f"{ruta}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(datos)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+def _serializar(tabla: pa.Table) -> bytes:
+    salida = pa.BufferOutputStream()
+    with ipc.new_file(salida, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    return salida.getvalue().to_pybytes()
+
+
+class Instantanea:
+    def __init__(self, directorio: str = DIRECTORIO, conservar: int = CONSERVAR):
+        self.directorio = directorio
+        self.conservar = max(1, conservar)
+        self.ruta_sello = os.path.join(directorio, ARCHIVO_SELLO)
+        self._lock = threading.Lock()
+        self._sello = None
+        self._clave_sello = None   # (mtime_ns, tamaño, inode) del sello leído
+
+        # Contadores
+        self.escrituras = 0
+        self.renovaciones = 0
+        self.lecturas = 0
+        self.errores = 0
+
+    # ---------- Sello ----------
+    def sello(self):
+        # Último sello publicado, o None si no hay (o es de otro formato)
+        try:
+            info = os.stat(self.ruta_sello)
+        except FileNotFoundError:
+            return None
+        clave = (info.st_mtime_ns, info.st_size, info.st_ino)
+        if clave != self._clave_sello:
+            try:
+                with open(self.ruta_sello, encoding="utf-8") as f:
+                    sello = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._sello = sello if sello.get("formato") == FORMATO else None
+            self._clave_sello = clave
+        return self._sello
+
+    def _publicar(self, sello: dict):
+        _escribir_atomico(self.ruta_sello, json.dumps(sello, default=str).encode("utf-8"))
+
+    # ---------- Escritura ----------
+    def guardar(self, tablas: dict, marca=None) -> dict:
+        # tablas: nombre -> pa.Table; la primera define la firma de la versión
+        with self._lock:
+            os.makedirs(self.directorio, exist_ok=True)
+            datos = {nombre: _serializar(tabla) for nombre, tabla in tablas.items()}
+            firma = hashlib.blake2b(next(iter(datos.values())), digest_size=12).hexdigest()
+            archivos = {}
+            for nombre, contenido in datos.items():
+                archivos[nombre] = f"{nombre}-{firma}.arrow"
+                ruta = os.path.join(self.directorio, archivos[nombre])
+                if not os.path.exists(ruta):
+                    _escribir_atomico(ruta, contenido)
+            sello = {
+                "formato": FORMATO,
+                "firma": firma,
+                "marca": marca,
+                "escrito": time.time(),
+                "filas": next(iter(tablas.values())).num_rows,
+                "archivos": archivos,
+                "pid": os.getpid(),
+            }
+            self._publicar(sello)
+            self.escrituras += 1
+            self._limpiar(sello)
+            return sello
+
+    def renovar(self, firma: str):
+        # Sin cambios en la base: se actualiza la hora del sello para que los
+        # demás procesos no vuelvan a consultar antes del próximo TTL
+        with self._lock:
+            sello = self.sello()
+            if sello is None or sello["firma"] != firma:
+                return None
+            sello = dict(sello, escrito=time.time(), pid=os.getpid())
+            self._publicar(sello)
+            self.renovaciones += 1
+            return sello
+
+    def _limpiar(self, actual: dict):
+        firmas = {}
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(".arrow") and "-" in nombre:
+                ruta = os.path.join(self.directorio, nombre)
+                firma = nombre.rsplit("-", 1)[1][:-len(".arrow")]
+                firmas[firma] = max(firmas.get(firma, 0), os.path.getmtime(ruta))
+        viejas = sorted((f for f in firmas if f != actual["firma"]), key=firmas.get, reverse=True)
+        for firma in viejas[self.conservar - 1:]:
+            for nombre in os.listdir(self.directorio):
+                if nombre.endswith(f"-{firma}.arrow"):
+                    try:
+                        os.remove(os.path.join(self.directorio, nombre))
+                    except FileNotFoundError:
+                        pass
+
+    # ---------- Lectura ----------
+    def leer(self, sello: dict, nombre: str) -> pa.Table:
+        # Sin copia: los buffers de la tabla son páginas del archivo mapeado
+        self.lecturas += 1
+        fuente = pa.memory_map(os.path.join(self.directorio, sello["archivos"][nombre]), "r")
+        return ipc.open_file(fuente).read_all()
+
+    def estadisticas(self) -> dict:
+        sello = self.sello()
+        return {
+            "firma": sello["firma"] if sello else None,
+            "edad": time.time() - sello["escrito"] if sello else None,
+            "escrituras": self.escrituras,
+            "renovaciones": self.renovaciones,
+            "lecturas": self.lecturas,
+            "errores": self.errores,
+        }
+
+
+def crear_instantanea(directorio: str = DIRECTORIO):
+    return Instantanea(directorio) if directorio else None
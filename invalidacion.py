@@ -0,0 +1,178 @@
+# ================== INVALIDACIÓN DEL CATÁLOGO POR NOTIFICACIONES ==================
+# En lugar de depender solo del TTL, cada proceso escucha el canal de Postgres
+# que alimentan los triggers de sql/catalogo_notificaciones.sql. Un aviso trae
+# la tabla y las claves tocadas; el hilo de escucha junta los avisos que
+# llegan casi juntos, pide a CacheCatalogo un refresco de solo esas filas
+# (nueva versión) y arma el frame derivado antes de que lo pida una sesión.
+# Con la escucha conectada el TTL del catálogo sube a CATALOGO_TTL_CON_ESCUCHA:
+# queda como respaldo para lo que no genera avisos (comisiones que cierran por
+# fecha). Si la conexión se corta se vuelve al TTL corto y, al reconectar, se
+# hace un refresco incremental por los avisos perdidos.
+# Requiere una conexión directa a Postgres (CATALOGO_ESCUCHA_DSN o
+# SUPABASE_DB_URL): el pooler de Supabase en modo transacción no admite LISTEN.
+import json
+import logging
+import os
+import select
+import threading
+import time
+
+CANAL = "catalogo_comisiones"
+DSN = os.environ.get("CATALOGO_ESCUCHA_DSN") or os.environ.get("SUPABASE_DB_URL")
+TTL_CON_ESCUCHA = float(os.environ.get("CATALOGO_TTL_CON_ESCUCHA", "900"))
+# Ventana para juntar los avisos de una ráfaga (ej. una carga de varias comisiones)
+AGRUPAR_SEGUNDOS = float(os.environ.get("CATALOGO_ESCUCHA_AGRUPAR_MS", "50")) / 1000
+REINTENTO_MAXIMO = float(os.environ.get("CATALOGO_ESCUCHA_REINTENTO_MAX", "30"))
+
+logger = logging.getLogger("invalidacion")
+
+
+class EscuchaCatalogo:
+    def __init__(self, dsn: str, cache, canal: str = CANAL, ttl_con_escucha: float = TTL_CON_ESCUCHA,
+                 agrupar: float = AGRUPAR_SEGUNDOS):
+        self.dsn = dsn
+        self.cache = cache
+        self.canal = canal
+        self.ttl_con_escucha = ttl_con_escucha
+        self.agrupar = agrupar
+        self.ttl_sin_escucha = cache.ttl
+        self._detener = threading.Event()
+        self._hilo = None
+
+        # Contadores
+        self.conectado = False
+        self.conexiones = 0
+        self.avisos = 0
+        self.refrescos = 0
+        self.errores = 0
+        self.ultima_demora = 0.0   # segundos entre el aviso en la base y la versión nueva
+        self.demora_maxima = 0.0
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._bucle, name="catalogo-escucha", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    # ---------- Conexión ----------
+    def _conectar(self):
+        import psycopg2
+
+        # keepalives: una conexión muerta se detecta aunque no lleguen avisos
+        conexion = psycopg2.connect(self.dsn, keepalives=1, keepalives_idle=30, keepalives_interval=10,
+                                    keepalives_count=3)
+        conexion.autocommit = True
+        with conexion.cursor() as cursor:
+            cursor.execute(f'listen "{self.canal}"')
+        return conexion
+
+    def _bucle(self):
+        espera = 1.0
+        while not self._detener.is_set():
+            conexion = None
+            try:
+                conexion = self._conectar()
+                self.conectado = True
+                self.conexiones += 1
+                self.cache.ttl = max(self.ttl_sin_escucha, self.ttl_con_escucha)
+                espera = 1.0
+                if self.conexiones > 1:
+                    # Lo que cambió mientras no había conexión no llegó como aviso
+                    self._refrescar([{"claves": None}])
+                self._escuchar(conexion)
+            except Exception as e:
+                self.errores += 1
+                logger.warning("Escucha del catálogo desconectada: %s", e)
+            finally:
+                self.conectado = False
+                self.cache.ttl = self.ttl_sin_escucha
+                if conexion is not None:
+                    conexion.close()
+            self._detener.wait(espera)
+            espera = min(espera * 2, REINTENTO_MAXIMO)
+
+    def _escuchar(self, conexion):
+        while not self._detener.is_set():
+            if not select.select([conexion], [], [], 1.0)[0]:
+                continue
+            conexion.poll()
+            if not conexion.notifies:
+                continue
+            if self.agrupar:
+                time.sleep(self.agrupar)
+                conexion.poll()
+            avisos = []
+            for notificacion in conexion.notifies:
+                try:
+                    avisos.append(json.loads(notificacion.payload))
+                except ValueError:
+                    avisos.append({"claves": None})
+            conexion.notifies.clear()
+            self.avisos += len(avisos)
+            try:
+                self._refrescar(avisos)
+            except Exception as e:
+                # La escucha sigue; la próxima sesión refresca por su cuenta
+                self.errores += 1
+                logger.warning("Refresco por aviso falló: %s", e)
+                self.cache.invalidar()
+
+    # ---------- Refresco ----------
+    def _refrescar(self, avisos: list):
+        from conexion import obtener_pool
+
+        # columna -> claves; con un aviso sin claves alcanza un refresco incremental
+        por_columna = {}
+        for aviso in avisos:
+            if aviso.get("claves") is None or aviso.get("columna") not in ("id", "id_actividad"):
+                por_columna = None
+                break
+            por_columna.setdefault(aviso["columna"], set()).update(aviso["claves"])
+
+        with obtener_pool().cliente() as supabase:
+            if por_columna is None:
+                self.cache.refrescar_dirigido(supabase)
+            else:
+                for columna, claves in por_columna.items():
+                    self.cache.refrescar_dirigido(supabase, columna, sorted(claves))
+            # El frame de la versión nueva se arma acá y no en la próxima sesión
+            if self.cache.version:
+                self.cache.obtener_derivado(supabase)
+        self.refrescos += 1
+
+        enviados = [a["enviado"] for a in avisos if a.get("enviado")]
+        if enviados:
+            self.ultima_demora = max(0.0, time.time() - min(enviados))
+            self.demora_maxima = max(self.demora_maxima, self.ultima_demora)
+
+    def estadisticas(self) -> dict:
+        return {
+            "conectado": self.conectado,
+            "conexiones": self.conexiones,
+            "avisos": self.avisos,
+            "refrescos": self.refrescos,
+            "errores": self.errores,
+            "ultima_demora": self.ultima_demora,
+            "demora_maxima": self.demora_maxima,
+            "ttl": self.cache.ttl,
+        }
+
+
+_escucha = None
+_escucha_lock = threading.Lock()
+
+
+def iniciar_escucha(cache=None, dsn: str = DSN):
+    # Una escucha por proceso; sin DSN el catálogo sigue solo con TTL
+    global _escucha
+    if _escucha is None and dsn:
+        with _escucha_lock:
+            if _escucha is None:
+                if cache is None:
+                    from catalogo import cache_catalogo as cache
+                _escucha = EscuchaCatalogo(dsn, cache)
+                _escucha.iniciar()
+    return _escucha
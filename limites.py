@@ -0,0 +1,106 @@
+# ================== LÍMITES DE INTENTOS DE "VALIDAR CUIL" ==================
+# Cada clic en "Validar CUIL" cuesta una RPC. Para que los reintentos
+# impacientes o un script que recorre CUILs no se coman la capacidad de la
+# base en el pico de inscripciones:
+#   - cubo de tokens por sesión (todos los clics) y por CUIL (solo los que
+#     llegarían a la base); pasado el límite se rechaza en el proceso, sin RPC
+#   - caché negativa: CUIL con dígito verificador inválido o que no
+#     corresponde a un agente activo ("no_encontrado") se responde desde
+#     memoria durante NEGATIVOS_TTL_SEGUNDOS
+# El mismo cubo limita los intentos de clave de la carga masiva por sesión.
+# Por proceso, como las demás cachés: con varias réplicas el límite efectivo
+# es el configurado por réplica.
+import os
+import threading
+import time
+
+from cache_lru import CacheLRU
+
+SESION_CAPACIDAD = float(os.environ.get("LIMITE_SESION_CAPACIDAD", "5"))
+SESION_POR_MINUTO = float(os.environ.get("LIMITE_SESION_POR_MINUTO", "10"))
+CUIL_CAPACIDAD = float(os.environ.get("LIMITE_CUIL_CAPACIDAD", "3"))
+CUIL_POR_MINUTO = float(os.environ.get("LIMITE_CUIL_POR_MINUTO", "6"))
+ACCESO_CAPACIDAD = float(os.environ.get("LIMITE_ACCESO_CAPACIDAD", "5"))
+ACCESO_POR_MINUTO = float(os.environ.get("LIMITE_ACCESO_POR_MINUTO", "2"))
+MAX_CLAVES = int(os.environ.get("LIMITES_MAX_CLAVES", "50000"))
+NEGATIVOS_TTL_SEGUNDOS = float(os.environ.get("NEGATIVOS_TTL_SEGUNDOS", "60"))
+NEGATIVOS_MAX = int(os.environ.get("NEGATIVOS_MAX", "20000"))
+
+# Motivos que se guardan en la caché negativa (no dependen de la comisión)
+MOTIVOS_NEGATIVOS = ("cuil_invalido", "no_encontrado")
+
+
+class LimitadorTokens:
+    # Un cubo por clave: hasta `capacidad` intentos seguidos y después `por_minuto`.
+    # Un cubo sin uso durante el tiempo de llenado está lleno otra vez: se
+    # guarda en una CacheLRU con ese TTL y olvidarlo no cambia nada.
+    def __init__(self, capacidad: float, por_minuto: float, max_claves: int = MAX_CLAVES):
+        self.capacidad = max(1.0, capacidad)
+        self.recarga = max(por_minuto, 1e-6) / 60.0   # tokens por segundo
+        self._cubos = CacheLRU(max_claves, ttl=self.capacidad / self.recarga)
+        self._lock = threading.Lock()
+
+        # Contadores
+        self.permitidos = 0
+        self.rechazados = 0
+
+    def consumir(self, clave) -> float:
+        # 0.0 si el intento entra; si no, segundos hasta el próximo token
+        ahora = time.monotonic()
+        with self._lock:
+            tokens, ultimo = self._cubos.obtener(clave) or (self.capacidad, ahora)
+            tokens = min(self.capacidad, tokens + (ahora - ultimo) * self.recarga)
+            if tokens >= 1.0:
+                self._cubos.guardar(clave, (tokens - 1.0, ahora))
+                self.permitidos += 1
+                return 0.0
+            self._cubos.guardar(clave, (tokens, ahora))
+            self.rechazados += 1
+            return (1.0 - tokens) / self.recarga
+
+    def estadisticas(self) -> dict:
+        return {
+            "claves": len(self._cubos),
+            "permitidos": self.permitidos,
+            "rechazados": self.rechazados,
+        }
+
+
+limite_sesion = LimitadorTokens(SESION_CAPACIDAD, SESION_POR_MINUTO)
+limite_cuil = LimitadorTokens(CUIL_CAPACIDAD, CUIL_POR_MINUTO)
+limite_acceso = LimitadorTokens(ACCESO_CAPACIDAD, ACCESO_POR_MINUTO)
+cache_negativos = CacheLRU(NEGATIVOS_MAX, ttl=NEGATIVOS_TTL_SEGUNDOS)
+
+
+def permitir_sesion(sesion: str) -> float:
+    return limite_sesion.consumir(sesion)
+
+
+def permitir_cuil(cuil: str) -> float:
+    return limite_cuil.consumir(cuil)
+
+
+def permitir_acceso(sesion: str) -> float:
+    # Intentos de clave de pages/carga_masiva.py
+    return limite_acceso.consumir(sesion)
+
+
+def resultado_negativo(cuil: str):
+    # Motivo guardado para este CUIL ("cuil_invalido", "no_encontrado") o None
+    return cache_negativos.obtener(cuil)
+
+
+def guardar_negativo(cuil: str, motivo: str):
+    if motivo in MOTIVOS_NEGATIVOS:
+        cache_negativos.guardar(cuil, motivo)
+
+
+def estadisticas() -> dict:
+    negativos = cache_negativos.estadisticas()
+    return {
+        **{f"sesion_{k}": v for k, v in limite_sesion.estadisticas().items()},
+        **{f"cuil_{k}": v for k, v in limite_cuil.estadisticas().items()},
+        **{f"acceso_{k}": v for k, v in limite_acceso.estadisticas().items()},
+        "negativos_entradas": negativos["entradas"],
+        "negativos_aciertos": negativos["aciertos"],
+    }
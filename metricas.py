@@ -0,0 +1,236 @@
+# ================== MÉTRICAS POR FASE (HISTOGRAMAS + ENDPOINT PROMETHEUS) ==================
+# Cada fase de una re-ejecución (catálogo, frame derivado, filtros, tabla HTML,
+# tarjetas, RPC, inserción) se mide con medir("fase") o @medida("fase"): un
+# histograma de duraciones y un contador de errores por fase, compartidos por
+# todas las sesiones del proceso. Con METRICAS_PUERTO se exponen en
+# http://host:puerto/metrics en formato de texto de Prometheus, junto con las
+# estadísticas de pool, cola y cachés (registrar_colector). Con
+# METRICAS_LOG_JSON=1 cada medición se emite además como una línea JSON con el
+# id de la sesión de Streamlit para correlacionar las fases de una persona.
+# Costo por medición: dos perf_counter, un bisect y un lock (pocos µs; ver
+# bench/bench_metricas.py).
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    get_script_run_ctx = None
+
+HABILITADAS = os.environ.get("METRICAS_HABILITADAS", "1") != "0"
+PUERTO = int(os.environ.get("METRICAS_PUERTO", "0"))  # 0: sin endpoint
+HOST = os.environ.get("METRICAS_HOST", "127.0.0.1")
+LOG_JSON = os.environ.get("METRICAS_LOG_JSON", "0") == "1"
+
+PREFIJO = "preinscripcion"
+# Límites superiores de los buckets, en segundos
+LIMITES = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger("metricas")
+if LOG_JSON:
+    _manejador = logging.StreamHandler()
+    _manejador.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_manejador)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class Histograma:
+    __slots__ = ("cuentas", "suma", "total", "errores")
+
+    def __init__(self, buckets: int):
+        self.cuentas = [0] * buckets  # no acumuladas; el último es +Inf
+        self.suma = 0.0
+        self.total = 0
+        self.errores = 0
+
+
+def _etiqueta(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RegistroMetricas:
+    def __init__(self, limites: tuple = LIMITES):
+        self.limites = limites
+        self._lock = threading.Lock()
+        self._fases = {}       # fase -> Histograma
+        self._colectores = {}  # nombre -> función que devuelve un dict de estadísticas
+
+    def observar(self, fase: str, duracion: float, error: bool = False):
+        i = bisect_left(self.limites, duracion)
+        with self._lock:
+            h = self._fases.get(fase)
+            if h is None:
+                h = self._fases[fase] = Histograma(len(self.limites) + 1)
+            h.cuentas[i] += 1
+            h.suma += duracion
+            h.total += 1
+            if error:
+                h.errores += 1
+
+    def registrar_colector(self, nombre: str, funcion):
+        # Se consulta recién al exportar; registrar el mismo nombre otra vez lo reemplaza
+        self._colectores[nombre] = funcion
+
+    def limpiar(self):
+        with self._lock:
+            self._fases.clear()
+
+    def _copia(self) -> dict:
+        with self._lock:
+            return {
+                fase: (list(h.cuentas), h.suma, h.total, h.errores)
+                for fase, h in self._fases.items()
+            }
+
+    def exportar(self) -> str:
+        # Formato de texto de Prometheus (version=0.0.4)
+        nombre = f"{PREFIJO}_fase_segundos"
+        lineas = [
+            f"# HELP {nombre} Duración de cada fase de la re-ejecución.",
+            f"# TYPE {nombre} histogram",
+        ]
+        errores = []
+        for fase, (cuentas, suma, total, error) in sorted(self._copia().items()):
+            f = _etiqueta(fase)
+            acumulado = 0
+            for limite, cuenta in zip(self.limites, cuentas):
+                acumulado += cuenta
+                lineas.append(f'{nombre}_bucket{{fase="{f}",le="{limite}"}} {acumulado}')
+            lineas.append(f'{nombre}_bucket{{fase="{f}",le="+Inf"}} {total}')
+            lineas.append(f'{nombre}_sum{{fase="{f}"}} {suma}')
+            lineas.append(f'{nombre}_count{{fase="{f}"}} {total}')
+            errores.append(f'{PREFIJO}_fase_errores_total{{fase="{f}"}} {error}')
+        lineas.append(f"# HELP {PREFIJO}_fase_errores_total Fases que terminaron con una excepción.")
+        lineas.append(f"# TYPE {PREFIJO}_fase_errores_total counter")
+        lineas.extend(errores)
+
+        for colector, funcion in sorted(self._colectores.items()):
+            try:
+                valores = funcion()
+            except Exception as e:
+                logger.warning("Colector de métricas %s falló: %s", colector, e)
+                continue
+            for clave, valor in valores.items():
+                if isinstance(valor, bool):
+                    valor = int(valor)
+                if isinstance(valor, (int, float)):
+                    lineas.append(f"# TYPE {PREFIJO}_{colector}_{clave} gauge")
+                    lineas.append(f"{PREFIJO}_{colector}_{clave} {valor}")
+        return "\n".join(lineas) + "\n"
+
+    def estadisticas(self) -> dict:
+        return {
+            fase: {
+                "total": total,
+                "errores": error,
+                "promedio": suma / total if total else 0.0,
+            }
+            for fase, (_, suma, total, error) in self._copia().items()
+        }
+
+
+registro = RegistroMetricas()
+
+
+# ========== MEDICIÓN ==========
+def _sesion():
+    # Id de la sesión de Streamlit (None fuera del hilo del script, ej. la cola)
+    if get_script_run_ctx is None:
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+def _log(fase: str, duracion: float, error: bool):
+    logger.info(json.dumps({
+        "ts": round(time.time(), 3),
+        "sesion": _sesion(),
+        "fase": fase,
+        "duracion_ms": round(duracion * 1000, 3),
+        "error": error,
+    }))
+
+
+def observar(fase: str, duracion: float, error: bool = False):
+    if not HABILITADAS:
+        return
+    registro.observar(fase, duracion, error)
+    if LOG_JSON:
+        _log(fase, duracion, error)
+
+
+@contextmanager
+def medir(fase: str):
+    if not HABILITADAS:
+        yield
+        return
+    error = False
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        # st.rerun()/st.stop() (BaseException) cortan la fase sin contarla como error
+        observar(fase, time.perf_counter() - inicio, error)
+
+
+def medida(fase: str):
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with medir(fase):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def registrar_colector(nombre: str, funcion):
+    registro.registrar_colector(nombre, funcion)
+
+
+# ========== ENDPOINT HTTP ==========
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        cuerpo = registro.exportar().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+_servidor = None
+_servidor_lock = threading.Lock()
+
+
+def iniciar_servidor(puerto: int = PUERTO, host: str = HOST):
+    # Un endpoint por proceso; si el puerto está ocupado se sigue sin endpoint
+    global _servidor
+    if _servidor is None and puerto:
+        with _servidor_lock:
+            if _servidor is None:
+                try:
+                    _servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+                except OSError as e:
+                    logger.warning("No se pudo abrir el endpoint de métricas en %s:%s: %s", host, puerto, e)
+                    _servidor = False
+                    return None
+                _servidor.daemon_threads = True
+                threading.Thread(target=_servidor.serve_forever, name="metricas-http", daemon=True).start()
+    return _servidor or None
@@ -0,0 +1,108 @@
+# ================== CARGA MASIVA (RRHH) ==================
+import hmac
+import os
+import uuid
+
+import streamlit as st
+
+import limites
+from carga_masiva import COLUMNAS_OPCIONALES, informe_xlsx, leer_archivo, procesar_carga
+from catalogo import obtener_catalogo
+from conexion import SUPABASE_URL, SUPABASE_ANON_KEY, SUPABASE_CLAVE_RRHH, PoolAgotado, obtener_pool, obtener_pool_rrhh
+
+st.set_page_config(layout="wide")
+
+st.markdown("""
+<h1 style="color: #136ac1; text-align: center; font-size: 28px; margin-bottom: 0px;">
+    CARGA MASIVA DE PREINSCRIPCIONES
+</h1>
+<h4 style="text-align: center; font-size: 16px; margin-top: 5px; margin-bottom: 40px;">
+    Para coordinadores de RRHH
+</h4>
+""", unsafe_allow_html=True)
+
+# ========== ACCESO ==========
+CLAVE_CARGA_MASIVA = os.environ.get("CARGA_MASIVA_CLAVE")
+# La elegibilidad en lote solo se ejecuta con la clave de RRHH (ver sql/verificar_elegibilidad_lote.sql)
+if not CLAVE_CARGA_MASIVA or not SUPABASE_CLAVE_RRHH:
+    st.info("La carga masiva no está habilitada en este servidor.")
+    st.stop()
+
+if not st.session_state.get("carga_masiva_habilitada"):
+    with st.form("carga_masiva_acceso"):
+        clave = st.text_input("Clave de acceso", type="password", key="carga_masiva_clave")
+        ingresar = st.form_submit_button("Ingresar")
+    if ingresar and clave:
+        # Cada envío es un intento; límite por sesión (ver limites.py)
+        espera = limites.permitir_acceso(st.session_state.setdefault("id_sesion", uuid.uuid4().hex))
+        if espera:
+            st.warning(f"⏳ Demasiados intentos. Esperá {int(espera) + 1} segundos y volvé a intentar.")
+        elif hmac.compare_digest(clave.encode(), CLAVE_CARGA_MASIVA.encode()):
+            st.session_state["carga_masiva_habilitada"] = True
+            st.rerun()
+        else:
+            st.error("⚠️ Clave incorrecta.")
+    st.stop()
+
+if not SUPABASE_URL or not SUPABASE_ANON_KEY:
+    st.error("❌ No se encontraron las credenciales de Supabase en las variables de entorno.")
+    st.stop()
+
+pool = obtener_pool()
+# Elegibilidad en lote e inserciones con la clave de RRHH
+pool_rrhh = obtener_pool_rrhh()
+try:
+    catalogo_actual = obtener_catalogo(pool)
+except PoolAgotado:
+    st.error("⏳ Hay mucha demanda en este momento. Volvé a intentar en unos segundos.")
+    st.button("Reintentar", key="carga_masiva_reintentar")
+    st.stop()
+
+# ========== 1) COMISIÓN ==========
+st.markdown("##### 1) Elegí la comisión.")
+etiquetas = catalogo_actual.etiquetas
+comision_id = st.selectbox(
+    "Comisión", [None] + catalogo_actual.ids, key="carga_masiva_comision",
+    format_func=lambda i: "-Seleccioná una comisión-" if i is None else etiquetas.get(i, i),
+)
+
+# ========== 2) ARCHIVO ==========
+st.markdown("##### 2) Subí el archivo con los CUIL.")
+st.caption(
+    "CSV o XLSX con una columna `cuil` (si no existe se usa la primera columna). "
+    f"Columnas opcionales: {', '.join(f'`{c}`' for c in COLUMNAS_OPCIONALES)}."
+)
+archivo = st.file_uploader("Archivo", type=["csv", "xlsx"], key="carga_masiva_archivo")
+
+if comision_id and archivo is not None:
+    df_archivo = leer_archivo(archivo.name, archivo.getvalue())
+    st.write(f"📄 {len(df_archivo)} filas leídas.")
+
+    if st.button("PROCESAR CARGA", key="carga_masiva_procesar"):
+        fila = catalogo_actual.fila(comision_id)
+        if fila is None:
+            # La comisión cerró o salió del catálogo entre que se eligió y se procesó
+            st.error("⚠️ La comisión elegida ya no está abierta. Elegí otra y volvé a procesar.")
+        else:
+            try:
+                with st.spinner("Validando e inscribiendo..."):
+                    informe = procesar_carga(pool_rrhh, df_archivo, comision_id, fila["id_actividad"])
+                st.session_state["carga_masiva_informe"] = informe
+            except PoolAgotado:
+                st.error("⏳ Hay mucha demanda en este momento. Volvé a intentar en unos segundos.")
+
+# ========== 3) RESULTADO ==========
+informe = st.session_state.get("carga_masiva_informe")
+if informe is not None:
+    st.markdown("##### 3) Resultado por fila.")
+    resumen = informe["estado"].value_counts()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Inscriptos", int(resumen.get("Inscripto", 0)))
+    col2.metric("Rechazados", int(resumen.get("Rechazado", 0)))
+    col3.metric("Errores", int(resumen.get("Error", 0)))
+    st.dataframe(informe, hide_index=True, width="stretch")
+    st.download_button(
+        "⬇️ Descargar informe (XLSX)", informe_xlsx(informe),
+        file_name="resultado_carga_masiva.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
@@ -0,0 +1,264 @@
+# ================== PERFILADO BAJO DEMANDA (UNA EJECUCIÓN) ==================
+# Para reproducir "la página anda lenta": con PERFILADO_CLAVE definida, abrir
+# la app con ?perfilar=<clave> perfila la siguiente ejecución completa de esa
+# sesión (el parámetro se consume, así que es una sola vez). PERFILADO_FORZADO=1
+# perfila todas las ejecuciones completas (solo para pruebas locales).
+#   - muestreo (por defecto): un hilo toma la pila del script cada
+#     PERFILADO_INTERVALO_MS y la guarda en formato "folded" (flamegraph.pl,
+#     speedscope, inferno)
+#   - determinista: cProfile; se guarda el .prof (snakeviz, flameprof)
+# En ambos casos se muestran las funciones más costosas y, con tracemalloc, los
+# bloques y bytes que asignan las secciones marcadas con @asignaciones
+# (frame derivado, filtros, HTML de tabla y tarjetas).
+# Sin clave ni forzado, @asignaciones devuelve la función sin envolver y
+# solicitado() corta en la primera comparación: costo cero.
+import cProfile
+import hmac
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from functools import wraps
+
+CLAVE = os.environ.get("PERFILADO_CLAVE")
+FORZADO = os.environ.get("PERFILADO_FORZADO", "0") == "1"
+MODO = os.environ.get("PERFILADO_MODO", "muestreo")  # muestreo | determinista
+INTERVALO = float(os.environ.get("PERFILADO_INTERVALO_MS", "1")) / 1000
+DURACION_MAXIMA = float(os.environ.get("PERFILADO_DURACION_MAXIMA", "120"))
+DIRECTORIO = os.environ.get("PERFILADO_DIRECTORIO", ".perfiles")
+TOP_FUNCIONES = 25
+
+DISPONIBLE = bool(CLAVE) or FORZADO
+PARAMETRO = "perfilar"
+
+# tracemalloc y el perfilador son globales al proceso: un perfil a la vez
+_activo = None
+_lock = threading.Lock()
+
+
+def _etiqueta(codigo) -> str:
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+
+def _pila(frame) -> str:
+    nombres = []
+    while frame is not None:
+        nombres.append(_etiqueta(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(nombres))
+
+
+class Perfil:
+    def __init__(self, modo: str = MODO, intervalo: float = INTERVALO):
+        self.modo = modo if modo in ("muestreo", "determinista") else "muestreo"
+        self.intervalo = max(0.0001, intervalo)
+        self.hilo = threading.get_ident()
+        self.muestras = Counter()   # pila folded -> cantidad de muestras
+        self.capturas = []          # (sección, snapshot antes, snapshot después, pico)
+        self.perfilador = None
+        self._detener = threading.Event()
+        self._pausado = False
+        self._muestreador = None
+        self._vencimiento = None
+        self._cerrado = False
+        self.inicio = 0.0
+        self.duracion = 0.0
+
+    # ---------- Ciclo de vida ----------
+    def iniciar(self):
+        tracemalloc.start()
+        self.inicio = time.perf_counter()
+        if self.modo == "determinista":
+            self.perfilador = cProfile.Profile()
+            self.perfilador.enable()
+        else:
+            self._muestreador = threading.Thread(target=self._muestrear, name="perfilado-muestreo", daemon=True)
+            self._muestreador.start()
+        # Si la ejecución se corta (st.rerun, st.stop, excepción) nadie llama a
+        # terminar(): el perfil se cierra solo para no dejar tracemalloc encendido
+        self._vencimiento = threading.Timer(DURACION_MAXIMA, self._cerrar)
+        self._vencimiento.daemon = True
+        self._vencimiento.start()
+
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            frame = None if self._pausado else sys._current_frames().get(self.hilo)
+            if frame is not None:
+                self.muestras[_pila(frame)] += 1
+
+    def _cerrar(self):
+        global _activo
+        with _lock:
+            if self._cerrado:
+                return
+            self._cerrado = True
+            self.duracion = time.perf_counter() - self.inicio
+            self._detener.set()
+            if self.perfilador is not None:
+                self.perfilador.disable()
+            if self._vencimiento is not None:
+                self._vencimiento.cancel()
+            tracemalloc.stop()
+            if _activo is self:
+                _activo = None
+        if self._muestreador is not None and self._muestreador is not threading.current_thread():
+            self._muestreador.join()
+
+    def terminar(self) -> dict:
+        self._cerrar()
+        return self.informe()
+
+    # ---------- Asignaciones ----------
+    # Las capturas de tracemalloc no deben aparecer en el perfil: se pausa el
+    # perfilador mientras se toman y las diferencias se calculan al final
+    def capturar(self):
+        self._pausado = True
+        if self.perfilador is not None:
+            self.perfilador.disable()
+        try:
+            return tracemalloc.take_snapshot()
+        finally:
+            if self.perfilador is not None and not self._cerrado:
+                self.perfilador.enable()
+            self._pausado = False
+
+    def secciones(self) -> dict:
+        resultado = {}
+        for seccion, antes, despues, pico in self.capturas:
+            diferencias = despues.compare_to(antes, "filename")
+            s = resultado.setdefault(seccion, {"llamadas": 0, "bloques": 0, "bytes": 0, "pico_bytes": 0})
+            s["llamadas"] += 1
+            s["bloques"] += sum(d.count_diff for d in diferencias if d.count_diff > 0)
+            s["bytes"] += sum(d.size_diff for d in diferencias)
+            s["pico_bytes"] = max(s["pico_bytes"], pico)
+        return resultado
+
+    # ---------- Informe ----------
+    def _funciones_muestreo(self) -> list:
+        propias = Counter()
+        totales = Counter()
+        for pila, n in self.muestras.items():
+            marcos = pila.split(";")
+            propias[marcos[-1]] += n
+            for marco in set(marcos):
+                totales[marco] += n
+        total = sum(self.muestras.values()) or 1
+        return [
+            {
+                "funcion": f,
+                "propio_%": round(propias[f] / total * 100, 1),
+                "acumulado_%": round(totales[f] / total * 100, 1),
+                "muestras": propias[f],
+            }
+            for f, _ in propias.most_common(TOP_FUNCIONES)
+        ]
+
+    def _funciones_deterministas(self) -> list:
+        stats = pstats.Stats(self.perfilador).stats
+        filas = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:TOP_FUNCIONES]
+        return [
+            {
+                "funcion": f"{funcion} ({os.path.basename(archivo)}:{linea})",
+                "propio_ms": round(propio * 1000, 2),
+                "acumulado_ms": round(acumulado * 1000, 2),
+                "llamadas": llamadas,
+            }
+            for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in filas
+        ]
+
+    def guardar(self, directorio: str = DIRECTORIO) -> str:
+        os.makedirs(directorio, exist_ok=True)
+        nombre = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        if self.modo == "determinista":
+            ruta = os.path.join(directorio, nombre + ".prof")
+            self.perfilador.dump_stats(ruta)
+        else:
+            ruta = os.path.join(directorio, nombre + ".folded")
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.writelines(f"{pila} {n}\n" for pila, n in self.muestras.items())
+        return ruta
+
+    def informe(self) -> dict:
+        return {
+            "modo": self.modo,
+            "duracion": self.duracion,
+            "muestras": sum(self.muestras.values()),
+            "funciones": self._funciones_deterministas() if self.modo == "determinista" else self._funciones_muestreo(),
+            "secciones": self.secciones(),
+            "archivo": self.guardar(),
+        }
+
+
+# ========== API ==========
+def solicitado(parametros) -> bool:
+    if not DISPONIBLE:
+        return False
+    if FORZADO:
+        return True
+    valor = parametros.get(PARAMETRO)
+    return bool(valor) and hmac.compare_digest(str(valor), CLAVE)
+
+
+def iniciar(parametros):
+    # Devuelve el Perfil en curso, o None si no se pidió o ya hay otro perfil activo
+    global _activo
+    if not solicitado(parametros):
+        return None
+    if PARAMETRO in parametros:
+        del parametros[PARAMETRO]  # una sola ejecución por pedido
+    with _lock:
+        if _activo is not None:
+            return None
+        _activo = Perfil()
+        perfil = _activo
+    perfil.iniciar()
+    return perfil
+
+
+def asignaciones(seccion: str):
+    # Marca una sección cuyos bloques y bytes asignados se informan en el perfil
+    def decorador(funcion):
+        if not DISPONIBLE:
+            return funcion
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            perfil = _activo
+            if perfil is None or perfil.hilo != threading.get_ident() or not tracemalloc.is_tracing():
+                return funcion(*args, **kwargs)
+            antes = perfil.capturar()
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                if tracemalloc.is_tracing():
+                    pico = tracemalloc.get_traced_memory()[1] - base
+                    perfil.capturas.append((seccion, antes, perfil.capturar(), pico))
+        return envoltura
+    return decorador
+
+
+def mostrar(informe: dict):
+    import pandas as pd
+    import streamlit as st
+
+    with st.expander(f"🔬 Perfil de esta ejecución ({informe['modo']}, {informe['duracion'] * 1000:.0f} ms)", expanded=True):
+        if informe["modo"] == "muestreo":
+            st.caption(f"{informe['muestras']} muestras. Pilas en formato folded para flamegraph.")
+        st.markdown("**Funciones más costosas**")
+        st.dataframe(pd.DataFrame(informe["funciones"]), width="stretch", hide_index=True)
+        if informe["secciones"]:
+            st.markdown("**Asignaciones por sección (tracemalloc)**")
+            secciones = pd.DataFrame.from_dict(informe["secciones"], orient="index")
+            st.dataframe(secciones.rename_axis("sección").reset_index(), width="stretch", hide_index=True)
+        with open(informe["archivo"], "rb") as f:
+            st.download_button(
+                "Descargar perfil", f.read(), file_name=os.path.basename(informe["archivo"]),
+                key="perfilado_descarga",
+            )
+        st.caption(f"Guardado en {informe['archivo']}")
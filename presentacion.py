@@ -0,0 +1,403 @@
+# ================== PRESENTACIÓN: HTML DE LA TABLA Y LAS TARJETAS ==================
+# El HTML se arma en una sola pasada (join por columnas, sin iterrows) y se
+# guarda en caché por versión del catálogo + combinación de filtros: las
+# re-ejecuciones sin cambios reutilizan exactamente el mismo fragmento.
+# Los fragmentos se muestran dentro del componente selector_comisiones, que
+# inicializa DataTables y devuelve a Python el id (data-id) de la comisión elegida.
+import hashlib
+import os
+from html import escape
+
+import pandas as pd
+
+from cache_lru import CacheLRU
+from metricas import medida
+from perfilado import asignaciones
+
+COLUMNAS_TABLA = [
+    "Actividad (Comisión)", "Fecha inicio", "Fecha fin", "Fecha cierre",
+    "Créditos", "Modalidad", "Apto tramo", "Ver más",
+]
+
+MAX_TABLAS_CACHE = int(os.environ.get("TABLAS_CACHE_MAX", "64"))
+MAX_MB_TABLAS_CACHE = float(os.environ.get("TABLAS_CACHE_MAX_MB", "128"))
+
+cache_tablas = CacheLRU(MAX_TABLAS_CACHE, max_bytes=int(MAX_MB_TABLAS_CACHE * 2**20))
+
+ESTILOS_TABLA = """
+<style>
+.courses-table {
+    width: 90%;
+    margin: 0 auto;
+    border-collapse: collapse;
+    font-size: 12px;
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+    border-radius: 8px;
+    overflow: hidden;
+    background-color: white;
+}
+.courses-table thead tr {
+    background-color: #136ac1;
+    color: #ffffff;
+    text-align: left;
+    font-weight: bold;
+}
+.courses-table th, .courses-table td {
+    padding: 10px 8px;
+    border-bottom: 1px solid #e0e0e0;
+}
+.courses-table tbody tr {
+    background-color: #ffffff;
+    transition: all 0.3s ease;
+    cursor: pointer;
+}
+.courses-table tbody tr:hover {
+    background-color: #e3f2fd;
+    transform: translateY(-2px);
+    box-shadow: 0 4px 12px rgba(19, 106, 193, 0.3);
+}
+.courses-table tbody tr.selected {
+    background-color: #bbdefb !important;
+    border-left: 4px solid #136ac1;
+}
+.courses-table a {
+    color: #136ac1;
+    text-decoration: none;
+    font-weight: bold;
+    padding: 4px 8px;
+    border: 2px solid #136ac1;
+    border-radius: 5px;
+    transition: all 0.3s ease;
+    display: inline-block;
+}
+.courses-table a:hover {
+    background-color: #136ac1;
+    color: white;
+    transform: scale(1.05);
+}
+.no-link {
+    color: #bdc3c7;
+    font-style: italic;
+}
+</style>
+"""
+
+ENCABEZADO_TABLA = """
+<div style="overflow-x: auto; margin-bottom: 0;">
+<table class="courses-table" id="{table_id}">
+<thead>
+<tr>
+    <th>Actividad (Comisión)</th>
+    <th>Inicio</th>
+    <th>Fin</th>
+    <th>Cierre</th>
+    <th>Créditos</th>
+    <th>Modalidad</th>
+    <th>Tramo</th>
+    <th>INAP</th>
+</tr>
+</thead>
+<tbody>
+"""
+
+PIE_TABLA = """
+</tbody>
+</table>
+</div>
+"""
+
+SIN_ENLACE = '<td><span class="no-link">Sin enlace</span></td>'
+
+
+def _texto(serie: pd.Series):
+    # Valores escapados para contenido y atributos HTML (quote=True escapa ' y ")
+    return (escape(str(v), quote=True) for v in serie.astype(object).where(serie.notna(), ""))
+
+
+def _celdas_enlace(serie: pd.Series):
+    return (
+        f'<td><a href="{url}" target="_blank" onclick="event.stopPropagation()">Acceder</a></td>'
+        if url else SIN_ENLACE
+        for url in _texto(serie)
+    )
+
+
+def filas_html(df: pd.DataFrame) -> str:
+    columnas = zip(
+        _texto(df["id"]),
+        _texto(df["Actividad (Comisión)"]),
+        _texto(df["Fecha inicio"]),
+        _texto(df["Fecha fin"]),
+        _texto(df["Fecha cierre"]),
+        _texto(df["Créditos"]),
+        _texto(df["Modalidad"]),
+        _texto(df["Apto tramo"]),
+        _celdas_enlace(df["Ver más"]),
+    )
+    return "".join(
+        '<tr data-id="%s">'
+        "<td>%s</td><td>%s</td><td>%s</td><td>%s</td><td>%s</td><td>%s</td><td>%s</td>%s</tr>" % fila
+        for fila in columnas
+    )
+
+
+@medida("tabla_html")
+@asignaciones("tabla_html")
+def crear_tabla_html(df: pd.DataFrame, table_id: str) -> str:
+    return "".join((
+        ESTILOS_TABLA,
+        ENCABEZADO_TABLA.replace("{table_id}", table_id),
+        filas_html(df),
+        PIE_TABLA,
+    ))
+
+
+def tabla_html(df: pd.DataFrame, version: int, filtros: tuple) -> str:
+    clave = (version, filtros)
+    html = cache_tablas.obtener(clave)
+    if html is None:
+        table_id = "coursesTable_" + hashlib.blake2b(repr(clave).encode(), digest_size=4).hexdigest()
+        html = crear_tabla_html(df, table_id)
+        cache_tablas.guardar(clave, html)
+    return html
+
+
+# ========== TARJETAS DESTACADAS (UN SOLO MOTOR) ==========
+# Las tres secciones de "Actividades destacadas" (grilla, interactiva dentro
+# del selector y flip) muestran la misma selección, elegida una vez por
+# versión del catálogo + filtros, y salen de una sola plantilla con una sola
+# hoja de estilos. El HTML de cada variante queda en caché.
+CANTIDAD_DESTACADAS = int(os.environ.get("DESTACADAS_CANTIDAD", "6"))
+ORDEN_DESTACADAS = os.environ.get("DESTACADAS_ORDEN", "catalogo")
+
+# criterio -> (columna del frame derivado, ascendente); None: orden del catálogo
+CRITERIOS_DESTACADAS = {
+    "catalogo": None,
+    "cierre": ("fecha_cierre", True),   # inscripción que cierra antes
+    "inicio": ("fecha_desde", True),
+    "creditos": ("Créditos", False),
+}
+VARIANTES_TARJETAS = ("grilla", "interactiva", "flip")
+
+cache_tarjetas = CacheLRU(MAX_TABLAS_CACHE * len(VARIANTES_TARJETAS))
+
+# Reglas comunes + las de cada destino: la página (grilla y flip) y el iframe
+# del selector (interactiva). Se envían compactadas.
+_CSS_TARJETAS = """
+.card-grid {
+    display: grid;
+    grid-template-columns: repeat(3, 1fr);
+    gap: 25px;
+    padding: 10px 4px;
+    margin-top: 10px;
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+}
+.card {
+    background-color: #f9f9f9;
+    padding: 20px;
+    border-left: 5px solid #136ac1;
+    border-radius: 10px;
+    box-shadow: 1px 1px 5px rgba(0,0,0,0.05);
+    min-height: 220px;
+    transition: transform 0.25s ease, box-shadow 0.25s ease;
+}
+.card:hover {
+    transform: scale(1.03);
+    box-shadow: 0 8px 18px rgba(0,0,0,0.15);
+}
+.card h4 {
+    color: #136ac1;
+    font-size: 16px;
+    margin: 0 0 8px 0;
+}
+.card p {
+    margin: 4px 0;
+    font-size: 14px;
+}
+@media (max-width: 900px) {
+  .card-grid { grid-template-columns: repeat(2, 1fr); }
+}
+@media (max-width: 600px) {
+  .card-grid { grid-template-columns: 1fr; }
+}
+"""
+_CSS_TARJETAS_INTERACTIVAS = """
+.card.selected {
+    background-color: #e3f2fd;
+}
+.card-buttons {
+    display: flex;
+    gap: 10px;
+    margin-top: 12px;
+}
+.card-buttons a, .card-buttons button {
+    flex: 1;
+    text-align: center;
+    padding: 6px 12px;
+    border-radius: 6px;
+    font-size: 13px;
+    font-weight: bold;
+    cursor: pointer;
+    transition: all 0.2s ease;
+}
+.btn-acceder {
+    background-color: #136ac1;
+    color: white;
+    border: none;
+    text-decoration: none;
+}
+.btn-acceder:hover {
+    background-color: #0e4f91;
+}
+.btn-anotarse {
+    background-color: white;
+    border: 2px solid #136ac1;
+    color: #136ac1;
+}
+.btn-anotarse:hover {
+    background-color: #136ac1;
+    color: white;
+}
+.no-link {
+    color: #bdc3c7;
+    font-style: italic;
+}
+"""
+_CSS_TARJETAS_FLIP = """
+.flip-card {
+    background-color: transparent;
+    height: 230px;
+    perspective: 1000px;
+}
+.flip-card-inner {
+    position: relative;
+    width: 100%;
+    height: 100%;
+    text-align: center;
+    transition: transform 0.8s;
+    transform-style: preserve-3d;
+}
+.flip-card:hover .flip-card-inner {
+    transform: rotateY(180deg);
+}
+.flip-card-front, .flip-card-back {
+    position: absolute;
+    width: 100%;
+    height: 100%;
+    box-sizing: border-box;
+    -webkit-backface-visibility: hidden;
+    backface-visibility: hidden;
+    border-radius: 10px;
+    box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+    display: flex;
+    flex-direction: column;
+    justify-content: center;
+    align-items: center;
+    padding: 15px;
+}
+.flip-card-front {
+    background-color: #136ac1;
+    color: white;
+    font-weight: bold;
+    font-size: 14px;
+}
+.flip-card-back {
+    background-color: #f9f9f9;
+    color: #333;
+    transform: rotateY(180deg);
+    line-height: 1.4;
+}
+.flip-card-back p {
+    font-size: 13px;
+}
+"""
+
+
+def _compactar(css: str) -> str:
+    return "<style>" + " ".join(css.split()) + "</style>"
+
+
+ESTILOS_TARJETAS = _compactar(_CSS_TARJETAS + _CSS_TARJETAS_FLIP)
+ESTILOS_TARJETAS_INTERACTIVAS = _compactar(_CSS_TARJETAS + _CSS_TARJETAS_INTERACTIVAS)
+
+DETALLE_TARJETA = (
+    "<p><b>📅 Fechas:</b> {inicio} al {fin}</p>"
+    "<p><b>🎓 Modalidad:</b> {modalidad}</p>"
+    "<p><b>⭐ Créditos:</b> {creditos}</p>"
+)
+PLANTILLAS_TARJETA = {
+    "grilla": '<div class="card" data-id="{id}"><h4>{titulo}</h4>' + DETALLE_TARJETA + "</div>",
+    "interactiva": (
+        '<div class="card" data-id="{id}"><h4>{titulo}</h4>' + DETALLE_TARJETA
+        + '<div class="card-buttons">{enlace}<button class="btn-anotarse" data-id="{id}">📝 Anotarse</button></div></div>'
+    ),
+    "flip": (
+        '<div class="flip-card"><div class="flip-card-inner">'
+        '<div class="flip-card-front">{titulo}</div>'
+        '<div class="flip-card-back">' + DETALLE_TARJETA + "</div>"
+        "</div></div>"
+    ),
+}
+
+
+def seleccionar_destacadas(df: pd.DataFrame, criterio: str = ORDEN_DESTACADAS,
+                           cantidad: int = CANTIDAD_DESTACADAS) -> pd.DataFrame:
+    orden = CRITERIOS_DESTACADAS.get(criterio)
+    if orden is None:
+        return df.head(cantidad)
+    columna, ascendente = orden
+    # Estable: a igual valor se respeta el orden del catálogo; sin fecha, al final
+    return df.sort_values(columna, ascending=ascendente, kind="stable", na_position="last").head(cantidad)
+
+
+def _campos_tarjetas(df: pd.DataFrame) -> list:
+    enlaces = (
+        f"<a href='{url}' target='_blank' class='btn-acceder'>🌐 Acceder</a>" if url
+        else "<span class='no-link'>Sin enlace</span>"
+        for url in _texto(df["Ver más"])
+    )
+    return [
+        dict(zip(("id", "titulo", "inicio", "fin", "modalidad", "creditos", "enlace"), valores))
+        for valores in zip(
+            _texto(df["id"]),
+            _texto(df["Actividad (Comisión)"]),
+            _texto(df["Fecha inicio"]),
+            _texto(df["Fecha fin"]),
+            _texto(df["Modalidad"]),
+            _texto(df["Créditos"]),
+            enlaces,
+        )
+    ]
+
+
+@medida("tarjetas_html")
+@asignaciones("tarjetas_html")
+def crear_tarjetas_html(df: pd.DataFrame, variante: str) -> str:
+    plantilla = PLANTILLAS_TARJETA[variante]
+    tarjetas = "".join(plantilla.format(**campos) for campos in _campos_tarjetas(df))
+    # La variante interactiva va dentro del iframe del selector: lleva sus estilos;
+    # las de la página usan ESTILOS_TARJETAS, que form.py envía una vez
+    estilos = ESTILOS_TARJETAS_INTERACTIVAS if variante == "interactiva" else ""
+    return f'{estilos}<div class="card-grid">{tarjetas}</div>'
+
+
+def destacadas(df: pd.DataFrame, version: int, filtros: tuple, criterio: str = ORDEN_DESTACADAS,
+               cantidad: int = CANTIDAD_DESTACADAS) -> pd.DataFrame:
+    # df: frame derivado ya filtrado; la selección se calcula una vez por versión + filtros
+    clave = ("seleccion", version, filtros, criterio, cantidad)
+    seleccion = cache_tarjetas.obtener(clave)
+    if seleccion is None:
+        seleccion = seleccionar_destacadas(df, criterio, cantidad)
+        cache_tarjetas.guardar(clave, seleccion)
+    return seleccion
+
+
+def tarjetas_html(df: pd.DataFrame, version: int, filtros: tuple, variante: str,
+                  criterio: str = ORDEN_DESTACADAS, cantidad: int = CANTIDAD_DESTACADAS) -> str:
+    clave = (variante, version, filtros, criterio, cantidad)
+    html = cache_tarjetas.obtener(clave)
+    if html is None:
+        html = crear_tarjetas_html(destacadas(df, version, filtros, criterio, cantidad), variante)
+        cache_tarjetas.guardar(clave, html)
+    return html
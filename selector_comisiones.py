@@ -0,0 +1,25 @@
+# ================== COMPONENTE DE SELECCIÓN DE COMISIONES ==================
+# Tabla y tarjetas dentro de un componente bidireccional: el clic en una fila o
+# en "Anotarse" devuelve el id de la comisión a Python como valor del componente
+# (un rerun liviano, sin recargar la página ni volver a crear el iframe).
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+_componente = components.declare_component(
+    "selector_comisiones",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "selector_comisiones"),
+)
+
+
+def selector_comisiones(html: str, modo: str, key: str, seleccionado: str = None):
+    # Devuelve el id elegido solo en el rerun en que se hizo el clic
+    valor = _componente(html=html, modo=modo, seleccionado=seleccionado, key=key, default=None)
+    if not valor:
+        return None
+    clave_marca = f"_{key}_marca"
+    if st.session_state.get(clave_marca) == valor.get("marca"):
+        return None
+    st.session_state[clave_marca] = valor.get("marca")
+    return valor.get("id")
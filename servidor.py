@@ -0,0 +1,135 @@
+# ================== ARRANQUE DEL SERVIDOR (PRECALENTADO + READINESS) ==================
+# Reemplaza a "streamlit run form.py" en producción:
+#     python servidor.py [--server.port 8501 ...]   (mismas opciones que streamlit run)
+# En el mismo proceso que Streamlit y antes de recibir tráfico: importa los
+# módulos pesados, crea los clientes del pool, trae el catálogo y arma el
+# frame derivado, el índice de búsqueda y el HTML inicial de tabla y tarjetas.
+# Las sesiones importan esos mismos módulos (sys.modules), así que la primera
+# persona encuentra las cachés llenas. Si hay instantánea del catálogo en disco
+# (ver instantanea.py) el catálogo sale de ahí y Supabase se consulta en segundo plano.
+# Readiness para el balanceador en http://LISTO_HOST:LISTO_PUERTO/listo:
+# 503 hasta terminar el precalentado, 200 después (/vivo responde siempre).
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(RAIZ, "form.py")
+
+PUERTO_LISTO = int(os.environ.get("LISTO_PUERTO", "8502"))
+HOST_LISTO = os.environ.get("LISTO_HOST", "0.0.0.0")
+# Reintentos del precalentado si Supabase no responde al arrancar
+REINTENTOS = int(os.environ.get("PRECALENTADO_REINTENTOS", "5"))
+ESPERA_REINTENTO = float(os.environ.get("PRECALENTADO_ESPERA", "2"))
+
+logger = logging.getLogger("servidor")
+
+estado = {"listo": False, "error": None, "tiempos": {}}
+
+
+def precalentar() -> dict:
+    # Devuelve cuánto tardó cada etapa (segundos)
+    tiempos = {}
+
+    inicio = time.perf_counter()
+    import catalogo
+    import conexion
+    import invalidacion
+    import metricas
+    import presentacion
+    from cola_inscripciones import obtener_cola
+    tiempos["importaciones"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    pool = conexion.obtener_pool()
+    pool.precalentar()
+    tiempos["clientes"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    derivado = catalogo.obtener_catalogo(pool)
+    tiempos["catalogo"] = time.perf_counter() - inicio
+
+    # Lo que arma la primera ejecución de form.py con los filtros en "Todos"
+    inicio = time.perf_counter()
+    filtros = (None, None, None)
+    filtradas = derivado.filtros.filtrar(*filtros)
+    # Mismo recorte que comisiones_filtradas() en form.py
+    tabla = filtradas[["id"] + presentacion.COLUMNAS_TABLA].reset_index(drop=True)
+    presentacion.tabla_html(tabla, derivado.version, filtros)
+    for variante in presentacion.VARIANTES_TARJETAS:
+        presentacion.tarjetas_html(filtradas, derivado.version, filtros, variante)
+    derivado.busqueda
+    tiempos["derivados"] = time.perf_counter() - inicio
+
+    # La cola reencola lo que haya quedado en el spool de la réplica anterior
+    obtener_cola(pool)
+    invalidacion.iniciar_escucha(catalogo.cache_catalogo)
+    metricas.iniciar_servidor()
+    return tiempos
+
+
+def _precalentar_con_reintentos():
+    for intento in range(1, REINTENTOS + 1):
+        try:
+            estado["tiempos"] = precalentar()
+            estado["error"] = None
+            estado["listo"] = True
+            logger.info("Precalentado en %.2fs: %s", sum(estado["tiempos"].values()), estado["tiempos"])
+            return
+        except Exception as e:
+            estado["error"] = str(e)
+            logger.warning("Precalentado falló (intento %s/%s): %s", intento, REINTENTOS, e)
+            time.sleep(ESPERA_REINTENTO * intento)
+    # Sin catálogo la réplica igual atiende (cada sesión lo pide), pero tarde:
+    # se marca lista para no quedar fuera del balanceador para siempre
+    estado["listo"] = True
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        ruta = self.path.split("?")[0]
+        if ruta == "/vivo":
+            codigo, cuerpo = 200, {"vivo": True}
+        elif ruta == "/listo":
+            codigo = 200 if estado["listo"] else 503
+            cuerpo = dict(estado)
+        else:
+            self.send_error(404)
+            return
+        datos = json.dumps(cuerpo).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_readiness(puerto: int = PUERTO_LISTO, host: str = HOST_LISTO):
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="readiness-http", daemon=True).start()
+    return servidor
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    sys.path.insert(0, RAIZ)
+    iniciar_readiness()
+    threading.Thread(target=_precalentar_con_reintentos, name="precalentado", daemon=True).start()
+
+    # Streamlit en este mismo proceso: comparte los módulos ya cargados
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", SCRIPT] + sys.argv[1:]
+    cli.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+-- Notificaciones de cambios del catálogo (canal catalogo_comisiones).
+-- Cada proceso de la app escucha el canal (invalidacion.py) y, al llegar un
+-- aviso, refresca solo las comisiones afectadas en lugar de esperar al TTL.
+-- Un aviso por sentencia, al confirmar la transacción, con las claves tocadas:
+--   {"tabla": "comisiones", "columna": "id", "claves": [...], "enviado": <epoch>}
+-- Si las claves no entran en el payload de pg_notify (8000 bytes) se manda
+-- "claves": null y la app hace un refresco incremental completo.
+--
+-- Las tablas son las que alimentan vista_comisiones_abiertas en el esquema
+-- local (sql/local/esquema.sql); en producción van las tablas reales de la
+-- vista, con la columna que la vista expone como id o id_actividad.
+-- Requiere Postgres >= 11 (tablas de transición en triggers por sentencia).
+
+create or replace function public.notificar_cambio_catalogo()
+returns trigger
+language plpgsql
+as $$
+declare
+    columna text := tg_argv[0];
+    claves text[];
+    aviso text;
+begin
+    if tg_op = 'INSERT' then
+        execute format('select array_agg(distinct %I::text) from nuevas', columna) into claves;
+    elsif tg_op = 'UPDATE' then
+        execute format(
+            'select array_agg(distinct clave) from '
+            '(select %1$I::text as clave from nuevas union select %1$I::text from viejas) t',
+            columna
+        ) into claves;
+    elsif tg_op = 'DELETE' then
+        execute format('select array_agg(distinct %I::text) from viejas', columna) into claves;
+    end if;
+
+    -- Sentencia sin filas afectadas: nada que avisar (TRUNCATE avisa sin claves)
+    if tg_op <> 'TRUNCATE' and claves is null then
+        return null;
+    end if;
+
+    aviso := json_build_object(
+        'tabla', tg_table_name,
+        'columna', columna,
+        'claves', claves,
+        'enviado', extract(epoch from clock_timestamp())
+    )::text;
+    if octet_length(aviso) > 7900 then
+        aviso := json_build_object(
+            'tabla', tg_table_name,
+            'columna', columna,
+            'claves', null,
+            'enviado', extract(epoch from clock_timestamp())
+        )::text;
+    end if;
+    perform pg_notify('catalogo_comisiones', aviso);
+    return null;
+end;
+$$;
+
+-- Las tablas de transición no admiten triggers de más de un evento: uno por operación
+do $$
+declare
+    destino record;
+begin
+    for destino in
+        select * from (values ('comisiones', 'id'), ('actividades', 'id_actividad')) as t (tabla, columna)
+    loop
+        execute format('drop trigger if exists %I on public.%I', destino.tabla || '_notificar_insert', destino.tabla);
+        execute format('drop trigger if exists %I on public.%I', destino.tabla || '_notificar_update', destino.tabla);
+        execute format('drop trigger if exists %I on public.%I', destino.tabla || '_notificar_delete', destino.tabla);
+        execute format('drop trigger if exists %I on public.%I', destino.tabla || '_notificar_truncate', destino.tabla);
+
+        execute format(
+            'create trigger %I after insert on public.%I referencing new table as nuevas '
+            'for each statement execute function public.notificar_cambio_catalogo(%L)',
+            destino.tabla || '_notificar_insert', destino.tabla, destino.columna
+        );
+        execute format(
+            'create trigger %I after update on public.%I referencing new table as nuevas old table as viejas '
+            'for each statement execute function public.notificar_cambio_catalogo(%L)',
+            destino.tabla || '_notificar_update', destino.tabla, destino.columna
+        );
+        execute format(
+            'create trigger %I after delete on public.%I referencing old table as viejas '
+            'for each statement execute function public.notificar_cambio_catalogo(%L)',
+            destino.tabla || '_notificar_delete', destino.tabla, destino.columna
+        );
+        execute format(
+            'create trigger %I after truncate on public.%I '
+            'for each statement execute function public.notificar_cambio_catalogo(%L)',
+            destino.tabla || '_notificar_truncate', destino.tabla, destino.columna
+        );
+    end loop;
+end
+$$;
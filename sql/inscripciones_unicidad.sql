@@ -0,0 +1,51 @@
+-- Una inscripción por agente y comisión.
+-- Es la clave de idempotencia de la cola de inscripciones (cola_inscripciones.py)
+-- y de la carga masiva: ambas insertan con upsert on_conflict=(cuil, comision_id)
+-- ignorando duplicados, así un doble clic o un reintento no crea otra fila.
+
+-- Si ya hay inscripciones duplicadas la migración se detiene sin tocar nada:
+-- cuál conservar lo decide una persona (no hay un criterio seguro cuando
+-- coinciden las fechas). Para verlas:
+--   select cuil, comision_id, count(*) from public.cursos_inscripciones
+--   group by cuil, comision_id having count(*) > 1;
+-- Resueltas, se vuelve a correr este archivo.
+do $$
+declare
+    grupos integer;
+    sobrantes integer;
+    ejemplos text;
+begin
+    select count(*), coalesce(sum(cantidad - 1), 0)
+      into grupos, sobrantes
+    from (
+        select count(*) as cantidad
+        from public.cursos_inscripciones
+        group by cuil, comision_id
+        having count(*) > 1
+    ) dup;
+
+    if grupos > 0 then
+        select string_agg(format('%s / %s (%s filas)', cuil, comision_id, cantidad), ', ')
+          into ejemplos
+        from (
+            select cuil, comision_id, count(*) as cantidad
+            from public.cursos_inscripciones
+            group by cuil, comision_id
+            having count(*) > 1
+            order by count(*) desc, cuil
+            limit 10
+        ) muestra;
+
+        raise exception 'Hay % pares (cuil, comision_id) con inscripciones duplicadas (% filas de más)',
+            grupos, sobrantes
+            using detail = 'Ejemplos: ' || ejemplos,
+                  hint = 'Resolver los duplicados a mano y volver a correr sql/inscripciones_unicidad.sql.';
+    end if;
+end
+$$;
+
+alter table public.cursos_inscripciones
+  drop constraint if exists cursos_inscripciones_cuil_comision_key;
+
+alter table public.cursos_inscripciones
+  add constraint cursos_inscripciones_cuil_comision_key unique (cuil, comision_id);
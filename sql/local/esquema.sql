@@ -0,0 +1,319 @@
+-- ================== ESQUEMA LOCAL (REEMPLAZO DE SUPABASE PARA PRUEBAS) ==================
+-- Define los objetos que usa la app y que en producción viven en el proyecto
+-- de Supabase: la vista vista_comisiones_abiertas, la tabla cursos_inscripciones
+-- y las RPC verificar_formulario_cuil / _historial / _comision y
+-- obtener_datos_para_formulario, más las tablas base que las alimentan.
+-- Las firmas y las columnas devueltas son las que consume la app; las tablas
+-- base (agentes, actividades, comisiones, cursos_historial) son propias de
+-- este esquema local.
+--
+-- Se aplica con supabase_local (python -m supabase_local), que después carga
+-- sql/catalogo_notificaciones.sql, sql/verificar_elegibilidad_*.sql,
+-- sql/inscripciones_unicidad.sql y los datos sintéticos (sembrar_datos_locales).
+
+do $$
+begin
+    if not exists (select from pg_roles where rolname = 'anon') then
+        create role anon nologin;
+    end if;
+    if not exists (select from pg_roles where rolname = 'authenticated') then
+        create role authenticated nologin;
+    end if;
+    if not exists (select from pg_roles where rolname = 'service_role') then
+        create role service_role nologin;
+    end if;
+end
+$$;
+
+-- ========== TABLAS BASE ==========
+create table if not exists public.agentes (
+    cuil text primary key,
+    nombre text not null,
+    apellido text not null,
+    email text,
+    fecha_nacimiento date,
+    sexo text,
+    situacion_revista text,
+    nivel text,
+    grado text,
+    agrupamiento text,
+    tramo text,
+    id_dependencia_simple text,
+    id_dependencia_general text,
+    nivel_educativo text,
+    titulo text,
+    activo boolean not null default true
+);
+
+create table if not exists public.actividades (
+    id_actividad text primary key,
+    nombre_actividad text not null,
+    organismo text not null,
+    creditos integer,
+    apto_tramo text,
+    updated_at timestamptz not null default now()
+);
+-- Bases locales creadas antes de que actividades tuviera marca de agua
+alter table public.actividades add column if not exists updated_at timestamptz not null default now();
+
+create table if not exists public.comisiones (
+    id uuid primary key,
+    id_comision_sai text not null unique,
+    id_actividad text not null references public.actividades (id_actividad),
+    fecha_desde date not null,
+    fecha_hasta date not null,
+    fecha_cierre date,
+    modalidad_cursada text,
+    link_externo text,
+    updated_at timestamptz not null default now()
+);
+
+create table if not exists public.cursos_historial (
+    cuil text not null,
+    id_actividad text not null,
+    estado text not null,
+    fecha date
+);
+create index if not exists cursos_historial_cuil_actividad_idx
+    on public.cursos_historial (cuil, id_actividad);
+
+create table if not exists public.cursos_inscripciones (
+    id bigserial primary key,
+    comision_id uuid not null,
+    cuil text not null,
+    fecha_inscripcion date,
+    estado_inscripcion text,
+    vacante boolean,
+    nivel_educativo text,
+    titulo text,
+    tareas_desarrolladas text,
+    email text,
+    email_alternativo text,
+    fecha_nacimiento date,
+    edad_inscripcion integer,
+    sexo text,
+    situacion_revista text,
+    nivel text,
+    grado text,
+    agrupamiento text,
+    tramo text,
+    id_dependencia_simple text,
+    id_dependencia_general text
+);
+
+-- ========== MARCA DE AGUA ==========
+-- updated_at avanza con cada cambio de la fila aunque quien actualiza no lo toque
+create or replace function public.tocar_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+do $$
+declare
+    tabla text;
+begin
+    foreach tabla in array array['comisiones', 'actividades'] loop
+        execute format('drop trigger if exists %I on public.%I', tabla || '_updated_at', tabla);
+        execute format(
+            'create trigger %I before update on public.%I for each row execute function public.tocar_updated_at()',
+            tabla || '_updated_at', tabla
+        );
+    end loop;
+end
+$$;
+
+-- ========== VISTA DEL CATÁLOGO ==========
+-- updated_at es la marca de agua del refresco incremental (ver catalogo.py): toma
+-- también la de la actividad, para que renombrar una actividad o cambiar sus
+-- créditos mueva la marca de sus comisiones. La vista de producción (Supabase)
+-- tiene que exponer la misma expresión; si no, esos cambios llegan recién con la
+-- resincronización completa periódica (CATALOGO_RESINCRONIZAR_*).
+create or replace view public.vista_comisiones_abiertas as
+select
+    c.id,
+    c.id_comision_sai,
+    a.organismo,
+    c.id_actividad,
+    a.nombre_actividad,
+    c.fecha_desde,
+    c.fecha_hasta,
+    c.fecha_cierre,
+    a.creditos,
+    c.modalidad_cursada,
+    c.link_externo,
+    a.apto_tramo,
+    greatest(c.updated_at, a.updated_at) as updated_at
+from public.comisiones c
+join public.actividades a using (id_actividad)
+where c.fecha_cierre is null or c.fecha_cierre >= current_date;
+
+-- ========== RPC DEL FORMULARIO ==========
+create or replace function public.verificar_formulario_cuil(cuil_input text)
+returns table (existe boolean)
+language sql
+stable
+as $$
+    select exists (select 1 from public.agentes where cuil = cuil_input and activo);
+$$;
+
+create or replace function public.verificar_formulario_historial(cuil_input text, id_actividad_input text)
+returns table (existe boolean)
+language sql
+stable
+as $$
+    select exists (
+        select 1 from public.cursos_historial
+        where cuil = cuil_input and id_actividad = id_actividad_input and estado = 'APROBADO'
+    );
+$$;
+
+create or replace function public.verificar_formulario_comision(cuil_input text, comision_id_input uuid)
+returns table (existe boolean)
+language sql
+stable
+as $$
+    select exists (
+        select 1 from public.cursos_inscripciones
+        where cuil = cuil_input and comision_id = comision_id_input
+    );
+$$;
+
+create or replace function public.obtener_datos_para_formulario(cuil_input text)
+returns table (
+    nombre text,
+    apellido text,
+    email text,
+    fecha_nacimiento date,
+    sexo text,
+    situacion_revista text,
+    nivel text,
+    grado text,
+    agrupamiento text,
+    tramo text,
+    id_dependencia_simple text,
+    id_dependencia_general text,
+    nivel_educativo text,
+    titulo text
+)
+language sql
+stable
+as $$
+    select nombre, apellido, email, fecha_nacimiento, sexo, situacion_revista, nivel, grado,
+           agrupamiento, tramo, id_dependencia_simple, id_dependencia_general, nivel_educativo, titulo
+    from public.agentes
+    where cuil = cuil_input and activo;
+$$;
+
+grant select on public.vista_comisiones_abiertas to anon, authenticated;
+grant select, insert on public.cursos_inscripciones to anon, authenticated;
+grant execute on function public.verificar_formulario_cuil(text) to anon, authenticated;
+grant execute on function public.verificar_formulario_historial(text, text) to anon, authenticated;
+grant execute on function public.verificar_formulario_comision(text, uuid) to anon, authenticated;
+grant execute on function public.obtener_datos_para_formulario(text) to anon, authenticated;
+-- service_role (clave de la carga masiva) accede a todo, como en Supabase
+grant usage on schema public to service_role;
+grant all on all tables in schema public to service_role;
+grant all on all sequences in schema public to service_role;
+
+-- ========== DATOS SINTÉTICOS ==========
+-- CUIL válido (prefijo 20) para el agente número n; bench/carga_concurrente.py
+-- genera los mismos, así las sesiones simuladas encuentran agentes existentes.
+create or replace function public.cuil_sintetico(n integer)
+returns text
+language sql
+immutable
+as $$
+    with base as (select '20' || lpad((20000000 + n)::text, 8, '0') as b),
+    suma as (
+        select b, 11 - (
+            substr(b, 1, 1)::int * 5 + substr(b, 2, 1)::int * 4 + substr(b, 3, 1)::int * 3 +
+            substr(b, 4, 1)::int * 2 + substr(b, 5, 1)::int * 7 + substr(b, 6, 1)::int * 6 +
+            substr(b, 7, 1)::int * 5 + substr(b, 8, 1)::int * 4 + substr(b, 9, 1)::int * 3 +
+            substr(b, 10, 1)::int * 2
+        ) % 11 as v
+        from base
+    )
+    select b || case v when 11 then '0' when 10 then '9' else v::text end from suma;
+$$;
+
+-- Vacía las tablas y genera n_agentes agentes, n_comisiones comisiones
+-- (4 por actividad) y n_historial filas de historial, de forma determinística.
+create or replace function public.sembrar_datos_locales(
+    n_agentes integer,
+    n_comisiones integer,
+    n_historial integer,
+    semilla double precision default 0.42
+)
+returns void
+language plpgsql
+as $$
+declare
+    n_actividades integer := greatest(1, n_comisiones / 4);
+begin
+    perform setseed(semilla);
+    truncate public.cursos_inscripciones, public.cursos_historial, public.comisiones,
+             public.actividades, public.agentes;
+
+    insert into public.agentes
+    select
+        public.cuil_sintetico(i),
+        'NOMBRE ' || i,
+        'APELLIDO ' || i,
+        'agente' || i || '@example.org',
+        date '1960-01-01' + (random() * 14000)::int,
+        (array['F', 'M', 'X'])[1 + (random() * 2)::int],
+        (array['PLANTA PERMANENTE', 'CONTRATADO', 'TRANSITORIO'])[1 + (random() * 2)::int],
+        (array['A', 'B', 'C', 'D', 'E', 'F'])[1 + (random() * 5)::int],
+        ((random() * 10)::int)::text,
+        (array['GENERAL', 'PROFESIONAL', 'CIENTÍFICO-TÉCNICO'])[1 + (random() * 2)::int],
+        (array['GENERAL', 'INTERMEDIO', 'AVANZADO'])[1 + (random() * 2)::int],
+        'DEP-' || (random() * 500)::int,
+        'ORG-' || (random() * 40)::int,
+        (array['SECUNDARIO', 'TERCIARIO', 'UNIVERSITARIO', 'POSGRADO'])[1 + (random() * 3)::int],
+        null,
+        random() > 0.02
+    from generate_series(0, n_agentes - 1) as i;
+
+    insert into public.actividades
+    select
+        'ACT-' || lpad(i::text, 6, '0'),
+        (array['Capacitación', 'Gestión', 'Liderazgo', 'Ética pública', 'Presupuesto',
+               'Comunicación', 'Innovación', 'Atención ciudadana', 'Datos', 'Administración'])[1 + (random() * 9)::int]
+            || ' nivel ' || (i % 7 + 1),
+        'ORGANISMO ' || lpad(((random() * 39)::int)::text, 2, '0'),
+        (array[null, 0, 3, 5, 8, 10, 12, 15, 20, 30, 40])[1 + (random() * 10)::int],
+        (array[null, 'Sí', 'No'])[1 + (random() * 2)::int]
+    from generate_series(0, n_actividades - 1) as i;
+
+    insert into public.comisiones
+    select
+        ('00000000-0000-4000-8000-' || lpad(i::text, 12, '0'))::uuid,
+        'COM-' || lpad(i::text, 6, '0'),
+        'ACT-' || lpad((i % n_actividades)::text, 6, '0'),
+        d.desde,
+        d.desde + 7 + (random() * 83)::int,
+        d.desde - 1 - (random() * 14)::int,
+        (array['Virtual', 'Presencial', 'Semipresencial', 'Virtual asincrónica'])[1 + (random() * 3)::int],
+        case when random() > 0.5 then 'https://capacitacion.example/act/' || i end,
+        now() - (random() * interval '30 days')
+    from generate_series(0, n_comisiones - 1) as i
+    cross join lateral (select current_date + 16 + (random() * 180)::int + (i * 0) as desde) d;
+
+    insert into public.cursos_historial
+    select
+        public.cuil_sintetico((random() * (n_agentes - 1))::int),
+        'ACT-' || lpad(((random() * (n_actividades - 1))::int)::text, 6, '0'),
+        (array['APROBADO', 'DESAPROBADO', 'AUSENTE'])[1 + (random() * 2)::int],
+        current_date - (random() * 2000)::int
+    from generate_series(1, n_historial);
+
+    analyze public.agentes;
+    analyze public.comisiones;
+    analyze public.cursos_historial;
+end;
+$$;
@@ -0,0 +1,79 @@
+-- ================== ELEGIBILIDAD PARA LA PREINSCRIPCIÓN (PASO 3) ==================
+-- Reúne en una sola llamada RPC las cuatro consultas que el paso "Validar CUIL"
+-- hacía en serie: verificar_formulario_cuil, verificar_formulario_historial,
+-- verificar_formulario_comision y obtener_datos_para_formulario.
+-- Se apoya en esas mismas funciones, así que las reglas siguen en un único lugar.
+--
+-- motivo_bloqueo: 'no_encontrado' | 'ya_aprobo' | 'ya_inscripto' | '' (habilitado).
+-- Como en el flujo anterior, las verificaciones se cortan en el primer bloqueo.
+-- Los datos del agente (datos personales) se devuelven solo si está habilitado,
+-- que es cuando el formulario los usa; el cliente los guarda en su caché de
+-- perfiles (agentes.py).
+--
+-- omitir_perfil_input: el cliente ya tiene el perfil del CUIL en caché y no se
+-- vuelve a leer. La existencia se verifica igual: el parámetro lo manda quien
+-- llama (la función se ejecuta con la clave anónima) y no puede saltearla.
+
+drop function if exists public.verificar_elegibilidad_inscripcion(text, uuid, text);
+
+create or replace function public.verificar_elegibilidad_inscripcion(
+    cuil_input text,
+    comision_id_input uuid,
+    id_actividad_input text,
+    omitir_perfil_input boolean default false
+)
+returns table (
+    existe boolean,
+    ya_aprobo boolean,
+    ya_inscripto boolean,
+    datos jsonb,
+    motivo_bloqueo text
+)
+language plpgsql
+stable
+as $$
+begin
+    existe := false;
+    ya_aprobo := false;
+    ya_inscripto := false;
+    datos := null;
+    motivo_bloqueo := '';
+
+    select coalesce(bool_or(c.existe), false) into existe
+    from public.verificar_formulario_cuil(cuil_input) as c;
+
+    if not existe then
+        motivo_bloqueo := 'no_encontrado';
+        return next;
+        return;
+    end if;
+
+    select coalesce(bool_or(h.existe), false) into ya_aprobo
+    from public.verificar_formulario_historial(cuil_input, id_actividad_input) as h;
+
+    if ya_aprobo then
+        motivo_bloqueo := 'ya_aprobo';
+        return next;
+        return;
+    end if;
+
+    select coalesce(bool_or(i.existe), false) into ya_inscripto
+    from public.verificar_formulario_comision(cuil_input, comision_id_input) as i;
+
+    if ya_inscripto then
+        motivo_bloqueo := 'ya_inscripto';
+        return next;
+        return;
+    end if;
+
+    if not omitir_perfil_input then
+        select to_jsonb(d) into datos
+        from public.obtener_datos_para_formulario(cuil_input) as d
+        limit 1;
+    end if;
+
+    return next;
+end;
+$$;
+
+grant execute on function public.verificar_elegibilidad_inscripcion(text, uuid, text, boolean) to anon, authenticated;
@@ -0,0 +1,39 @@
+-- ================== ELEGIBILIDAD EN LOTE (CARGA MASIVA) ==================
+-- Misma verificación que verificar_elegibilidad_inscripcion, para muchos CUIL
+-- de una misma comisión en una sola llamada RPC. Devuelve una fila por CUIL
+-- recibido (en el mismo orden). Los datos del agente (datos personales) se
+-- devuelven solo para los CUIL habilitados, que son los que se inscriben.
+-- Solo para service_role (la clave de la carga masiva, SUPABASE_CLAVE_RRHH):
+-- con la clave anónima, que viaja al navegador, permitiría leer perfiles de
+-- muchos CUIL de una vez, sin la clave de la página ni los límites de limites.py.
+-- Requiere sql/verificar_elegibilidad_inscripcion.sql.
+
+create or replace function public.verificar_elegibilidad_lote(
+    cuiles_input text[],
+    comision_id_input uuid,
+    id_actividad_input text
+)
+returns table (
+    cuil text,
+    existe boolean,
+    ya_aprobo boolean,
+    ya_inscripto boolean,
+    datos jsonb,
+    motivo_bloqueo text
+)
+language sql
+stable
+as $$
+    select u.cuil, e.existe, e.ya_aprobo, e.ya_inscripto,
+           case when e.motivo_bloqueo = '' then e.datos end as datos,
+           e.motivo_bloqueo
+    from unnest(cuiles_input) with ordinality as u(cuil, orden)
+    cross join lateral public.verificar_elegibilidad_inscripcion(
+        u.cuil, comision_id_input, id_actividad_input
+    ) as e
+    order by u.orden;
+$$;
+
+-- Las funciones nuevas se pueden ejecutar por defecto (public, y en Supabase anon/authenticated)
+revoke execute on function public.verificar_elegibilidad_lote(text[], uuid, text) from public, anon, authenticated;
+grant execute on function public.verificar_elegibilidad_lote(text[], uuid, text) to service_role;
@@ -0,0 +1,225 @@
+# ================== SUPABASE LOCAL (POSTGRES + CLIENTE COMPATIBLE) ==================
+# Reemplazo del proyecto de Supabase para medir y verificar cambios sin tocar
+# producción. Cubre lo que la app usa del cliente (table/select/gte/in_/eq,
+# insert/upsert y rpc), traducido a SQL contra un Postgres local con el
+# esquema de sql/local/esquema.sql. Las respuestas salen de json_agg, así que
+# fechas, uuid y jsonb llegan serializados igual que desde PostgREST.
+# Requiere psycopg2; pgserver (opcional) levanta un Postgres embebido.
+#
+#     python -m supabase_local --agentes 100000 --comisiones 5000 --historial 1000000
+#
+# y después, en el proceso de la app o del benchmark:
+#
+#     import supabase_local
+#     supabase_local.instalar(dsn, latencia=0.02)
+import os
+import random
+import re
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVOS_SQL = [
+    "sql/local/esquema.sql",
+    "sql/catalogo_notificaciones.sql",
+    "sql/inscripciones_unicidad.sql",
+    "sql/verificar_elegibilidad_inscripcion.sql",
+    "sql/verificar_elegibilidad_lote.sql",
+]
+
+DSN = os.environ.get("SUPABASE_LOCAL_DSN")
+DIRECTORIO_PGSERVER = os.environ.get("SUPABASE_LOCAL_DIRECTORIO", os.path.join(RAIZ, ".pgdata"))
+
+_IDENTIFICADOR = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class ErrorLocal(Exception):
+    pass
+
+
+def _identificador(nombre: str) -> str:
+    nombre = nombre.strip()
+    if not _IDENTIFICADOR.match(nombre):
+        raise ErrorLocal(f"Identificador no soportado: {nombre!r}")
+    return '"%s"' % nombre
+
+
+class _Respuesta:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Consulta:
+    def __init__(self, cliente, tabla: str):
+        self.cliente = cliente
+        self.tabla = _identificador(tabla)
+        self.columnas = "*"
+        self.condiciones = []
+        self.parametros = []
+        self.escritura = None
+
+    # ========== LECTURA ==========
+    def select(self, columnas: str = "*"):
+        if columnas.strip() != "*":
+            self.columnas = ", ".join(_identificador(c) for c in columnas.split(","))
+        return self
+
+    def _condicion(self, columna: str, operador: str, valor):
+        self.condiciones.append(f"{_identificador(columna)} {operador} %s")
+        self.parametros.append(valor)
+        return self
+
+    def eq(self, columna: str, valor):
+        return self._condicion(columna, "=", valor)
+
+    def gte(self, columna: str, valor):
+        return self._condicion(columna, ">=", valor)
+
+    def in_(self, columna: str, valores):
+        # Comparación como texto: psycopg2 manda la lista como text[] y la columna puede ser uuid
+        self.condiciones.append(f"{_identificador(columna)}::text = any(%s)")
+        self.parametros.append([str(v) for v in valores])
+        return self
+
+    # ========== ESCRITURA ==========
+    def insert(self, filas, returning: str = "representation", **_):
+        self.escritura = (filas if isinstance(filas, list) else [filas], str(returning), None, False)
+        return self
+
+    def upsert(self, filas, returning: str = "representation", ignore_duplicates: bool = False,
+               on_conflict: str = "", **_):
+        self.escritura = (filas if isinstance(filas, list) else [filas], str(returning), on_conflict, ignore_duplicates)
+        return self
+
+    def _sql_escritura(self):
+        import json
+
+        filas, returning, conflicto, ignorar = self.escritura
+        columnas = sorted({c for fila in filas for c in fila})
+        lista = ", ".join(_identificador(c) for c in columnas)
+        sql = (
+            f"insert into {self.tabla} ({lista}) "
+            f"select {lista} from json_populate_recordset(null::{self.tabla}, %s::json)"
+        )
+        if conflicto is not None:
+            objetivo = ", ".join(_identificador(c) for c in (conflicto.split(",") if conflicto else []))
+            destino = f" ({objetivo})" if objetivo else ""
+            if ignorar or not objetivo:
+                sql += f" on conflict{destino} do nothing"
+            else:
+                actualizar = ", ".join(f"{_identificador(c)} = excluded.{_identificador(c)}" for c in columnas)
+                sql += f" on conflict{destino} do update set {actualizar}"
+        if "minimal" in returning:
+            return sql, [json.dumps(filas, default=str)], False
+        return (
+            f"with filas as ({sql} returning *) select coalesce(json_agg(filas), '[]'::json) from filas",
+            [json.dumps(filas, default=str)],
+            True,
+        )
+
+    def execute(self):
+        if self.escritura is not None:
+            sql, parametros, devuelve = self._sql_escritura()
+        else:
+            donde = f" where {' and '.join(self.condiciones)}" if self.condiciones else ""
+            sql = (
+                f"select coalesce(json_agg(t), '[]'::json) from "
+                f"(select {self.columnas} from {self.tabla}{donde}) t"
+            )
+            parametros, devuelve = self.parametros, True
+        return _Respuesta(self.cliente.ejecutar(sql, parametros, devuelve))
+
+
+class _Rpc:
+    def __init__(self, cliente, funcion: str, parametros: dict):
+        self.cliente = cliente
+        self.funcion = _identificador(funcion)
+        self.parametros = parametros or {}
+
+    def execute(self):
+        argumentos = ", ".join(f"{_identificador(k)} => %s" for k in self.parametros)
+        sql = f"select coalesce(json_agg(t), '[]'::json) from {self.funcion}({argumentos}) t"
+        return _Respuesta(self.cliente.ejecutar(sql, list(self.parametros.values()), True))
+
+
+class ClienteLocal:
+    # Un cliente = una conexión; el pool de la app (conexion.py) nunca comparte
+    # un cliente entre dos hilos a la vez
+    def __init__(self, backend: "BackendLocal"):
+        import psycopg2
+
+        self.backend = backend
+        self.conexion = psycopg2.connect(backend.dsn)
+        self.conexion.autocommit = True
+
+    def table(self, nombre: str):
+        return _Consulta(self, nombre)
+
+    def rpc(self, funcion: str, parametros: dict = None):
+        return _Rpc(self, funcion, parametros)
+
+    def ejecutar(self, sql: str, parametros: list, devuelve: bool):
+        self.backend.esperar()
+        with self.conexion.cursor() as cursor:
+            cursor.execute(sql, parametros)
+            return cursor.fetchone()[0] if devuelve else []
+
+
+class BackendLocal:
+    def __init__(self, dsn: str, latencia: float = 0.0, variacion: float = 0.0):
+        self.dsn = dsn
+        self.latencia = latencia
+        self.variacion = variacion
+        self.lock = threading.Lock()
+        self.llamadas = 0
+
+    def esperar(self):
+        # Latencia de red simulada por llamada (sleep: libera el GIL como una espera real)
+        with self.lock:
+            self.llamadas += 1
+        if self.latencia or self.variacion:
+            time.sleep(max(0.0, self.latencia + random.uniform(-self.variacion, self.variacion)))
+
+    def cliente(self) -> ClienteLocal:
+        return ClienteLocal(self)
+
+
+def instalar(dsn: str = None, latencia: float = 0.0, variacion: float = 0.0) -> BackendLocal:
+    # El pool de la app crea clientes locales en lugar de clientes de Supabase
+    import conexion
+
+    backend = BackendLocal(dsn or DSN or iniciar_pgserver(), latencia, variacion)
+    conexion.PoolSupabase._crear = lambda self: backend.cliente()
+    return backend
+
+
+def iniciar_pgserver(directorio: str = DIRECTORIO_PGSERVER) -> str:
+    import pgserver
+
+    return pgserver.get_server(directorio, cleanup_mode=None).get_uri()
+
+
+def preparar(dsn: str, agentes: int = 10000, comisiones: int = 500, historial: int = 100000,
+             semilla: float = 0.42) -> dict:
+    # Aplica el esquema local y los SQL del repo, y carga datos sintéticos
+    import psycopg2
+
+    conexion = psycopg2.connect(dsn)
+    conexion.autocommit = True
+    tiempos = {}
+    try:
+        with conexion.cursor() as cursor:
+            for ruta in ARCHIVOS_SQL:
+                inicio = time.perf_counter()
+                with open(os.path.join(RAIZ, ruta), encoding="utf-8") as f:
+                    cursor.execute(f.read())
+                tiempos[ruta] = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            cursor.execute(
+                "select public.sembrar_datos_locales(%s, %s, %s, %s)",
+                (agentes, comisiones, historial, semilla),
+            )
+            tiempos["semilla"] = time.perf_counter() - inicio
+    finally:
+        conexion.close()
+    return tiempos
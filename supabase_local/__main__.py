@@ -0,0 +1,26 @@
+# ================== PREPARAR LA BASE LOCAL ==================
+# python -m supabase_local [--dsn postgresql://...] --agentes 100000 --comisiones 5000 --historial 1000000
+# Sin --dsn (ni SUPABASE_LOCAL_DSN) levanta un Postgres embebido con pgserver.
+import argparse
+
+from supabase_local import DSN, iniciar_pgserver, preparar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crea el esquema local y carga datos sintéticos.")
+    parser.add_argument("--dsn", default=DSN)
+    parser.add_argument("--agentes", type=int, default=10000)
+    parser.add_argument("--comisiones", type=int, default=500)
+    parser.add_argument("--historial", type=int, default=100000)
+    parser.add_argument("--semilla", type=float, default=0.42)
+    args = parser.parse_args()
+
+    dsn = args.dsn or iniciar_pgserver()
+    tiempos = preparar(dsn, args.agentes, args.comisiones, args.historial, args.semilla)
+    for paso, segundos in tiempos.items():
+        print(f"{paso:<45}{segundos:>8.2f}s")
+    print(f"SUPABASE_LOCAL_DSN={dsn}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# ================== TABLA PAGINADA EN EL SERVIDOR (AGGRID) ==================
+# Alternativa a la tabla HTML + DataTables: al navegador viaja solo la página
+# visible. Orden, búsqueda y paginado se resuelven en Python sobre el catálogo
+# en caché, así el tamaño de cada rerun no depende de cuántas comisiones haya.
+import math
+
+import streamlit as st
+
+from catalogo import COLUMNAS_ORDEN
+from presentacion import COLUMNAS_TABLA
+
+TAMANOS_PAGINA = [10, 25, 50]
+ALTO_FILA = 35
+
+
+def mostrar_tabla_paginada(catalogo, filtros: tuple):
+    # Devuelve el id de la comisión seleccionada en la grilla (o None)
+    # st_aggrid tarda en importarse y solo se usa en este modo: se importa acá
+    from st_aggrid import AgGrid, GridOptionsBuilder
+
+    consultas = catalogo.consultas
+
+    col1, col2, col3, col4 = st.columns([4, 2, 2, 1])
+    with col1:
+        busqueda = st.text_input("🔍 Buscar", key="grilla_busqueda", placeholder="Actividad, comisión u organismo")
+    with col2:
+        orden = st.selectbox("Ordenar por", list(COLUMNAS_ORDEN), key="grilla_orden")
+    with col3:
+        sentido = st.selectbox("Sentido", ["Ascendente", "Descendente"], key="grilla_sentido")
+    with col4:
+        tamano = st.selectbox("Filas", TAMANOS_PAGINA, key="grilla_tamano")
+
+    # Otra búsqueda, otros filtros u otro orden: se vuelve a la primera página
+    firma = (filtros, busqueda.strip(), orden, sentido, tamano)
+    if st.session_state.get("grilla_firma") != firma:
+        st.session_state["grilla_firma"] = firma
+        st.session_state["grilla_pagina"] = 1
+
+    posiciones = consultas.posiciones(filtros, busqueda, orden, sentido == "Ascendente")
+    total = len(posiciones)
+    if not total:
+        st.warning("No se encontraron cursos con los filtros seleccionados.")
+        return None
+
+    paginas = max(1, math.ceil(total / tamano))
+    if st.session_state.get("grilla_pagina", 1) > paginas:
+        st.session_state["grilla_pagina"] = paginas
+
+    pagina = consultas.pagina(posiciones, st.session_state.get("grilla_pagina", 1) - 1, tamano)
+    pagina = pagina[["id"] + COLUMNAS_TABLA].astype({"Modalidad": object, "Apto tramo": object})
+
+    gb = GridOptionsBuilder.from_dataframe(pagina)
+    gb.configure_default_column(sortable=False, filter=False, resizable=True)
+    gb.configure_column("id", hide=True)
+    gb.configure_column("Actividad (Comisión)", flex=3)
+    gb.configure_selection("single")
+    respuesta = AgGrid(
+        pagina,
+        gridOptions=gb.build(),
+        height=ALTO_FILA * (len(pagina) + 2),
+        update_on=["selectionChanged"],
+        show_toolbar=False,
+        show_search=False,
+        show_download_button=False,
+        key="grilla_comisiones",
+    )
+
+    col_info, col_pagina = st.columns([4, 1])
+    with col_pagina:
+        numero = st.number_input("Página", min_value=1, max_value=paginas, step=1, key="grilla_pagina")
+    with col_info:
+        inicio = (numero - 1) * tamano
+        st.caption(f"Mostrando {inicio + 1}–{min(inicio + tamano, total)} de {total} comisiones · página {numero} de {paginas}")
+
+    seleccion = respuesta.selected_rows
+    if seleccion is not None and len(seleccion):
+        return seleccion.iloc[0]["id"]
+    return None
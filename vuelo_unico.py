@@ -0,0 +1,102 @@
+# ================== VUELO ÚNICO (COALESCENCIA DE LLAMADAS IGUALES) ==================
+# Cuando vence el catálogo o abre una comisión muy pedida, muchas sesiones
+# piden lo mismo a Supabase en el mismo instante. Con VueloUnico (patrón
+# "single-flight") la primera llamada con una clave va a la base y las que
+# llegan con la misma clave mientras está en curso esperan y comparten su
+# resultado, o su excepción. Nada se guarda después: no es una caché, solo
+# junta las llamadas simultáneas.
+# Si la llamada líder se corta por algo que no es un error de la consulta
+# (st.rerun / st.stop de su sesión son BaseException), las que esperaban no
+# heredan el corte: una de ellas vuelve a intentar como líder.
+import threading
+
+
+class _Llamada:
+    def __init__(self):
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error = None
+        self.abandonada = False
+        self.compartida = 0
+
+
+class VueloUnico:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_vuelo = {}   # clave -> _Llamada en curso
+
+        # Contadores
+        self.llamadas = 0      # las que fueron a la base
+        self.compartidas = 0   # las que esperaron el resultado de otra
+
+    def hacer(self, clave, funcion, *args, **kwargs):
+        while True:
+            with self._lock:
+                llamada = self._en_vuelo.get(clave)
+                lider = llamada is None
+                if lider:
+                    llamada = self._en_vuelo[clave] = _Llamada()
+                    self.llamadas += 1
+                else:
+                    llamada.compartida += 1
+                    self.compartidas += 1
+
+            if lider:
+                return self._ejecutar(clave, llamada, funcion, args, kwargs)
+
+            llamada.listo.wait()
+            if llamada.abandonada:
+                continue
+            if llamada.error is not None:
+                raise llamada.error
+            return llamada.resultado
+
+    def _ejecutar(self, clave, llamada, funcion, args, kwargs):
+        try:
+            llamada.resultado = funcion(*args, **kwargs)
+            return llamada.resultado
+        except Exception as e:
+            llamada.error = e
+            raise
+        except BaseException:
+            llamada.abandonada = True
+            raise
+        finally:
+            with self._lock:
+                del self._en_vuelo[clave]
+            llamada.listo.set()
+
+    def en_fondo(self, clave, funcion, *args, nombre: str = None, **kwargs) -> bool:
+        # Corre la llamada en un hilo aparte, salvo que ya haya una en curso con
+        # esa clave. Devuelve True si la inició esta llamada.
+        with self._lock:
+            if clave in self._en_vuelo:
+                self.compartidas += 1
+                return False
+            llamada = self._en_vuelo[clave] = _Llamada()
+            self.llamadas += 1
+
+        def correr():
+            try:
+                self._ejecutar(clave, llamada, funcion, args, kwargs)
+            except Exception:
+                pass  # el error queda en llamada.error; quien lo necesite lo registra en funcion
+
+        threading.Thread(target=correr, name=nombre or f"vuelo-{clave}", daemon=True).start()
+        return True
+
+    def en_vuelo(self, clave) -> bool:
+        return clave in self._en_vuelo
+
+    def estadisticas(self) -> dict:
+        total = self.llamadas + self.compartidas
+        return {
+            "en_vuelo": len(self._en_vuelo),
+            "llamadas": self.llamadas,
+            "compartidas": self.compartidas,
+            "tasa_compartidas": self.compartidas / total if total else 0.0,
+        }
+
+
+# Compartido por los helpers de acceso a datos del formulario (form.py)
+vuelos = VueloUnico()